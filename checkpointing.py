@@ -0,0 +1,153 @@
+"""
+Checkpointing Module
+====================
+Persistent LangGraph checkpoints, so workflow runs survive failures and restarts.
+
+The workflow is compiled with a checkpointer that saves the state after every
+node under a thread ID. By default the thread ID is derived from the workflow
+variant, educational level and description, so running the same input again
+picks up the earlier run:
+
+- completed       -> the checkpointed final state is returned (no LLM calls)
+- interrupted     -> continues from the last completed node
+- failed          -> (finished with success=False) runs again from the start
+
+Checkpoints are stored in a local SQLite database (CHECKPOINT_DB) and need
+langgraph-checkpoint-sqlite (in requirements.txt). Without it, creating a
+checkpointer fails instead of silently keeping checkpoints in memory, where a
+restarted batch could not resume from them.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from timeline_store import description_hash
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB = os.getenv('CHECKPOINT_DB', 'checkpoints/workflow.sqlite')
+
+# SQLite saver (pip install langgraph-checkpoint-sqlite)
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    SQLITE_CHECKPOINTS_AVAILABLE = True
+except ImportError:
+    SQLITE_CHECKPOINTS_AVAILABLE = False
+
+# Checkpoint statuses
+STATUS_NEW = "new"
+STATUS_INTERRUPTED = "interrupted"
+STATUS_FAILED = "failed"
+STATUS_COMPLETED = "completed"
+
+
+def create_checkpointer(db_path: str = CHECKPOINT_DB):
+    """
+    Create a checkpointer.
+
+    Args:
+        db_path: SQLite database file (created if missing)
+
+    Returns:
+        SqliteSaver
+
+    Raises:
+        RuntimeError: If langgraph-checkpoint-sqlite is not installed
+    """
+    if not SQLITE_CHECKPOINTS_AVAILABLE:
+        raise RuntimeError("Workflow checkpoints need langgraph-checkpoint-sqlite "
+                           "(pip install langgraph-checkpoint-sqlite)")
+
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    # The saver serializes access with its own lock, so the connection can be
+    # shared by batch worker threads
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    logger.info(f"💾 Workflow checkpoints: {db_path}")
+    return SqliteSaver(conn)
+
+
+# Global checkpointer instance
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """Get or create the global checkpointer (CHECKPOINT_DB)"""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = create_checkpointer()
+        return _checkpointer
+
+
+def thread_id_for(description: str, educational_level: str, variant: str = "combined") -> str:
+    """
+    Default thread ID for a run.
+
+    Args:
+        description: Description text (whitespace-normalized before hashing)
+        educational_level: Target educational level
+        variant: Workflow variant ("combined" / "parallel"); different graphs
+                 have different nodes, so their checkpoints are kept apart
+
+    Returns:
+        Thread ID string
+    """
+    return f"{variant}:{educational_level}:{description_hash(description)}"
+
+
+def thread_config(thread_id: str) -> Dict[str, Any]:
+    """LangGraph run config for a thread ID."""
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def checkpoint_status(workflow, thread_id: str) -> str:
+    """
+    Status of a thread's latest checkpoint.
+
+    Args:
+        workflow: Workflow compiled with a checkpointer
+        thread_id: Thread ID
+
+    Returns:
+        STATUS_NEW, STATUS_INTERRUPTED, STATUS_FAILED or STATUS_COMPLETED
+    """
+    snapshot = workflow.get_state(thread_config(thread_id))
+    if not snapshot.values:
+        return STATUS_NEW
+    if snapshot.next:
+        return STATUS_INTERRUPTED
+    return STATUS_COMPLETED if snapshot.values.get('success') else STATUS_FAILED
+
+
+def run_checkpointed(workflow, initial_state: Dict, thread_id: str) -> Tuple[Dict, str]:
+    """
+    Run a checkpointed workflow, reusing or resuming earlier work on the thread.
+
+    Args:
+        workflow: Workflow compiled with a checkpointer
+        initial_state: Input state (ignored when resuming)
+        thread_id: Thread ID
+
+    Returns:
+        Tuple (final_state, status before this call)
+    """
+    config = thread_config(thread_id)
+    status = checkpoint_status(workflow, thread_id)
+
+    if status == STATUS_COMPLETED:
+        logger.info(f"♻️  Checkpoint hit: {thread_id} already completed - skipping workflow")
+        return workflow.get_state(config).values, status
+
+    if status == STATUS_INTERRUPTED:
+        pending = ", ".join(workflow.get_state(config).next)
+        logger.info(f"⏯️  Resuming {thread_id} at: {pending}")
+        return workflow.invoke(None, config), status
+
+    if status == STATUS_FAILED:
+        logger.info(f"🔁 Previous run of {thread_id} failed - starting over")
+    return workflow.invoke(initial_state, config), status
@@ -0,0 +1,372 @@
+"""
+Concept Graph Module
+====================
+Integer-ID concept graph shared by pre-computation, layout and rendering.
+
+Built in one pass over the relationships: each concept keeps at most
+max_incoming incoming edges, chosen by a numeric importance score with a
+bounded heap (O(E log k)). Nodes are dense integer IDs (concept order); the
+kept edges are frozen into CSR arrays (offsets + neighbor IDs, both
+directions) with in/out degrees and hierarchy levels computed once at build
+time. A networkx.DiGraph is only built when a caller asks for one
+(to_networkx()), e.g. for matplotlib drawing.
+
+timeline_graph() builds the graph once per Timeline, so PrecomputeEngine,
+the standalone renderer and the layout engine all share one instance.
+
+The read API (nodes, edges, successors, predecessors, in_degree, ...) mirrors
+the networkx subset used by layout_engine.py, so layouts accept either type.
+"""
+
+import heapq
+import logging
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from timeline_model import Timeline
+
+logger = logging.getLogger(__name__)
+
+# Numeric scores for the LLM's importance labels
+IMPORTANCE_SCORES = {"high": 3, "medium": 2, "low": 1}
+
+
+def importance_score(concept: Dict) -> float:
+    """
+    Numeric importance of a concept dict.
+
+    "high"/"medium"/"low" map to 3/2/1 (numbers are used as-is), and
+    importance_rank breaks ties (rank 1 adds 0.5, rank 2 adds 0.25, ...).
+    Unknown importance scores 0.
+    """
+    value = concept.get('importance', 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        score = float(value)
+    else:
+        score = float(IMPORTANCE_SCORES.get(str(value).strip().lower(), 0))
+    rank = concept.get('importance_rank')
+    if isinstance(rank, (int, float)) and rank >= 1:
+        score += 0.5 / rank
+    return score
+
+
+class ConceptGraph:
+    """
+    Directed concept graph with integer node IDs and CSR adjacency.
+
+    For node i, its successors are out_targets[out_offsets[i]:out_offsets[i + 1]]
+    and its predecessors in_sources[in_offsets[i]:in_offsets[i + 1]].
+    """
+
+    def __init__(self, names: List[str], scores: List[float],
+                 edges: Iterable[Tuple[int, int]] = (), labels: Optional[Dict[Tuple[int, int], str]] = None,
+                 node_data: Optional[List[Dict]] = None, edge_data: Optional[Dict[Tuple[int, int], Dict]] = None):
+        """
+        Args:
+            names: Node names; a name's position is its ID
+            scores: Numeric importance per node
+            edges: (source ID, target ID) pairs, in output order
+            labels: Relationship label per edge
+            node_data: Source dict per node (e.g. the concept dict)
+            edge_data: Source dict per edge (e.g. the relationship dict)
+        """
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.scores = scores
+        self.labels: Dict[Tuple[int, int], str] = labels if labels is not None else {}
+        self.node_data = node_data
+        self.edge_data = edge_data
+        self.total_edges = 0  # Before pruning
+        self._nx_graph = None
+        self._freeze(list(edges))
+
+    def _freeze(self, edges: List[Tuple[int, int]]):
+        """Build CSR arrays, degrees and hierarchy levels (stable edge order)."""
+        n = len(self.names)
+        self.out_degrees = array('i', [0]) * n
+        self.in_degrees = array('i', [0]) * n
+        for u, v in edges:
+            self.out_degrees[u] += 1
+            self.in_degrees[v] += 1
+
+        self.out_offsets = array('i', [0]) * (n + 1)
+        self.in_offsets = array('i', [0]) * (n + 1)
+        for i in range(n):
+            self.out_offsets[i + 1] = self.out_offsets[i] + self.out_degrees[i]
+            self.in_offsets[i + 1] = self.in_offsets[i] + self.in_degrees[i]
+
+        self.out_targets = array('i', [0]) * len(edges)
+        self.in_sources = array('i', [0]) * len(edges)
+        out_fill = self.out_offsets[:-1]
+        in_fill = self.in_offsets[:-1]
+        for u, v in edges:
+            self.out_targets[out_fill[u]] = v
+            out_fill[u] += 1
+            self.in_sources[in_fill[v]] = u
+            in_fill[v] += 1
+
+        self.importance_order = sorted(range(n), key=lambda i: -self.scores[i])
+        self.layer_edges = self._acyclic_edges()
+        self.levels = self._longest_path_levels()
+
+    @classmethod
+    def from_timeline(cls, concepts: List[Dict], relationships: List[Dict],
+                      max_incoming: Optional[int] = None, source_key: str = 'from',
+                      target_key: str = 'to', label_key: str = 'relationship') -> "ConceptGraph":
+        """
+        Build the graph in a single pass over relationships.
+
+        Duplicate edges collapse into one (the last label / relationship dict wins). Relationships
+        to unknown concepts are ignored. With max_incoming, each node keeps the
+        edges from its highest-scoring sources (ties: first seen).
+
+        Args:
+            concepts: Concept dicts with name / importance / importance_rank
+            relationships: Relationship dicts
+            max_incoming: Maximum incoming edges per node (None = unlimited)
+            source_key / target_key / label_key: Relationship field names
+                (the description workflow uses from_concept / to_concept / relationship_type)
+
+        Returns:
+            ConceptGraph
+        """
+        names = []
+        scores = []
+        node_data = []
+        seen = set()
+        for concept in concepts:
+            name = concept.get('name') if isinstance(concept, dict) else None
+            if name and name not in seen:
+                seen.add(name)
+                names.append(name)
+                scores.append(importance_score(concept))
+                node_data.append(concept)
+        index = {name: i for i, name in enumerate(names)}
+
+        # Per-target min-heap of (source score, -sequence, source): the root of the
+        # heap is the weakest kept edge and is replaced by any stronger one
+        incoming: Dict[int, List[Tuple[float, int, int]]] = {}
+        labels = {}
+        relations = {}
+        total_edges = 0
+        for sequence, rel in enumerate(relationships):
+            source = index.get(rel.get(source_key))
+            target = index.get(rel.get(target_key))
+            if source is None or target is None:
+                continue
+            edge = (source, target)
+            labels[edge] = rel.get(label_key, '')
+            if edge in relations:
+                relations[edge] = rel
+                continue
+            relations[edge] = rel
+            total_edges += 1
+
+            heap = incoming.setdefault(target, [])
+            item = (scores[source], -sequence, source)
+            if max_incoming is None or len(heap) < max_incoming:
+                heapq.heappush(heap, item)
+            elif max_incoming > 0 and item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        # Kept edges grouped by target (targets in first-kept order), relationship
+        # order within each target; the CSR build keeps this order per source
+        edges = []
+        kept_labels = {}
+        kept_relations = {}
+        for target, heap in incoming.items():
+            for _, _, source in sorted(heap, key=lambda item: -item[1]):
+                edge = (source, target)
+                edges.append(edge)
+                kept_labels[edge] = labels[edge]
+                kept_relations[edge] = relations[edge]
+
+        graph = cls(names, scores, edges, kept_labels, node_data, kept_relations)
+        graph.total_edges = total_edges
+        logger.info(f"  📊 Concept graph: {len(names)} nodes, {graph.number_of_edges()}/{graph.total_edges} edges kept")
+        return graph
+
+    # ------------------------------------------------------------------
+    # Integer-ID API
+    # ------------------------------------------------------------------
+
+    def out_ids(self, i: int) -> array:
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+
+    def in_ids(self, i: int) -> array:
+        return self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def edge_ids(self) -> Iterator[Tuple[int, int]]:
+        """(source, target) ID pairs, grouped by source."""
+        targets = self.out_targets
+        offsets = self.out_offsets
+        for u in range(len(self.names)):
+            for k in range(offsets[u], offsets[u + 1]):
+                yield u, targets[k]
+
+    def _acyclic_edges(self) -> List[Tuple[int, int]]:
+        """
+        Edges with DFS back edges reversed (self-loops dropped).
+
+        The DFS starts from nodes in importance order and visits children in
+        that order too, so the most important concepts end up on top.
+        """
+        n = len(self.names)
+        rank = [0] * n
+        for position, i in enumerate(self.importance_order):
+            rank[i] = position
+        state = [0] * n  # 1 = on stack, 2 = done
+        reversed_edges = set()
+
+        for start in self.importance_order:
+            if state[start]:
+                continue
+            stack = [(start, iter(sorted(self.out_ids(start), key=rank.__getitem__)))]
+            state[start] = 1
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if child == node:
+                        continue
+                    if state[child] == 1:
+                        reversed_edges.add((node, child))
+                    elif not state[child]:
+                        state[child] = 1
+                        stack.append((child, iter(sorted(self.out_ids(child), key=rank.__getitem__))))
+                        break
+                else:
+                    state[node] = 2
+                    stack.pop()
+
+        return [(v, u) if (u, v) in reversed_edges else (u, v)
+                for u, v in self.edge_ids() if u != v]
+
+    def _longest_path_levels(self) -> List[int]:
+        """Hierarchy level per node: longest path from a root over layer_edges."""
+        n = len(self.names)
+        successors = [[] for _ in range(n)]
+        in_degree = [0] * n
+        for u, v in self.layer_edges:
+            successors[u].append(v)
+            in_degree[v] += 1
+        levels = [0] * n
+        queue = deque(i for i in self.importance_order if in_degree[i] == 0)
+        while queue:
+            node = queue.popleft()
+            for child in successors[node]:
+                levels[child] = max(levels[child], levels[node] + 1)
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    queue.append(child)
+        return levels
+
+    # ------------------------------------------------------------------
+    # networkx-compatible read API (the subset used by layout_engine)
+    # ------------------------------------------------------------------
+
+    def nodes(self) -> List[str]:
+        return list(self.names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def number_of_nodes(self) -> int:
+        return len(self.names)
+
+    def number_of_edges(self) -> int:
+        return len(self.out_targets)
+
+    def edges(self) -> List[Tuple[str, str]]:
+        names = self.names
+        return [(names[u], names[v]) for u, v in self.edge_ids()]
+
+    def has_edge(self, source: str, target: str) -> bool:
+        u = self.index.get(source)
+        v = self.index.get(target)
+        return u is not None and v is not None and (u, v) in self.labels
+
+    def successors(self, name: str) -> Iterator[str]:
+        return (self.names[v] for v in self.out_ids(self.index[name]))
+
+    def predecessors(self, name: str) -> Iterator[str]:
+        return (self.names[u] for u in self.in_ids(self.index[name]))
+
+    def in_degree(self, name: str) -> int:
+        return self.in_degrees[self.index[name]]
+
+    def out_degree(self, name: str) -> int:
+        return self.out_degrees[self.index[name]]
+
+    # ------------------------------------------------------------------
+    # Shared precomputed views
+    # ------------------------------------------------------------------
+
+    def roots(self) -> List[str]:
+        """Nodes without incoming edges, in concept order."""
+        return [name for i, name in enumerate(self.names) if not self.in_degrees[i]]
+
+    def importance(self, name: str) -> float:
+        return self.scores[self.index[name]]
+
+    def importance_map(self) -> Dict[str, float]:
+        return dict(zip(self.names, self.scores))
+
+    def level(self, name: str) -> int:
+        """Hierarchy level (0 = top) from the longest-path layering."""
+        return self.levels[self.index[name]]
+
+    def label(self, source: str, target: str) -> str:
+        return self.labels.get((self.index[source], self.index[target]), "")
+
+    def edges_among(self, visible: Iterable[str]) -> List[Tuple[str, str]]:
+        """Edges whose endpoints are both in visible (edge order preserved)."""
+        index = self.index
+        mask = bytearray(len(self.names))
+        for name in visible:
+            i = index.get(name)
+            if i is not None:
+                mask[i] = 1
+        names = self.names
+        return [(names[u], names[v]) for u, v in self.edge_ids() if mask[u] and mask[v]]
+
+    def to_networkx(self):
+        """networkx.DiGraph with the kept edges (label attribute), built once on demand."""
+        if self._nx_graph is None:
+            import networkx as nx
+            G = nx.DiGraph()
+            G.add_nodes_from(self.names)
+            names = self.names
+            G.add_edges_from((names[u], names[v], {"label": self.labels[(u, v)]}) for u, v in self.edge_ids())
+            self._nx_graph = G
+        return self._nx_graph
+
+
+def timeline_graph(timeline: Dict, max_incoming: Optional[int] = None) -> ConceptGraph:
+    """
+    ConceptGraph of a timeline's concepts and relationships.
+
+    For a Timeline the graph is built once per max_incoming and reused until
+    its concepts or relationships are replaced; plain dicts build a new graph.
+
+    Args:
+        timeline: Timeline (or plain timeline dict)
+        max_incoming: Maximum incoming edges per node (None = unlimited)
+
+    Returns:
+        ConceptGraph
+    """
+    def build():
+        return ConceptGraph.from_timeline(
+            timeline.get("concepts", []), timeline.get("relationships", []), max_incoming=max_incoming
+        )
+
+    if isinstance(timeline, Timeline):
+        return timeline.derived(f"concept_graph:{max_incoming}", build)
+    return build()
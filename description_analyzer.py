@@ -10,6 +10,22 @@ import math
 from typing import Dict, List, Any, Tuple
 
 
+def tokenize_words(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens
+    
+    This is the tokenization used for word counting, so every module that
+    scores or compares descriptions sees the same words.
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        List[str]: Lowercase word tokens
+    """
+    return re.findall(r'\b\w+\b', text.lower())
+
+
 def analyze_description_complexity(description: str) -> Dict[str, Any]:
     """
     Analyze description text and determine optimal concept map complexity
@@ -23,7 +39,7 @@ def analyze_description_complexity(description: str) -> Dict[str, Any]:
     """
     
     # Clean and count words
-    words = re.findall(r'\b\w+\b', description.lower())
+    words = tokenize_words(description)
     word_count = len(words)
     
     # Calculate unique words for additional insight
@@ -18,7 +18,8 @@ logger = logging.getLogger(__name__)
 def run_dynamic_mode(
     description: str,
     educational_level: str,
-    topic_name: str
+    topic_name: str,
+    reuse_saved: bool = True
 ) -> bool:
     """
     Run the complete dynamic concept map generation workflow.
@@ -33,12 +34,17 @@ def run_dynamic_mode(
         description: Full description text
         educational_level: Educational level (e.g., "High School")
         topic_name: Topic name for the concept map
+        reuse_saved: Reuse a stored timeline for the same description and level
+                     (skips the LLM call; audio and layout are still regenerated)
         
     Returns:
         True if successful, False otherwise
     """
     from timeline_mapper import create_timeline, print_timeline_summary
     from precompute_engine import PrecomputeEngine
+    from timeline_store import get_timeline_store
+    
+    store = get_timeline_store()
     
     logger.info("=" * 70)
     logger.info("🚀 Starting Enhanced Dynamic Concept Map Generation")
@@ -47,7 +53,12 @@ def run_dynamic_mode(
     # Step 1: Create timeline with SINGLE API call
     logger.info("📋 Step 1: Creating timeline (analyzing full description)...")
     try:
-        timeline = create_timeline(description, educational_level, topic_name)
+        saved = store.find_by_description(description, educational_level) if reuse_saved else None
+        timeline = store.load(saved['id']) if saved else None
+        if timeline:
+            logger.info(f"♻️  Reusing saved timeline: {saved['filename']}")
+        else:
+            timeline = create_timeline(description, educational_level, topic_name)
         print_timeline_summary(timeline)
     except Exception as e:
         logger.error(f"❌ Failed to create timeline: {e}")
@@ -66,14 +77,19 @@ def run_dynamic_mode(
         logger.warning("⚠️  Falling back to legacy mode without pre-computation")
         # Continue without pre-computation (will use on-the-fly generation)
     
+    try:
+        store.save(timeline, description)
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to store timeline: {e}")
+    
     # Step 3: Save timeline to temporary file for Streamlit to read
-    import json
+    # (compact binary container, memory-mapped by the runner - see timeline_binary.py)
     import tempfile
+    from timeline_binary import save_timeline_binary
     
-    timeline_file = os.path.join(tempfile.gettempdir(), "concept_map_timeline.json")
+    timeline_file = os.path.join(tempfile.gettempdir(), "concept_map_timeline.cmtl")
     try:
-        with open(timeline_file, 'w') as f:
-            json.dump(timeline, f, indent=2)
+        save_timeline_binary(timeline, timeline_file)
         logger.info(f"💾 Timeline saved to: {timeline_file}")
     except Exception as e:
         logger.error(f"❌ Failed to save timeline: {e}")
@@ -125,7 +141,6 @@ def _create_streamlit_runner_script() -> str:
     import tempfile
     
     script_content = '''
-import json
 import os
 import sys
 import tempfile
@@ -135,18 +150,18 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import the enhanced visualizer with animations and pre-computed assets
 from streamlit_visualizer_enhanced import run_enhanced_visualization
+from timeline_binary import load_timeline_binary
 
-# Load timeline from temp file
-timeline_file = os.path.join(tempfile.gettempdir(), "concept_map_timeline.json")
+# Load timeline from temp file (memory-mapped, word timings decoded on access)
+timeline_file = os.path.join(tempfile.gettempdir(), "concept_map_timeline.cmtl")
 
 try:
-    with open(timeline_file, 'r') as f:
-        timeline = json.load(f)
+    timeline = load_timeline_binary(timeline_file)
 except FileNotFoundError:
     import streamlit as st
     st.error("❌ Timeline file not found. Please run the main script again.")
     st.stop()
-except json.JSONDecodeError as e:
+except ValueError as e:
     import streamlit as st
     st.error(f"❌ Failed to parse timeline file: {e}")
     st.stop()
@@ -185,7 +200,7 @@ def cleanup_temp_files():
     """
     import tempfile
     
-    timeline_file = os.path.join(tempfile.gettempdir(), "concept_map_timeline.json")
+    timeline_file = os.path.join(tempfile.gettempdir(), "concept_map_timeline.cmtl")
     script_dir = os.path.dirname(os.path.abspath(__file__))
     runner_script = os.path.join(script_dir, "_streamlit_runner_temp.py")
     
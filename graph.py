@@ -6,18 +6,23 @@ that extracts concepts directly from user descriptions (1 word to 3000+ words).
 """
 
 from langgraph.graph import StateGraph, END
-from states import ConceptMapState
+from states import ConceptMapState, ParallelConceptMapState
 from nodes import (
     extract_concepts_from_description,
     analyze_concept_relationships,
     build_concept_hierarchy,
     enrich_with_educational_metadata,
     initialize_legacy_fields,
-    extract_all_in_one_call  # NEW: Combined node
+    extract_all_in_one_call,  # NEW: Combined node
+    extract_concepts_from_description_async,
+    analyze_concept_relationships_async,
+    build_concept_hierarchy_async,
+    enrich_with_educational_metadata_async,
+    initialize_legacy_fields_async
 )
 
 
-def create_description_based_concept_map_graph():
+def create_description_based_concept_map_graph(checkpointer=None):
     """
     Create the LangGraph workflow for description-based concept mapping
     
@@ -32,6 +37,10 @@ def create_description_based_concept_map_graph():
     - Previous: 141s with 3 nodes
     - Current: 60-80s with 1 node (50% faster!)
     
+    Args:
+        checkpointer: Optional LangGraph checkpointer (see checkpointing.py);
+                      state is then saved after each node
+    
     Returns:
         Compiled LangGraph workflow
     """
@@ -49,6 +58,43 @@ def create_description_based_concept_map_graph():
     workflow.add_edge("initialize_legacy", END)
     
     # Compile the workflow
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def create_parallel_concept_map_graph():
+    """
+    Create the async multi-node workflow (run with ainvoke)
+    
+    Runs the full 4-node pipeline, including educational enrichment, with
+    independent work fanned out in parallel once concepts exist:
+    
+        extract_concepts ─┬─> analyze_relationships ─> build_hierarchy ─┬─> initialize_legacy
+                          └─> enrich_metadata ─────────────────────────┘
+    
+    Enrichment (the slowest call) overlaps relationships + hierarchy, so the
+    wall time is extraction + max(relationships + hierarchy, enrichment)
+    instead of the sum of all four. Enrichment therefore does not see the
+    hierarchy in its prompt.
+    
+    Returns:
+        Compiled LangGraph workflow (use `await workflow.ainvoke(state)`)
+    """
+    workflow = StateGraph(ParallelConceptMapState)
+    
+    workflow.add_node("extract_concepts", extract_concepts_from_description_async)
+    workflow.add_node("analyze_relationships", analyze_concept_relationships_async)
+    workflow.add_node("build_hierarchy", build_concept_hierarchy_async)
+    workflow.add_node("enrich_metadata", enrich_with_educational_metadata_async)
+    workflow.add_node("initialize_legacy", initialize_legacy_fields_async)
+    
+    # Fan out after extraction, fan in before legacy init (waits for both branches)
+    workflow.set_entry_point("extract_concepts")
+    workflow.add_edge("extract_concepts", "analyze_relationships")
+    workflow.add_edge("extract_concepts", "enrich_metadata")
+    workflow.add_edge("analyze_relationships", "build_hierarchy")
+    workflow.add_edge(["build_hierarchy", "enrich_metadata"], "initialize_legacy")
+    workflow.add_edge("initialize_legacy", END)
+    
     return workflow.compile()
 
 
@@ -68,6 +114,17 @@ def print_description_based_workflow_summary():
     print()
 
 
+def print_parallel_workflow_summary():
+    """
+    Print a summary of the async parallel workflow
+    """
+    print("🔄 Parallel 4-Node Concept Map Workflow (async):")
+    print("   1. Extract Concepts")
+    print("   2a. Analyze Relationships → Build Hierarchy")
+    print("   2b. Educational Enrichment (in parallel with 2a)")
+    print()
+
+
 # Legacy function for backward compatibility  
 def print_universal_workflow_summary():
     """Legacy function - redirects to new description-based summary"""
@@ -12,6 +12,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 
+from concept_graph import ConceptGraph
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -27,6 +29,10 @@ class ConceptMapVisualizer:
         self.concepts = {}
         self.relationships = []
         self.hierarchy = {}
+        self.concept_graph = None  # Integer-ID core, built once per loaded map
+        self.hierarchy_levels = []  # Ordered concept names per hierarchy level
+        self.hierarchy_index = {}   # Concept name -> first level it appears in
+        self._normalized_hierarchy = None  # self.hierarchy the two above were built from
         
     def load_from_json(self, json_file_path: str) -> bool:
         """
@@ -67,12 +73,25 @@ class ConceptMapVisualizer:
             hierarchy_levels = len(self.hierarchy.get('levels', []))
             logger.info(f"Extracted {hierarchy_levels} hierarchy levels")
             
+            self._normalize_hierarchy()
+            self.concept_graph = self._build_concept_graph()
             return True
             
         except Exception as e:
             logger.error(f"Error loading JSON file: {e}")
             return False
     
+    def _build_concept_graph(self) -> ConceptGraph:
+        """Integer-ID graph of the loaded concepts and relationships (all edges kept)."""
+        concepts = [
+            concept_data if concept_data.get('name') == concept_name else {**concept_data, 'name': concept_name}
+            for concept_name, concept_data in self.concepts.items()
+        ]
+        return ConceptGraph.from_timeline(
+            concepts, self.relationships,
+            source_key='from_concept', target_key='to_concept', label_key='relationship_type'
+        )
+    
     def extract_graph_data(self) -> Dict[str, Any]:
         """
         Extract and process graph data for visualization
@@ -80,34 +99,31 @@ class ConceptMapVisualizer:
         Returns:
             dict: Graph statistics and processed data
         """
-        # Create NetworkX graph
-        self.graph.clear()
-        
-        # Add concept nodes
-        for concept_name, concept_data in self.concepts.items():
-            self.graph.add_node(
-                concept_name,
-                type=concept_data.get('type', 'concept'),
-                importance=concept_data.get('importance', 'medium'),
-                definition=concept_data.get('definition', ''),
-                level=self._get_concept_level(concept_name)
-            )
+        self._normalize_hierarchy()
+        if self.concept_graph is None:
+            self.concept_graph = self._build_concept_graph()
+        core = self.concept_graph
+        names = core.names
         
-        # Add relationship edges
-        for relationship in self.relationships:
-            source = relationship.get('from_concept', '')
-            target = relationship.get('to_concept', '')
-            rel_type = relationship.get('relationship_type', 'related')
-            strength = relationship.get('strength', 'medium')
-            
-            if source in self.concepts and target in self.concepts:
-                self.graph.add_edge(
-                    source,
-                    target,
-                    relationship=rel_type,
-                    strength=strength,
-                    description=relationship.get('description', '')
-                )
+        # NetworkX graph (needed for drawing) from the integer-ID core
+        self.graph.clear()
+        self.graph.add_nodes_from(
+            (concept_name, {
+                'type': concept_data.get('type', 'concept'),
+                'importance': concept_data.get('importance', 'medium'),
+                'definition': concept_data.get('definition', ''),
+                'level': self._get_concept_level(concept_name)
+            })
+            for concept_name, concept_data in zip(names, core.node_data)
+        )
+        self.graph.add_edges_from(
+            (names[u], names[v], {
+                'relationship': relationship.get('relationship_type', 'related'),
+                'strength': relationship.get('strength', 'medium'),
+                'description': relationship.get('description', '')
+            })
+            for (u, v), relationship in ((edge, core.edge_data[edge]) for edge in core.edge_ids())
+        )
         
         logger.info(f"Created NetworkX graph with {self.graph.number_of_nodes()} nodes and {self.graph.number_of_edges()} edges")
         
@@ -118,13 +134,43 @@ class ConceptMapVisualizer:
         stats = {
             'num_concepts': len(self.concepts),
             'num_relationships': len(self.relationships),
-            'num_hierarchy_levels': len(self.hierarchy.get('levels', [])),
+            'num_hierarchy_levels': len(self.hierarchy_levels),
             'concept_types': concept_types,
             'relationship_types': relationship_types
         }
         
         return stats
     
+    @staticmethod
+    def _level_concept_names(level: Any) -> List[str]:
+        """Concept names of one hierarchy level (dict with 'concepts', or a plain list)."""
+        if isinstance(level, dict):
+            concepts_in_level = level.get('concepts', [])
+        elif isinstance(level, list):
+            concepts_in_level = level
+        else:
+            return []
+        return [
+            concept.get('name', '') if isinstance(concept, dict) else str(concept)
+            for concept in concepts_in_level
+        ]
+    
+    def _normalize_hierarchy(self):
+        """
+        Parse the hierarchy once into per-level name arrays and a name -> level index.
+        
+        Rebuilt only when self.hierarchy is replaced.
+        """
+        if self._normalized_hierarchy is self.hierarchy:
+            return
+        self.hierarchy_levels = [self._level_concept_names(level) for level in self.hierarchy.get('levels', [])]
+        self.hierarchy_index = {}
+        for level_idx, concept_names in enumerate(self.hierarchy_levels):
+            for concept_name in concept_names:
+                # A concept listed on several levels belongs to the first one
+                self.hierarchy_index.setdefault(concept_name, level_idx)
+        self._normalized_hierarchy = self.hierarchy
+    
     def _get_concept_level(self, concept_name: str) -> int:
         """
         Get the hierarchy level of a concept
@@ -135,25 +181,8 @@ class ConceptMapVisualizer:
         Returns:
             int: Hierarchy level (0-based)
         """
-        levels = self.hierarchy.get('levels', [])
-        for i, level in enumerate(levels):
-            # Handle both dict and list formats for level concepts
-            if isinstance(level, dict):
-                concepts_in_level = level.get('concepts', [])
-                # Extract concept names from concept objects
-                concept_names = []
-                for concept in concepts_in_level:
-                    if isinstance(concept, dict):
-                        concept_names.append(concept.get('name', ''))
-                    else:
-                        concept_names.append(str(concept))
-            else:
-                # If level is a list, assume it contains concept names directly
-                concept_names = level if isinstance(level, list) else []
-            
-            if concept_name in concept_names:
-                return i
-        return 0  # Default to level 0 if not found
+        self._normalize_hierarchy()
+        return self.hierarchy_index.get(concept_name, 0)  # Default to level 0 if not found
     
     def create_hierarchical_layout(self) -> Dict[str, Tuple[float, float]]:
         """
@@ -163,7 +192,8 @@ class ConceptMapVisualizer:
             dict: Node positions {node_name: (x, y)}
         """
         pos = {}
-        levels = self.hierarchy.get('levels', [])
+        self._normalize_hierarchy()
+        levels = self.hierarchy_levels
         
         if not levels:
             # Fallback to spring layout if no hierarchy
@@ -174,21 +204,8 @@ class ConceptMapVisualizer:
         
         # Calculate positions based on hierarchy levels
         level_height = 2.0
-        for level_idx, level in enumerate(levels):
-            # Handle both dict and list formats for level concepts
-            if isinstance(level, dict):
-                concepts_in_level = level.get('concepts', [])
-                # Extract concept names from concept objects
-                concept_names = []
-                for concept in concepts_in_level:
-                    if isinstance(concept, dict):
-                        concept_names.append(concept.get('name', ''))
-                    else:
-                        concept_names.append(str(concept))
-            else:
-                # If level is a list, assume it contains concept names directly
-                concept_names = level if isinstance(level, list) else []
-                
+        nodes = self.graph.nodes
+        for level_idx, concept_names in enumerate(levels):
             y_position = (len(levels) - level_idx - 1) * level_height
             
             # Distribute concepts horizontally within the level
@@ -197,7 +214,7 @@ class ConceptMapVisualizer:
                 start_x = -(len(concept_names) - 1) * x_spacing / 2
                 
                 for i, concept in enumerate(concept_names):
-                    if concept in self.graph.nodes():
+                    if concept in nodes:
                         x_position = start_x + i * x_spacing
                         pos[concept] = (x_position, y_position)
         
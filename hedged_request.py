@@ -0,0 +1,203 @@
+"""
+Hedged Request Module
+=====================
+Speculative duplicate requests to cut tail latency of LLM calls.
+
+The primary call starts immediately. If it has not produced a valid result by a
+deadline (a latency percentile from metrics_logs/), a backup call fires - same
+model or HEDGE_FALLBACK_MODEL. The first valid result wins; the other call is
+cancelled if it has not started yet, otherwise its result is ignored.
+
+Cost: a backup that has started cannot be cancelled. Every hedged call can
+therefore cost up to twice the API tokens of an unhedged one, and the losing
+call keeps its rate limiter slot until its response arrives. Pass on_discard
+to account for the tokens of results that were not used.
+
+Opt-in: set HEDGED_EXTRACTION=true or pass hedged=True to the extraction call.
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Optional
+
+from metrics_logger import get_latency_percentile
+
+logger = logging.getLogger(__name__)
+
+# Hedging configuration
+HEDGED_EXTRACTION_ENABLED = os.getenv('HEDGED_EXTRACTION', 'false').lower() == 'true'
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', '0.9'))
+HEDGE_FALLBACK_MODEL = os.getenv('HEDGE_FALLBACK_MODEL', '')  # Empty = same model as primary
+
+# Deadline used until metrics_logs/ has enough runs, and bounds on the computed deadline
+HEDGE_DEFAULT_DEADLINE = float(os.getenv('HEDGE_DEFAULT_DEADLINE', '8.0'))
+HEDGE_MIN_DEADLINE = 1.0
+HEDGE_MAX_DEADLINE = 30.0
+
+
+def get_hedge_deadline(percentile: Optional[float] = None) -> float:
+    """
+    Seconds to wait for the primary call before firing the backup.
+
+    Args:
+        percentile: Latency percentile to use (default: HEDGE_PERCENTILE)
+
+    Returns:
+        Deadline in seconds, clamped to [HEDGE_MIN_DEADLINE, HEDGE_MAX_DEADLINE]
+    """
+    observed = get_latency_percentile(percentile if percentile is not None else HEDGE_PERCENTILE)
+    deadline = observed if observed is not None else HEDGE_DEFAULT_DEADLINE
+    return min(max(deadline, HEDGE_MIN_DEADLINE), HEDGE_MAX_DEADLINE)
+
+
+def _discard_reporter(label: str, used_result: Any, on_discard: Callable[[str, Any], None]):
+    """Future done-callback passing an unused result to on_discard."""
+    def report(future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if result is used_result:
+            return
+        try:
+            on_discard(label, result)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not record discarded hedged {label} result: {e}")
+    return report
+
+
+def hedged_call(
+    primary: Callable[[], Any],
+    backup: Callable[[], Any],
+    is_valid: Callable[[Any], bool],
+    deadline: Optional[float] = None,
+    on_discard: Optional[Callable[[str, Any], None]] = None
+) -> Dict:
+    """
+    Run `primary`, firing `backup` if no valid result arrives before the deadline.
+
+    A primary that fails or returns an invalid result before the deadline also
+    fires the backup immediately.
+
+    Args:
+        primary: Zero-argument callable for the primary request
+        backup: Zero-argument callable for the hedge request
+        is_valid: Returns True if a result is usable (e.g. schema-valid)
+        deadline: Seconds before hedging (default: get_hedge_deadline())
+        on_discard: Called with (label, result) for every call that returned a
+                    result which was not used, e.g. to record its token cost.
+                    A loser that is still running is reported from its worker
+                    thread when it finishes, after hedged_call has returned.
+
+    Returns:
+        Dict with:
+        {
+            "result": Any,              # Winning result (or last invalid result if none was valid)
+            "winner": str,              # "primary", "backup" or "none"
+            "hedged": bool,             # Whether the backup fired
+            "deadline": float,
+            "elapsed": float,           # Time until a result was chosen
+            "primary": {"status": str, "duration": float or None},  # None = still running
+            "backup": {"status": str, "duration": float or None}
+        }
+        Status is one of: won, lost, failed, invalid, cancelled, not_started, pending.
+
+    Raises:
+        Exception: The last error if both calls failed without any result
+    """
+    if deadline is None:
+        deadline = get_hedge_deadline()
+
+    start = time.time()
+    outcome = {
+        "result": None,
+        "winner": "none",
+        "hedged": False,
+        "deadline": round(deadline, 3),
+        "elapsed": 0.0,
+        "primary": {"status": "pending", "duration": None},
+        "backup": {"status": "not_started", "duration": None}
+    }
+
+    # Written by worker threads; a loser may still be running after we return
+    durations = {}
+
+    def timed(label, func):
+        def run():
+            call_start = time.time()
+            try:
+                return func()
+            finally:
+                durations[label] = round(time.time() - call_start, 3)
+        return run
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    futures = {executor.submit(timed("primary", primary)): "primary"}
+    fallback_result = None
+    last_error = None
+
+    try:
+        pending = set(futures)
+        while pending:
+            timeout = None
+            if not outcome["hedged"]:
+                timeout = max(0.0, deadline - (time.time() - start))
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                label = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    outcome[label]["status"] = "failed"
+                    last_error = e
+                    logger.warning(f"⚠️ Hedged {label} call failed: {e}")
+                    continue
+
+                if is_valid(result):
+                    outcome[label]["status"] = "won"
+                    outcome["winner"] = label
+                    outcome["result"] = result
+                    break
+                outcome[label]["status"] = "invalid"
+                fallback_result = result
+
+            if outcome["winner"] != "none":
+                break
+
+            # Deadline passed (or primary finished without a usable result): fire the hedge
+            if not outcome["hedged"]:
+                outcome["hedged"] = True
+                outcome["backup"]["status"] = "pending"
+                backup_future = executor.submit(timed("backup", backup))
+                futures[backup_future] = "backup"
+                pending.add(backup_future)
+                logger.info(f"⏱️  Hedging: primary not done after {time.time() - start:.2f}s "
+                            f"(deadline {deadline:.2f}s), firing backup request")
+
+        # Cancel or abandon the loser
+        for future, label in futures.items():
+            if outcome[label]["status"] == "pending":
+                outcome[label]["status"] = "cancelled" if future.cancel() else "lost"
+    finally:
+        # Don't block on a slow loser; its thread finishes in the background
+        executor.shutdown(wait=False)
+
+    outcome["elapsed"] = round(time.time() - start, 3)
+    for label in ("primary", "backup"):
+        outcome[label]["duration"] = durations.get(label)
+
+    if outcome["winner"] == "none":
+        if fallback_result is None and last_error is not None:
+            raise last_error
+        outcome["result"] = fallback_result
+
+    if on_discard is not None:
+        for future, label in futures.items():
+            future.add_done_callback(_discard_reporter(label, outcome["result"], on_discard))
+
+    logger.info(f"🏁 Hedged request: winner={outcome['winner']}, hedged={outcome['hedged']}, "
+                f"elapsed={outcome['elapsed']:.2f}s (primary {outcome['primary']['status']}, "
+                f"backup {outcome['backup']['status']})")
+    return outcome
@@ -0,0 +1,183 @@
+"""
+Keyframe Compositor Module
+==========================
+Cheap fade-in animations for concept reveals.
+
+Instead of redrawing the whole matplotlib figure for every animation step, the
+graph is rasterized twice per reveal: once without the new nodes (base) and
+once with them (target). Each step is then an alpha blend of the two images in
+NumPy, restricted to the pixels that actually change - milliseconds per frame
+instead of a full render.
+
+Frames are emitted either as a sequence of images pushed to a Streamlit
+placeholder (default), or as one animated GIF the browser plays by itself
+(FADE_IN_OUTPUT = "frames" | "gif"). GIF encoding takes longer on the server
+(roughly a second for a full-size figure) but sends a single message, which
+suits slow connections.
+"""
+
+import io
+import os
+import time
+import logging
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+logger = logging.getLogger(__name__)
+
+FADE_IN_OUTPUT = os.getenv('FADE_IN_OUTPUT', 'frames').lower()
+
+
+def rasterize(fig: plt.Figure) -> np.ndarray:
+    """
+    Draw a figure with the Agg canvas and return its pixels.
+
+    Args:
+        fig: Matplotlib figure (closed afterwards)
+
+    Returns:
+        uint8 array of shape (height, width, 4), RGBA
+    """
+    fig.canvas.draw()
+    pixels = np.array(fig.canvas.buffer_rgba(), dtype=np.uint8)
+    plt.close(fig)
+    return pixels
+
+
+class KeyframeCompositor:
+    """
+    Blends a base frame into a target frame.
+
+    The base figure's axes are given the target's limits before rasterizing,
+    so nodes do not move between the two keyframes.
+    """
+
+    def __init__(self, base_fig: plt.Figure, target_fig: plt.Figure):
+        """
+        Rasterize both keyframes.
+
+        Args:
+            base_fig: Graph without the nodes being revealed
+            target_fig: Graph with them (same figure size)
+        """
+        target_fig.canvas.draw()
+        for base_ax, target_ax in zip(base_fig.axes, target_fig.axes):
+            base_ax.set_xlim(target_ax.get_xlim())
+            base_ax.set_ylim(target_ax.get_ylim())
+            base_ax.set_position(target_ax.get_position())
+
+        self.target = rasterize(target_fig)
+        self.base = rasterize(base_fig)
+        if self.base.shape != self.target.shape:
+            raise ValueError(f"Keyframe sizes differ: {self.base.shape} vs {self.target.shape}")
+
+        # Only the bounding box of changed pixels is blended per frame
+        changed = np.any(self.base != self.target, axis=2)
+        rows = np.flatnonzero(changed.any(axis=1))
+        cols = np.flatnonzero(changed.any(axis=0))
+        if rows.size:
+            self.region = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+            self._base_region = self.base[self.region].astype(np.float32)
+            self._delta_region = self.target[self.region].astype(np.float32) - self._base_region
+        else:
+            self.region = None
+
+    def frame(self, alpha: float) -> np.ndarray:
+        """
+        Blended frame.
+
+        Args:
+            alpha: 0.0 = base, 1.0 = target
+
+        Returns:
+            uint8 RGBA array
+        """
+        if self.region is None or alpha >= 1.0:
+            return self.target
+        if alpha <= 0.0:
+            return self.base
+        frame = self.base.copy()
+        frame[self.region] = (self._base_region + self._delta_region * alpha + 0.5).astype(np.uint8)
+        return frame
+
+    def frames(self, steps: int) -> Iterator[np.ndarray]:
+        """Frames for alpha = 0, 1/steps, ..., 1 (steps + 1 frames)."""
+        for step in range(steps + 1):
+            yield self.frame(step / steps)
+
+    def to_animated_image(self, steps: int, duration: float) -> bytes:
+        """
+        Encode the fade-in as a GIF that plays once.
+
+        Args:
+            steps: Number of animation steps
+            duration: Total animation duration in seconds
+
+        Returns:
+            GIF bytes
+        """
+        from PIL import Image
+
+        # One shared palette (from the target); only the changed region is
+        # quantized per frame and pasted over the quantized base
+        palette = Image.fromarray(self.target[:, :, :3]).quantize(colors=256)
+        base = Image.fromarray(self.base[:, :, :3]).quantize(palette=palette, dither=Image.Dither.NONE)
+
+        images = []
+        for step in range(steps + 1):
+            image = base.copy()
+            if self.region is not None:
+                rows, cols = self.region
+                patch = Image.fromarray(np.ascontiguousarray(self.frame(step / steps)[rows, cols, :3]))
+                image.paste(patch.quantize(palette=palette, dither=Image.Dither.NONE), (cols.start, rows.start))
+            images.append(image)
+
+        buffer = io.BytesIO()
+        images[0].save(
+            buffer, format='GIF', save_all=True, append_images=images[1:],
+            duration=max(20, int(duration * 1000 / steps))
+        )
+        return buffer.getvalue()
+
+
+def play_fade_in(
+    placeholder,
+    base_fig: plt.Figure,
+    target_fig: plt.Figure,
+    duration: float = 0.8,
+    steps: int = 15,
+    sleep: Callable[[float], None] = time.sleep,
+    output: Optional[str] = None
+) -> np.ndarray:
+    """
+    Show a fade-in from base_fig to target_fig in a Streamlit placeholder.
+
+    Args:
+        placeholder: Streamlit placeholder (st.empty())
+        base_fig: Graph before the reveal
+        target_fig: Graph after the reveal
+        duration: Animation duration in seconds
+        steps: Number of animation steps
+        sleep: Sleep function (e.g. a playback clock's sleep)
+        output: "frames" or "gif" (default: FADE_IN_OUTPUT)
+
+    Returns:
+        Final frame (the fully revealed graph)
+    """
+    compose_start = time.time()
+    compositor = KeyframeCompositor(base_fig, target_fig)
+    logger.debug(f"Keyframes rasterized in {time.time() - compose_start:.3f}s")
+
+    if (output or FADE_IN_OUTPUT) == "gif":
+        placeholder.image(compositor.to_animated_image(steps, duration), use_container_width=True)
+        sleep(duration)
+        return compositor.target
+
+    for step, frame in enumerate(compositor.frames(steps)):
+        # RGB only: Streamlit sends alpha-free arrays as JPEG, which encodes faster
+        placeholder.image(frame[:, :, :3], use_container_width=True)
+        if step < steps:
+            sleep(duration / steps)
+    return compositor.target
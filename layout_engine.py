@@ -0,0 +1,711 @@
+"""
+Layout Engine Module
+====================
+Node placement for concept maps, selected by layout_style.
+
+Styles:
+- "hierarchical": layered (Sugiyama-style) - cycle removal, longest-path layers,
+                  dummy nodes for long edges, barycenter crossing minimization
+- "radial":       roots in the center, BFS depth rings, subtrees in wedges
+- "force":        force-directed (Fruchterman-Reingold) in NumPy; Barnes-Hut
+                  quadtree repulsion for large graphs ("spring" is an alias)
+- "grid":         the original Smart Grid (root on top, 3 columns)
+- "incremental":  nodes inserted in reveal_time order next to their already
+                  placed neighbors; earlier nodes never move far, so a partial
+                  timeline gets the same positions as the full one
+- "shell", "circular", "kamada-kawai": NetworkX layouts
+
+Every layout accepts a networkx.DiGraph or a concept_graph.ConceptGraph (the
+NetworkX styles convert the latter on demand).
+
+Layouts are cached in memory by graph fingerprint (style, nodes, edges and the
+node order hints), so re-rendering the same map never recomputes positions.
+"""
+
+import os
+import math
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+from concept_graph import ConceptGraph
+from records import ConceptTable
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_STYLES = ["hierarchical", "radial", "force", "incremental", "grid", "shell", "circular", "kamada-kawai", "spring"]
+
+# Spacing in layout units (matches the Smart Grid: 8 between columns, 7 between rows)
+NODE_SPACING = 8.0
+LAYER_SPACING = 7.0
+
+# Use Barnes-Hut repulsion above this many nodes (exact O(n^2) below)
+BARNES_HUT_THRESHOLD = int(os.getenv('BARNES_HUT_THRESHOLD', '200'))
+BARNES_HUT_THETA = 0.8
+
+LAYOUT_CACHE_SIZE = int(os.getenv('LAYOUT_CACHE_SIZE', '128'))
+
+Positions = Dict[str, Tuple[float, float]]
+
+
+# ----------------------------------------------------------------------
+# Smart Grid (original layout)
+# ----------------------------------------------------------------------
+
+def _concept_table(concepts) -> ConceptTable:
+    """Concept dicts (or an already built ConceptTable) indexed by name."""
+    return ConceptTable.coerce(concepts)
+
+
+def _roots(G: nx.DiGraph) -> List[str]:
+    roots = [n for n in G.nodes() if G.in_degree(n) == 0]
+    if not roots and G.number_of_nodes():
+        logger.warning("⚠️ No root node found, using first node")
+        roots = [next(iter(G.nodes()))]
+    return roots
+
+
+def grid_layout(G: nx.DiGraph, concepts: Optional[List[Dict]] = None) -> Positions:
+    """
+    Smart Grid Layout.
+
+    - Root node at top center (0, 0)
+    - 3 columns: x = -8, 0, +8
+    - Sequential fill by importance: left-to-right, top-to-bottom
+    - Vertical spacing: -7, -14, -21, -28...
+    """
+    COLUMNS = 3
+    COL_X_POSITIONS = [-8.0, 0.0, 8.0]
+
+    pos = {}
+    root_nodes = _roots(G)[:1]
+    if root_nodes:
+        pos[root_nodes[0]] = (0.0, 0.0)
+
+    # Further roots go into the grid with the other nodes
+    table = _concept_table(concepts)
+    non_root_nodes = sorted(
+        (n for n in G.nodes() if n not in root_nodes),
+        key=table.score,
+        reverse=True
+    )
+    for idx, node in enumerate(non_root_nodes):
+        row = idx // COLUMNS + 1  # +1 because root is at row 0
+        pos[node] = (COL_X_POSITIONS[idx % COLUMNS], -row * LAYER_SPACING)
+    return pos
+
+
+# ----------------------------------------------------------------------
+# Layered (Sugiyama-style)
+# ----------------------------------------------------------------------
+
+def _acyclic_edges(G: nx.DiGraph, order: List[str]) -> List[Tuple[str, str]]:
+    """Edges with DFS back edges reversed (self-loops dropped)."""
+    index = {n: i for i, n in enumerate(order)}
+    state = {}  # 1 = on stack, 2 = done
+    reversed_edges = set()
+
+    for start in order:
+        if start in state:
+            continue
+        stack = [(start, iter(sorted(G.successors(start), key=index.get)))]
+        state[start] = 1
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child == node:
+                    continue
+                if state.get(child) == 1:
+                    reversed_edges.add((node, child))
+                elif child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(sorted(G.successors(child), key=index.get))))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+
+    edges = []
+    for u, v in G.edges():
+        if u == v:
+            continue
+        edges.append((v, u) if (u, v) in reversed_edges else (u, v))
+    return edges
+
+
+def _count_crossings(upper: List, lower: List, edges_down: Dict) -> int:
+    """Edge crossings between two adjacent layers (inversion count)."""
+    position = {n: i for i, n in enumerate(lower)}
+    targets = [position[v] for u in upper for v in sorted(edges_down.get(u, ()), key=position.get)]
+    crossings = 0
+    for i in range(len(targets)):
+        for j in range(i + 1, len(targets)):
+            if targets[j] < targets[i]:
+                crossings += 1
+    return crossings
+
+
+def layered_layout(G: nx.DiGraph, concepts: Optional[List[Dict]] = None, sweeps: int = 8) -> Positions:
+    """
+    Sugiyama-style layered layout.
+
+    Args:
+        G: Directed graph (a ConceptGraph supplies its precomputed layering)
+        concepts: Concept dicts (importance sets the initial order within layers)
+        sweeps: Down/up barycenter sweeps for crossing minimization
+
+    Returns:
+        Node positions (layer 0 at y = 0, growing downward)
+    """
+    if isinstance(G, ConceptGraph):
+        # Importance order, cycle breaking and longest-path levels were
+        # computed once when the graph was built
+        names = G.names
+        order = [names[i] for i in G.importance_order]
+        edges = [(names[u], names[v]) for u, v in G.layer_edges]
+        layer = {names[i]: level for i, level in enumerate(G.levels)}
+    else:
+        table = _concept_table(concepts)
+        order = sorted(G.nodes(), key=lambda n: -table.score(n))
+        edges = _acyclic_edges(G, order)
+
+        # 1. Longest-path layering
+        successors = {n: [] for n in order}
+        in_degree = {n: 0 for n in order}
+        for u, v in edges:
+            successors[u].append(v)
+            in_degree[v] += 1
+        layer = {n: 0 for n in order}
+        queue = deque(n for n in order if in_degree[n] == 0)
+        while queue:
+            node = queue.popleft()
+            for child in successors[node]:
+                layer[child] = max(layer[child], layer[node] + 1)
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    queue.append(child)
+
+    # 2. Dummy nodes so every edge spans exactly one layer
+    down = {n: [] for n in order}
+    up = {n: [] for n in order}
+    dummy_count = 0
+    for u, v in edges:
+        previous = u
+        for level in range(layer[u] + 1, layer[v]):
+            dummy = ("__dummy__", dummy_count)
+            dummy_count += 1
+            layer[dummy] = level
+            down[dummy], up[dummy] = [], []
+            down[previous].append(dummy)
+            up[dummy].append(previous)
+            previous = dummy
+        down[previous].append(v)
+        up[v].append(previous)
+
+    layers = [[] for _ in range(max(layer.values(), default=-1) + 1)]
+    for node in list(order) + [n for n in layer if isinstance(n, tuple)]:
+        layers[layer[node]].append(node)
+
+    # 3. Crossing minimization: barycenter sweeps, keep the best ordering
+    def total_crossings(candidate):
+        return sum(_count_crossings(candidate[i], candidate[i + 1], down) for i in range(len(candidate) - 1))
+
+    def reorder(layer_nodes, neighbors, reference):
+        position = {n: i for i, n in enumerate(reference)}
+        keyed = []
+        for i, node in enumerate(layer_nodes):
+            linked = [position[m] for m in neighbors[node] if m in position]
+            keyed.append((sum(linked) / len(linked) if linked else i, i, node))
+        return [node for _, _, node in sorted(keyed)]
+
+    best = [list(l) for l in layers]
+    best_crossings = total_crossings(best)
+    for sweep in range(sweeps):
+        if best_crossings == 0:
+            break
+        if sweep % 2 == 0:
+            for i in range(1, len(layers)):
+                layers[i] = reorder(layers[i], up, layers[i - 1])
+        else:
+            for i in range(len(layers) - 2, -1, -1):
+                layers[i] = reorder(layers[i], down, layers[i + 1])
+        crossings = total_crossings(layers)
+        if crossings < best_crossings:
+            best, best_crossings = [list(l) for l in layers], crossings
+    layers = best
+
+    # 4. Coordinates: start evenly spaced, then pull nodes toward their
+    #    neighbors' mean x while keeping order and minimum spacing
+    x = {}
+    for layer_nodes in layers:
+        offset = (len(layer_nodes) - 1) / 2.0
+        for i, node in enumerate(layer_nodes):
+            x[node] = (i - offset) * NODE_SPACING
+
+    for iteration in range(4):
+        sequence = range(1, len(layers)) if iteration % 2 == 0 else range(len(layers) - 2, -1, -1)
+        neighbors = up if iteration % 2 == 0 else down
+        for i in sequence:
+            layer_nodes = layers[i]
+            desired = [
+                sum(x[m] for m in neighbors[n]) / len(neighbors[n]) if neighbors[n] else x[n]
+                for n in layer_nodes
+            ]
+            # Enforce spacing left-to-right, then right-to-left, and average
+            left = list(desired)
+            for j in range(1, len(left)):
+                left[j] = max(left[j], left[j - 1] + NODE_SPACING)
+            right = list(desired)
+            for j in range(len(right) - 2, -1, -1):
+                right[j] = min(right[j], right[j + 1] - NODE_SPACING)
+            for j, node in enumerate(layer_nodes):
+                x[node] = (left[j] + right[j]) / 2.0
+            # Averaging can break spacing slightly: one final left-to-right pass
+            for j in range(1, len(layer_nodes)):
+                x[layer_nodes[j]] = max(x[layer_nodes[j]], x[layer_nodes[j - 1]] + NODE_SPACING)
+
+    # Center the drawing on the first layer
+    shift = sum(x[n] for n in layers[0]) / len(layers[0]) if layers and layers[0] else 0.0
+    logger.info(f"  🔀 Layered layout: {len(layers)} layers, {dummy_count} dummy nodes, {best_crossings} crossings")
+    return {n: (x[n] - shift, -layer[n] * LAYER_SPACING) for n in order}
+
+
+# ----------------------------------------------------------------------
+# Radial
+# ----------------------------------------------------------------------
+
+def radial_layout(G: nx.DiGraph, concepts: Optional[List[Dict]] = None) -> Positions:
+    """
+    Radial tree layout: roots in the center, BFS depth as rings.
+
+    Each node gets an angular wedge proportional to the number of leaves
+    below it in the BFS tree, so subtrees do not interleave.
+    """
+    table = _concept_table(concepts)
+    by_importance = lambda n: -table.score(n)
+    neighbors_of = lambda n: dict.fromkeys([*G.predecessors(n), *G.successors(n)])
+
+    roots = sorted(_roots(G), key=by_importance)
+    children = {}
+    depth = {}
+    top_level = []
+    for start in roots + sorted(G.nodes(), key=by_importance):
+        if start in depth:
+            continue
+        # Each BFS tree (one per root / disconnected component) hangs off the center
+        top_level.append(start)
+        depth[start] = 1 if len(roots) > 1 or start not in roots else 0
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            children[node] = []
+            for neighbor in sorted(neighbors_of(node), key=by_importance):
+                if neighbor not in depth:
+                    depth[neighbor] = depth[node] + 1
+                    children[node].append(neighbor)
+                    queue.append(neighbor)
+
+    leaves = {}
+
+    def count_leaves(node):
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if expanded:
+                leaves[current] = sum(leaves[c] for c in children[current]) or 1
+            else:
+                stack.append((current, True))
+                stack.extend((c, False) for c in children[current])
+
+    for node in top_level:
+        count_leaves(node)
+
+    pos = {}
+    total = sum(leaves[n] for n in top_level) or 1
+    stack = []
+    start_angle = 0.0
+    for node in top_level:
+        span = 2 * math.pi * leaves[node] / total
+        stack.append((node, start_angle, span))
+        start_angle += span
+    while stack:
+        node, angle, span = stack.pop()
+        radius = depth[node] * NODE_SPACING
+        center = angle + span / 2
+        pos[node] = (radius * math.cos(center), radius * math.sin(center))
+        child_angle = angle
+        for child in children[node]:
+            child_span = span * leaves[child] / leaves[node]
+            stack.append((child, child_angle, child_span))
+            child_angle += child_span
+    return pos
+
+
+# ----------------------------------------------------------------------
+# Force-directed (Fruchterman-Reingold, optional Barnes-Hut)
+# ----------------------------------------------------------------------
+
+class _QuadTree:
+    """Array-backed quadtree with per-cell mass and center of mass."""
+
+    def __init__(self, points: np.ndarray, max_depth: int = 16):
+        self.com = []
+        self.mass = []
+        self.size = []
+        self.children = []
+        lo = points.min(axis=0)
+        side = float(max((points.max(axis=0) - lo).max(), 1e-9))
+        self._build(points, np.arange(len(points)), lo, side, 0, max_depth)
+        self.com = np.array(self.com)
+        self.mass = np.array(self.mass, dtype=float)
+        self.size = np.array(self.size)
+        self.children = np.array(self.children, dtype=np.int64)
+
+    def _build(self, points, indices, lo, side, depth, max_depth) -> int:
+        cell = len(self.mass)
+        self.com.append(points[indices].mean(axis=0))
+        self.mass.append(len(indices))
+        self.size.append(side)
+        self.children.append([-1, -1, -1, -1])
+        if len(indices) > 1 and depth < max_depth:
+            half = side / 2
+            mid = lo + half
+            right = points[indices, 0] >= mid[0]
+            top = points[indices, 1] >= mid[1]
+            for quadrant, mask in enumerate((~right & ~top, right & ~top, ~right & top, right & top)):
+                if mask.any():
+                    child_lo = lo + half * np.array([quadrant & 1, quadrant >> 1])
+                    self.children[cell][quadrant] = self._build(
+                        points, indices[mask], child_lo, half, depth + 1, max_depth
+                    )
+        return cell
+
+
+def _barnes_hut_repulsion(pos: np.ndarray, k: float, theta: float = BARNES_HUT_THETA) -> np.ndarray:
+    """
+    Repulsive displacement k^2/d per node, approximating far cells by their
+    center of mass. The traversal is vectorized over (node, cell) pairs.
+    """
+    tree = _QuadTree(pos)
+    force = np.zeros_like(pos)
+    nodes = np.arange(len(pos))
+    cells = np.zeros(len(pos), dtype=np.int64)
+
+    while nodes.size:
+        delta = pos[nodes] - tree.com[cells]
+        distance = np.sqrt((delta ** 2).sum(axis=1))
+        is_leaf = (tree.children[cells] < 0).all(axis=1)
+        accept = is_leaf | (tree.size[cells] < theta * distance)
+
+        # Accepted cells push with their whole mass (a leaf holding the node itself has d = 0)
+        hit = accept & (distance > 1e-9)
+        contribution = delta[hit] * (tree.mass[cells[hit]] * k * k / distance[hit] ** 2)[:, None]
+        np.add.at(force, nodes[hit], contribution)
+
+        # Open the remaining cells
+        open_nodes = nodes[~accept]
+        open_children = tree.children[cells[~accept]]
+        valid = open_children >= 0
+        nodes = np.repeat(open_nodes, valid.sum(axis=1))
+        cells = open_children[valid]
+    return force
+
+
+def _exact_repulsion(pos: np.ndarray, k: float) -> np.ndarray:
+    delta = pos[:, None, :] - pos[None, :, :]
+    distance_sq = (delta ** 2).sum(axis=2)
+    np.fill_diagonal(distance_sq, np.inf)
+    return (delta * (k * k / np.maximum(distance_sq, 1e-9))[:, :, None]).sum(axis=1)
+
+
+def force_layout(G: nx.DiGraph, concepts: Optional[List[Dict]] = None, iterations: Optional[int] = None,
+                 seed: int = 42, initial: Optional[Positions] = None) -> Positions:
+    """
+    Force-directed layout (Fruchterman-Reingold) vectorized in NumPy.
+
+    Repulsion is exact below BARNES_HUT_THRESHOLD nodes and Barnes-Hut
+    (O(n log n)) above it. Ideal edge length is NODE_SPACING.
+
+    Args:
+        G: Graph (edge direction is ignored)
+        concepts: Unused (accepted for a uniform layout signature)
+        iterations: Simulation steps (default: 100, 50 for large graphs)
+        seed: Random seed for the initial placement
+        initial: Starting positions for some or all nodes
+
+    Returns:
+        Node positions
+    """
+    nodes = list(G.nodes())
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: (0.0, 0.0)}
+
+    index = {node: i for i, node in enumerate(nodes)}
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1.0, 1.0, size=(n, 2)) * math.sqrt(n)
+    if initial:
+        for node, xy in initial.items():
+            if node in index:
+                pos[index[node]] = np.asarray(xy, dtype=float) / NODE_SPACING
+
+    edge_array = np.array([(index[u], index[v]) for u, v in G.edges() if u != v], dtype=np.int64).reshape(-1, 2)
+    use_barnes_hut = n > BARNES_HUT_THRESHOLD
+    iterations = iterations or (50 if use_barnes_hut else 100)
+    k = 1.0
+    temperature = math.sqrt(n) / 2
+
+    for _ in range(iterations):
+        displacement = _barnes_hut_repulsion(pos, k) if use_barnes_hut else _exact_repulsion(pos, k)
+
+        if len(edge_array):
+            delta = pos[edge_array[:, 0]] - pos[edge_array[:, 1]]
+            distance = np.sqrt((delta ** 2).sum(axis=1))[:, None]
+            pull = delta * distance / k
+            np.add.at(displacement, edge_array[:, 0], -pull)
+            np.add.at(displacement, edge_array[:, 1], pull)
+
+        # Weak gravity keeps disconnected components together
+        displacement -= pos * 0.05
+
+        length = np.sqrt((displacement ** 2).sum(axis=1))[:, None]
+        pos += displacement / np.maximum(length, 1e-9) * np.minimum(length, temperature)
+        temperature = max(temperature * 0.95, 0.01)
+
+    pos -= pos.mean(axis=0)
+    pos *= NODE_SPACING
+    return {node: (float(pos[i, 0]), float(pos[i, 1])) for i, node in enumerate(nodes)}
+
+
+# ----------------------------------------------------------------------
+# Incremental (stable under insertion)
+# ----------------------------------------------------------------------
+
+# Candidate offsets around an anchor, in units of NODE_SPACING: straight
+# below first (reads top-down like the other layouts), then sideways, then up
+_RING_OFFSETS = [(0, -1), (-1, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (1, 1), (0, 1)]
+
+
+class IncrementalLayout:
+    """
+    Places nodes one at a time without moving the rest of the graph.
+
+    A new node goes to the first free slot around the mean position of its
+    already placed neighbors (or next to the last free-standing node if it
+    has none). Occupancy is tracked in a spatial hash with NODE_SPACING cells,
+    so an insertion costs O(degree) plus a bounded slot search - independent
+    of the number of placed nodes. The only adjustment to existing nodes is a
+    small push-apart of placed neighbors that ended up closer than
+    NODE_SPACING.
+    """
+
+    def __init__(self, initial: Optional[Positions] = None, spacing: float = NODE_SPACING):
+        """
+        Args:
+            initial: Positions to keep (e.g. the layout of a previous timeline)
+            spacing: Minimum distance between nodes
+        """
+        self.spacing = spacing
+        self.positions = {}
+        self._cells = {}
+        self._next_root = (0.0, 0.0)
+        for node, xy in (initial or {}).items():
+            self._place(node, (float(xy[0]), float(xy[1])))
+            self._next_root = (min(self._next_root[0], float(xy[0])), min(self._next_root[1], float(xy[1])))
+        if initial:
+            self._next_root = (self._next_root[0] - 2 * spacing, self._next_root[1])
+
+    def _cell(self, xy: Tuple[float, float]) -> Tuple[int, int]:
+        return (math.floor(xy[0] / self.spacing), math.floor(xy[1] / self.spacing))
+
+    def _place(self, node: str, xy: Tuple[float, float]):
+        old = self.positions.get(node)
+        if old is not None:
+            self._cells.get(self._cell(old), set()).discard(node)
+        self.positions[node] = xy
+        self._cells.setdefault(self._cell(xy), set()).add(node)
+
+    def _too_close(self, xy: Tuple[float, float], ignore: Optional[str] = None) -> bool:
+        cx, cy = self._cell(xy)
+        limit = (self.spacing * 0.99) ** 2
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in self._cells.get((cx + dx, cy + dy), ()):
+                    if other == ignore:
+                        continue
+                    ox, oy = self.positions[other]
+                    if (ox - xy[0]) ** 2 + (oy - xy[1]) ** 2 < limit:
+                        return True
+        return False
+
+    def _free_slot(self, anchor: Tuple[float, float], max_rings: int = 64) -> Tuple[float, float]:
+        for ring in range(1, max_rings + 1):
+            for ox, oy in _RING_OFFSETS:
+                candidate = (anchor[0] + ox * ring * self.spacing, anchor[1] + oy * ring * self.spacing)
+                if not self._too_close(candidate):
+                    return candidate
+        return (anchor[0], anchor[1] - (max_rings + 1) * self.spacing)
+
+    def insert(self, node: str, neighbors=()) -> Tuple[float, float]:
+        """
+        Place a node (no-op if it is already placed).
+
+        Args:
+            node: Node name
+            neighbors: Nodes it is connected to (unplaced ones are ignored)
+
+        Returns:
+            The node's (x, y)
+        """
+        if node in self.positions:
+            return self.positions[node]
+
+        placed = [self.positions[n] for n in neighbors if n in self.positions]
+        if placed:
+            anchor = (sum(p[0] for p in placed) / len(placed), sum(p[1] for p in placed) / len(placed))
+            xy = anchor if not self._too_close(anchor) else self._free_slot(anchor)
+        else:
+            # Unconnected so far: start a new group to the right of the previous one
+            xy = self._next_root if not self._too_close(self._next_root) else self._free_slot(self._next_root)
+            self._next_root = (xy[0] + 2 * self.spacing, xy[1])
+        self._place(node, xy)
+
+        # Local adjustment: push placed neighbors that now overlap one step away
+        for neighbor in neighbors:
+            if neighbor in self.positions and neighbor != node and self._too_close(self.positions[neighbor], ignore=neighbor):
+                self._place(neighbor, self._free_slot(self.positions[neighbor], max_rings=2))
+        return xy
+
+
+def incremental_layout(G: nx.DiGraph, concepts: Optional[List[Dict]] = None,
+                       initial: Optional[Positions] = None) -> Positions:
+    """
+    Insert nodes in reveal_time order (ties by importance) with IncrementalLayout.
+
+    Args:
+        G: Directed concept graph
+        concepts: Concept dicts with reveal_time / importance
+        initial: Existing positions to keep
+
+    Returns:
+        Node positions
+    """
+    table = _concept_table(concepts)
+
+    def insertion_key(node):
+        record = table.get(node)
+        if record is None:
+            return (float('inf'), 0.0)
+        return (record.reveal_time or 0.0, -record.score)
+
+    order = sorted(G.nodes(), key=insertion_key)
+
+    layout = IncrementalLayout(initial={n: xy for n, xy in (initial or {}).items() if n in G})
+    for node in order:
+        layout.insert(node, list(G.predecessors(node)) + list(G.successors(node)))
+    return dict(layout.positions)
+
+
+# ----------------------------------------------------------------------
+# Dispatch + cache
+# ----------------------------------------------------------------------
+
+def _networkx_layout(style: str):
+    def layout(G: nx.DiGraph, concepts: Optional[List[Dict]] = None) -> Positions:
+        if hasattr(G, 'to_networkx'):
+            G = G.to_networkx()
+        if style == "shell":
+            raw = nx.shell_layout(G)
+        elif style == "circular":
+            raw = nx.circular_layout(G)
+        else:
+            raw = nx.kamada_kawai_layout(G)
+        scale = NODE_SPACING * max(1.0, math.sqrt(G.number_of_nodes()) / 2)
+        return {node: (float(xy[0]) * scale, float(xy[1]) * scale) for node, xy in raw.items()}
+    return layout
+
+
+_LAYOUTS = {
+    "hierarchical": layered_layout,
+    "layered": layered_layout,
+    "radial": radial_layout,
+    "force": force_layout,
+    "spring": force_layout,
+    "grid": grid_layout,
+    "incremental": incremental_layout,
+    "shell": _networkx_layout("shell"),
+    "circular": _networkx_layout("circular"),
+    "kamada-kawai": _networkx_layout("kamada-kawai"),
+}
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def graph_fingerprint(G: nx.DiGraph, style: str, concepts: Optional[List[Dict]] = None) -> str:
+    """Hash of the layout inputs: style, nodes, edges, node importance and reveal order."""
+    table = _concept_table(concepts)
+    digest = hashlib.sha256()
+    digest.update(style.encode('utf-8'))
+    for node in sorted(G.nodes(), key=str):
+        digest.update(f"\x00n{node}\x01{table.score(node, 0)}\x01{table.reveal_time(node)}".encode('utf-8'))
+    for u, v in sorted(G.edges(), key=lambda e: (str(e[0]), str(e[1]))):
+        digest.update(f"\x00e{u}\x01{v}".encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+def compute_layout(G: nx.DiGraph, style: str = "hierarchical", concepts: Optional[List[Dict]] = None,
+                   use_cache: bool = True, previous: Optional[Positions] = None) -> Positions:
+    """
+    Node positions for a graph in the given layout style.
+
+    Args:
+        G: Directed concept graph
+        style: One of LAYOUT_STYLES (unknown styles fall back to "hierarchical")
+        concepts: Concept dicts or a records.ConceptTable (importance is used for ordering)
+        use_cache: Reuse positions computed for an identical graph
+        previous: Positions to keep for the "incremental" style (e.g. the layout
+                  before an edit); bypasses the cache
+
+    Returns:
+        Dict mapping node names to (x, y) tuples
+    """
+    if style not in _LAYOUTS:
+        logger.warning(f"⚠️ Unknown layout style '{style}', using hierarchical")
+        style = "hierarchical"
+    if G.number_of_nodes() == 0:
+        return {}
+
+    # Index the concepts once; every layout and the fingerprint share it
+    concepts = _concept_table(concepts)
+
+    if style == "incremental" and previous:
+        return incremental_layout(G, concepts, initial=previous)
+
+    key = graph_fingerprint(G, style, concepts) if use_cache else None
+    if key:
+        with _cache_lock:
+            if key in _cache:
+                _cache.move_to_end(key)
+                logger.info(f"♻️  Layout cache hit ({style}, {G.number_of_nodes()} nodes)")
+                return dict(_cache[key])
+
+    try:
+        pos = _LAYOUTS[style](G, concepts)
+    except Exception as e:
+        logger.warning(f"⚠️ {style} layout failed ({e}), using force-directed layout")
+        pos = force_layout(G, concepts)
+
+    if key:
+        with _cache_lock:
+            _cache[key] = dict(pos)
+            while len(_cache) > LAYOUT_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return pos
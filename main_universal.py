@@ -10,10 +10,18 @@ import json
 import logging
 import argparse
 import sys
+import math
+import time
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from graph import create_description_based_concept_map_graph, print_description_based_workflow_summary
+from graph import (
+    create_description_based_concept_map_graph,
+    create_parallel_concept_map_graph,
+    print_description_based_workflow_summary,
+    print_parallel_workflow_summary
+)
 from states import ConceptMapState
 from description_analyzer import extract_topic_name_from_description
 from graph_visualizer import ConceptMapVisualizer
@@ -49,7 +57,40 @@ def get_educational_levels():
     ]
 
 
-def run_description_based_concept_mapping(description, educational_level="high school", topic_name=None, tts_enabled=True):
+def build_initial_state(description, educational_level, topic_name):
+    """
+    Create the initial workflow state for a description
+    
+    Args:
+        description (str): The description text to analyze
+        educational_level (str): Target educational level
+        topic_name (str): Topic name
+        
+    Returns:
+        ConceptMapState: Initial state
+    """
+    return ConceptMapState(
+        description=description,
+        educational_level=educational_level,
+        topic_name=topic_name,
+        description_analysis={},
+        complexity_config={},
+        extracted_concepts=[],
+        concept_relationships=[],
+        concept_hierarchy=[],
+        enriched_concepts={},
+        learning_objectives=[],
+        teaching_strategies=[],
+        # Deprecated legacy fields are filled once by the initialize_legacy node
+        processing_log=[],
+        errors=[],
+        success=True,
+        timestamp=datetime.now().isoformat()
+    )
+
+
+def run_description_based_concept_mapping(description, educational_level="high school", topic_name=None, tts_enabled=True,
+                                          parallel_nodes=False, checkpoint=False, thread_id=None):
     """
     Run the description-based concept mapping workflow
     
@@ -58,20 +99,28 @@ def run_description_based_concept_mapping(description, educational_level="high s
         educational_level (str): Target educational level (default: "high school") 
         topic_name (str): Optional topic name (auto-extracted if None)
         tts_enabled (bool): Enable text-to-speech narration (default: True - always enabled)
+        parallel_nodes (bool): Run the async 4-node workflow with parallel branches instead
+                               of the single combined extraction call (default: False)
+        checkpoint (bool): Checkpoint the workflow after each node and reuse/resume an
+                           earlier run of the same thread (default: False)
+        thread_id (str): Checkpoint thread ID (default: derived from description and level)
     """
     
     print("🚀 Description-Based LLM-Powered Concept Map Teaching Agent")
     print("=" * 70)
-    print_description_based_workflow_summary()
+    if parallel_nodes:
+        print_parallel_workflow_summary()
+    else:
+        print_description_based_workflow_summary()
     
-    # Text-to-Speech narration (if enabled)
+    # Text-to-Speech narration (if enabled) runs in its own process while the
+    # workflow extracts concepts; results are printed once both have finished
+    narration = None
     if tts_enabled:
         try:
-            from tts_handler import TTSHandler
-            logger.info("🎤 Text-to-Speech enabled - Starting narration...")
-            tts = TTSHandler(rate=190, volume=0.9)  # Faster speech rate
-            tts.speak_text_sentence_by_sentence(description, pause_duration=1.0)
-            logger.info("✅ Narration complete - Proceeding to concept map generation...")
+            from tts_handler import NarrationProcess
+            logger.info("🎤 Text-to-Speech enabled - Starting narration in the background...")
+            narration = NarrationProcess(description, rate=190, volume=0.9, pause_duration=1.0).start()  # Faster speech rate
         except ImportError:
             logger.warning("⚠️  pyttsx3 not installed. Install with: pip install pyttsx3")
             logger.info("Continuing without text-to-speech...")
@@ -84,30 +133,7 @@ def run_description_based_concept_mapping(description, educational_level="high s
         topic_name = extract_topic_name_from_description(description)
     
     # Initialize state for new description-based approach
-    initial_state = ConceptMapState(
-        description=description,
-        educational_level=educational_level,
-        topic_name=topic_name,
-        description_analysis={},
-        complexity_config={},
-        extracted_concepts=[],
-        concept_relationships=[],
-        concept_hierarchy=[],
-        enriched_concepts={},
-        learning_objectives=[],
-        teaching_strategies=[],
-        # Legacy fields for backward compatibility
-        raw_subtopics=[],
-        subtopic_concepts={},
-        key_concepts_per_subtopic={},
-        subtopic_hierarchies={},
-        cross_subtopic_links=[],
-        enriched_subtopics={},
-        processing_log=[],
-        errors=[],
-        success=True,
-        timestamp=datetime.now().isoformat()
-    )
+    initial_state = build_initial_state(description, educational_level, topic_name)
     
     try:
         # Reset token tracker for this run
@@ -116,8 +142,24 @@ def run_description_based_concept_mapping(description, educational_level="high s
         # Create and run the new workflow
         logger.info("🔄 Starting description-based concept mapping workflow...")
         
-        workflow = create_description_based_concept_map_graph()
-        final_state = workflow.invoke(initial_state)
+        if parallel_nodes:
+            if checkpoint:
+                logger.warning("⚠️  Checkpointing covers the synchronous workflow only - running without checkpoints")
+            workflow = create_parallel_concept_map_graph()
+            final_state = asyncio.run(workflow.ainvoke(initial_state))
+        elif checkpoint:
+            from checkpointing import get_checkpointer, thread_id_for, run_checkpointed
+            workflow = create_description_based_concept_map_graph(checkpointer=get_checkpointer())
+            final_state, _ = run_checkpointed(
+                workflow, initial_state, thread_id or thread_id_for(description, educational_level)
+            )
+        else:
+            workflow = create_description_based_concept_map_graph()
+            final_state = workflow.invoke(initial_state)
+        
+        if narration is not None and narration.is_alive():
+            logger.info("⏳ Concept map ready - waiting for narration to finish...")
+            narration.join()
         
         # Log token usage summary
         get_tracker().log_summary()
@@ -136,6 +178,186 @@ def run_description_based_concept_mapping(description, educational_level="high s
     except Exception as e:
         logger.error(f"❌ Error in workflow: {e}")
         return None
+    
+    finally:
+        # Workflow failed or was interrupted: stop narrating
+        if narration is not None and narration.is_alive():
+            narration.cancel()
+            narration.join(timeout=5.0)
+
+
+def _read_batch_items(input_path, educational_level):
+    """
+    Stream batch items from a JSONL file
+    
+    Yields:
+        tuple: (line_number, item dict or None, error message or None)
+    """
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+                description = item.get('description', '').strip()
+            except (json.JSONDecodeError, AttributeError) as e:
+                yield line_number, None, f"invalid JSON ({e})"
+                continue
+            if not description:
+                yield line_number, None, "missing description"
+                continue
+            item['description'] = description
+            item['level'] = item.get('level', educational_level)
+            yield line_number, item, None
+
+
+def _run_batch_item(workflow, item):
+    """
+    Run one batch description (in a worker thread)
+    
+    Returns:
+        dict: status, final_state, latency and token count for the item
+    """
+    from checkpointing import thread_id_for, run_checkpointed, STATUS_COMPLETED
+    from token_tracker import TokenTracker, track_tokens
+    
+    description = item['description']
+    level = item['level']
+    thread_id = item.get('thread_id') or thread_id_for(description, level)
+    topic_name = item.get('topic') or extract_topic_name_from_description(description)
+    
+    start_time = time.time()
+    with track_tokens(TokenTracker(thread_id)) as tracker:
+        final_state, previous_status = run_checkpointed(
+            workflow, build_initial_state(description, level, topic_name), thread_id
+        )
+    
+    if previous_status == STATUS_COMPLETED:
+        status = "skipped"
+    else:
+        status = "completed" if final_state.get('success') else "failed"
+    return {
+        "status": status,
+        "thread_id": thread_id,
+        "final_state": final_state,
+        "latency": time.time() - start_time,
+        "tokens": tracker.total_tokens
+    }
+
+
+def run_batch(input_path, educational_level="high school", workers=1, output_path=None):
+    """
+    Run the checkpointed workflow for every description in a JSONL file
+    
+    Each line is an object with "description" and optional "level", "topic"
+    and "thread_id". Descriptions are streamed from the file and run on a
+    thread pool with at most `workers` in flight; all Gemini calls share the
+    global rate limiter. Results are appended to a JSONL output stream as they
+    finish (one build_output_record() per line, plus batch fields).
+    
+    Descriptions whose final state is already checkpointed are not run again
+    (their stored result is written to the output), so an interrupted batch can
+    simply be started again. A line sharing its thread ID with one still in
+    flight (same description and level) waits for it, and is then skipped.
+    
+    Args:
+        input_path (str): JSONL file with one description per line
+        educational_level (str): Default educational level
+        workers (int): Maximum concurrent workflow runs
+        output_path (str): Output JSONL file (default: output/batch_<timestamp>.jsonl)
+        
+    Returns:
+        dict: Counts of completed, skipped and failed descriptions
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from checkpointing import get_checkpointer, thread_id_for
+    from rate_limiter import get_rate_limiter
+    from token_tracker import estimate_cost
+    
+    workers = max(1, workers)
+    if output_path is None:
+        Path("output").mkdir(exist_ok=True)
+        output_path = Path("output") / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    
+    workflow = create_description_based_concept_map_graph(checkpointer=get_checkpointer())
+    counts = {"completed": 0, "skipped": 0, "failed": 0}
+    latencies = []
+    total_tokens = 0
+    
+    logger.info(f"📦 Batch: {input_path} → {output_path} ({workers} workers)")
+    batch_start = time.time()
+    
+    with open(output_path, 'w', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        running = {}  # thread_id -> future (one run per checkpoint thread at a time)
+        
+        def write_result(line_number, result):
+            nonlocal total_tokens
+            counts[result["status"]] += 1
+            if result["status"] != "skipped":
+                latencies.append(result["latency"])
+                total_tokens += result["tokens"]
+            record = build_output_record(result["final_state"])
+            record["batch"] = {
+                "line": line_number,
+                "thread_id": result["thread_id"],
+                "status": result["status"],
+                "latency": round(result["latency"], 3),
+                "tokens": result["tokens"]
+            }
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            logger.info(f"{'✅' if result['status'] != 'failed' else '❌'} Line {line_number}: "
+                        f"{result['status']} in {result['latency']:.1f}s")
+        
+        def drain(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                line_number, thread_id = pending.pop(future)
+                running.pop(thread_id, None)
+                try:
+                    write_result(line_number, future.result())
+                except Exception as e:
+                    logger.error(f"❌ Line {line_number}: workflow error: {e}")
+                    counts["failed"] += 1
+        
+        for line_number, item, error in _read_batch_items(input_path, educational_level):
+            if error:
+                logger.error(f"❌ Line {line_number}: {error}")
+                counts["failed"] += 1
+                continue
+            thread_id = item['thread_id'] = item.get('thread_id') or thread_id_for(item['description'], item['level'])
+            # A duplicate must not run concurrently on the same checkpoint thread:
+            # once the first finishes, the duplicate finds it checkpointed and is skipped
+            while thread_id in running:
+                drain(FIRST_COMPLETED)
+            # Bounded in-flight work: the input file is never read ahead of the workers
+            if len(pending) >= workers:
+                drain(FIRST_COMPLETED)
+            future = executor.submit(_run_batch_item, workflow, item)
+            pending[future] = (line_number, thread_id)
+            running[thread_id] = future
+        
+        while pending:
+            drain(FIRST_COMPLETED)
+    
+    elapsed = time.time() - batch_start
+    processed = counts["completed"] + counts["failed"]
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)] if latencies else 0.0
+    
+    print("\n" + "=" * 70)
+    print(f"📦 Batch finished in {elapsed:.1f}s → {output_path}")
+    print(f"  • Completed: {counts['completed']}, skipped (checkpointed): {counts['skipped']}, failed: {counts['failed']}")
+    if elapsed > 0:
+        print(f"  • Throughput: {processed / elapsed * 60:.1f} descriptions/min")
+    print(f"  • Latency: p50 {latencies[len(latencies) // 2] if latencies else 0.0:.1f}s, p95 {p95:.1f}s")
+    print(f"  • Tokens: {total_tokens} (≈ ${estimate_cost(total_tokens):.4f})")
+    limiter_stats = get_rate_limiter().get_stats()
+    print(f"  • Rate limiter: {limiter_stats['requests']} requests, {limiter_stats['total_wait']:.1f}s waiting")
+    print("=" * 70)
+    return counts
 
 
 # Legacy function for backward compatibility
@@ -272,25 +494,14 @@ def print_results(state: ConceptMapState):
     print("=" * 70)
 
 
-def save_results(state: ConceptMapState):
+def build_output_record(state: ConceptMapState):
     """
-    Save the concept map results to JSON file
+    Serializable result record for a final workflow state
     
     Returns:
-        str: Path to the saved JSON file, or None if failed
+        dict: Metadata plus extracted concepts, relationships, hierarchy and enrichment
     """
-    # Create output directory if it doesn't exist
-    output_dir = Path("output")
-    output_dir.mkdir(exist_ok=True)
-    
-    # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    topic_name_clean = state['topic_name'].replace(' ', '_').replace('/', '_')
-    filename = f"description_based_concept_map_{topic_name_clean}_{timestamp}.json"
-    filepath = output_dir / filename
-    
-    # Prepare data for saving
-    output_data = {
+    return {
         "metadata": {
             "topic_name": state['topic_name'],
             "educational_level": state['educational_level'],
@@ -310,6 +521,26 @@ def save_results(state: ConceptMapState):
         "processing_log": state.get('processing_log', []),
         "errors": state.get('errors', [])
     }
+
+
+def save_results(state: ConceptMapState):
+    """
+    Save the concept map results to JSON file
+    
+    Returns:
+        str: Path to the saved JSON file, or None if failed
+    """
+    # Create output directory if it doesn't exist
+    output_dir = Path("output")
+    output_dir.mkdir(exist_ok=True)
+    
+    # Generate filename
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    topic_name_clean = state['topic_name'].replace(' ', '_').replace('/', '_')
+    filename = f"description_based_concept_map_{topic_name_clean}_{timestamp}.json"
+    filepath = output_dir / filename
+    
+    output_data = build_output_record(state)
     
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -487,6 +718,9 @@ Examples:
   
   # Short form with graph generation
   python main_universal.py -d "Gravity and motion" -l "middle school" -g
+  
+  # Restartable batch (completed descriptions are skipped on re-run)
+  python main_universal.py --batch descriptions.jsonl --workers 8 --batch-output results.jsonl
 """
     )
     
@@ -522,6 +756,45 @@ Examples:
         help="Enable text-to-speech narration (reads description sentence-by-sentence)"
     )
     
+    parser.add_argument(
+        "--parallel-nodes",
+        action="store_true",
+        help="Static mode: run the async 4-node workflow (with educational enrichment) in parallel branches"
+    )
+    
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Static mode: checkpoint the workflow after each node and resume/reuse earlier runs"
+    )
+    
+    parser.add_argument(
+        "--thread-id",
+        type=str,
+        help="Checkpoint thread ID to resume (implies --checkpoint; default: derived from description and level)"
+    )
+    
+    parser.add_argument(
+        "--batch",
+        type=str,
+        metavar="INPUT_JSONL",
+        help="Run every description in a JSONL file concurrently (checkpointed; completed ones are not re-run)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Batch mode: maximum concurrent workflow runs (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--batch-output",
+        type=str,
+        metavar="OUTPUT_JSONL",
+        help="Batch mode: output JSONL file (default: output/batch_<timestamp>.jsonl)"
+    )
+    
     parser.add_argument(
         "--dynamic",
         action="store_true",
@@ -550,6 +823,12 @@ Examples:
     
     args = parser.parse_args()
     
+    if args.batch:
+        counts = run_batch(args.batch, args.level, workers=args.workers, output_path=args.batch_output)
+        if counts["failed"]:
+            sys.exit(1)
+        return
+    
     # Handle legacy arguments
     if args.topic_name and not args.description:
         description = args.topic_name
@@ -586,7 +865,10 @@ Examples:
         description=description,
         educational_level=args.level,
         topic_name=topic_name,
-        tts_enabled=True  # TTS always enabled by default
+        tts_enabled=True,  # TTS always enabled by default
+        parallel_nodes=args.parallel_nodes,
+        checkpoint=args.checkpoint or bool(args.thread_id),
+        thread_id=args.thread_id
     )
     
     if result and result.get('success'):
@@ -8,6 +8,7 @@ Saves each run to JSON files in metrics_logs/ directory for easy inspection and
 
 import os
 import json
+import math
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -42,6 +43,8 @@ def log_metrics(
         educational_level: Educational level used
         token_usage: Dict with 'prompt_tokens', 'completion_tokens', 'total_tokens'
         timing_metrics: Dict with 'api_duration', 'parse_duration', 'total_duration'
+                        (and optional 'compression_ratio' / 'prompt_*_tokens' from prompt compression,
+                        'json_valid' / 'json_repairs' / 'json_dropped_items' from response parsing)
         concepts: List of extracted concepts
         relationships: List of extracted relationships
         success: Whether the extraction was successful
@@ -74,6 +77,13 @@ def log_metrics(
             "parse_duration_seconds": round(timing_metrics.get('parse_duration', 0), 3),
             "total_duration_seconds": round(timing_metrics.get('total_duration', 0), 3)
         },
+        "prompt": {
+            "original_tokens_estimate": timing_metrics.get('prompt_original_tokens', 0),
+            "compressed_tokens_estimate": timing_metrics.get('prompt_compressed_tokens', 0),
+            "compression_ratio": timing_metrics.get('compression_ratio', 1.0),
+            "sentences_kept": timing_metrics.get('sentences_kept', 0),
+            "sentences_total": timing_metrics.get('sentences_total', 0)
+        },
         "output": {
             "concepts_count": len(concepts),
             "relationships_count": len(relationships),
@@ -101,6 +111,33 @@ def log_metrics(
         }
     }
     
+    # Structured response parsing details
+    if 'json_repairs' in timing_metrics:
+        metrics_data["parsing"] = {
+            "schema_valid": timing_metrics.get('json_valid', True),
+            "repairs": timing_metrics.get('json_repairs', 0),
+            "dropped_items": timing_metrics.get('json_dropped_items', 0)
+        }
+    
+    # Hedged (speculative duplicate) request details
+    if 'hedge_deadline' in timing_metrics:
+        metrics_data["hedging"] = {
+            "deadline_seconds": timing_metrics.get('hedge_deadline', 0),
+            "hedged": timing_metrics.get('hedged', False),
+            "winner": timing_metrics.get('hedge_winner', 'none'),
+            "primary": timing_metrics.get('hedge_primary', {}),
+            "backup": timing_metrics.get('hedge_backup', {}),
+            "discarded_tokens": timing_metrics.get('hedge_discarded_tokens', 0)
+        }
+    
+    # Long-document (map-reduce) extraction details
+    if 'chunk_count' in timing_metrics:
+        metrics_data["map_reduce"] = {
+            "chunks": timing_metrics.get('chunk_count', 0),
+            "failed_chunks": timing_metrics.get('failed_chunks', 0),
+            "consolidated": timing_metrics.get('consolidated', False)
+        }
+    
     # Write to file
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -162,6 +199,10 @@ def get_summary_stats() -> Dict:
     
     avg_api_duration = sum(m['timing']['api_duration_seconds'] for m in all_metrics) / len(all_metrics)
     avg_concepts = sum(m['output']['concepts_count'] for m in all_metrics) / len(all_metrics)
+    # Older metrics files have no "prompt" section (no compression = ratio 1.0)
+    avg_compression_ratio = sum(
+        m.get('prompt', {}).get('compression_ratio', 1.0) for m in all_metrics
+    ) / len(all_metrics)
     
     return {
         "total_runs": len(all_metrics),
@@ -178,6 +219,18 @@ def get_summary_stats() -> Dict:
             "avg_api_duration_seconds": round(avg_api_duration, 3),
             "total_api_time_seconds": round(sum(m['timing']['api_duration_seconds'] for m in all_metrics), 3)
         },
+        "prompt": {
+            "avg_compression_ratio": round(avg_compression_ratio, 3),
+            "compressed_runs": sum(1 for m in all_metrics if m.get('prompt', {}).get('compression_ratio', 1.0) < 1.0)
+        },
+        "hedging": {
+            "hedged_runs": sum(1 for m in all_metrics if m.get('hedging', {}).get('hedged')),
+            "backup_wins": sum(1 for m in all_metrics if m.get('hedging', {}).get('winner') == 'backup')
+        },
+        "parsing": {
+            "repaired_runs": sum(1 for m in all_metrics if m.get('parsing', {}).get('repairs', 0) > 0),
+            "total_dropped_items": sum(m.get('parsing', {}).get('dropped_items', 0) for m in all_metrics)
+        },
         "output": {
             "avg_concepts_per_run": round(avg_concepts, 1),
             "total_concepts_extracted": sum(m['output']['concepts_count'] for m in all_metrics)
@@ -203,6 +256,43 @@ def get_recent_metrics(limit: int = 10) -> List[Dict]:
     return all_metrics[:limit]
 
 
+def get_latency_percentile(percentile: float = 0.9, window: int = 200, min_samples: int = 10) -> Optional[float]:
+    """
+    API latency percentile over the most recent successful runs.
+
+    Only the newest `window` files are read (filenames sort by timestamp), so
+    this stays cheap as metrics_logs/ grows.
+
+    Args:
+        percentile: Percentile as a fraction (0.9 = p90)
+        window: Number of most recent runs to consider
+        min_samples: Minimum successful runs needed for a meaningful value
+
+    Returns:
+        Latency in seconds (nearest-rank), or None if there are too few samples
+    """
+    ensure_metrics_dir()
+
+    durations = []
+    for filepath in sorted(METRICS_DIR.glob("run_*.json"))[-window:]:
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            continue
+        if data.get('status', {}).get('success'):
+            duration = data.get('timing', {}).get('api_duration_seconds', 0)
+            if duration > 0:
+                durations.append(duration)
+
+    if len(durations) < min_samples:
+        return None
+
+    durations.sort()
+    rank = max(1, min(len(durations), math.ceil(percentile * len(durations))))
+    return durations[rank - 1]
+
+
 def clear_old_metrics(days: int = 30):
     """
     Delete metrics files older than specified days.
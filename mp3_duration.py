@@ -0,0 +1,204 @@
+"""
+MP3 Duration Module
+===================
+Measures MP3 duration from frame headers only (no audio decoding, no dependencies).
+
+Every MPEG audio frame starts with a 4-byte header giving its bitrate, sample
+rate and padding, which fixes the frame length and the number of samples it
+holds. Walking the headers and summing samples gives the exact duration.
+
+VBR encoders put a Xing/Info or VBRI tag in the first frame with the total
+frame count; when it is present (and agrees with the file size) the duration
+comes straight from it without walking the rest of the file.
+"""
+
+import struct
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bitrates in kbps, indexed by [version_group][layer][bitrate_index]
+# version_group 0 = MPEG-1, 1 = MPEG-2/2.5
+_BITRATES = {
+    (0, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (0, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (0, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (1, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (1, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (1, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Sample rates in Hz by version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+
+def parse_frame_header(data: bytes, offset: int) -> Optional[Dict]:
+    """
+    Parse the MPEG audio frame header at offset.
+
+    Args:
+        data: File contents
+        offset: Position of a candidate frame sync
+
+    Returns:
+        Dict with version, layer, bitrate, sample_rate, channels, samples and
+        frame_length, or None if there is no valid header at offset
+    """
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None  # Reserved values or free-format bitrate
+
+    layer = 4 - layer_bits
+    version_group = 0 if version_bits == 3 else 1
+    bitrate = _BITRATES[(version_group, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or version_group == 0) else 576
+        frame_length = samples // 8 * bitrate // sample_rate + padding
+
+    return {
+        "version": {3: "1", 2: "2", 0: "2.5"}[version_bits],
+        "layer": layer,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "channels": 1 if (b3 >> 6) == 3 else 2,
+        "samples": samples,
+        "frame_length": frame_length,
+        "version_group": version_group,
+    }
+
+
+def skip_id3v2(data: bytes) -> int:
+    """Offset of the first byte after a leading ID3v2 tag (0 if there is none)."""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _read_vbr_tag(data: bytes, offset: int, header: Dict) -> Optional[Dict]:
+    """
+    Frame and byte counts from a Xing/Info or VBRI tag in the frame at offset.
+
+    Returns:
+        Dict with 'frames' and 'bytes' (None if absent), or None if the frame has no tag
+    """
+    # Xing/Info sits right after the side information
+    mono = header["channels"] == 1
+    if header["version_group"] == 0:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info") and xing + 8 <= len(data):
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        position = xing + 8
+        frames = total_bytes = None
+        if flags & 0x1 and position + 4 <= len(data):
+            frames = struct.unpack(">I", data[position:position + 4])[0]
+            position += 4
+        if flags & 0x2 and position + 4 <= len(data):
+            total_bytes = struct.unpack(">I", data[position:position + 4])[0]
+        return {"frames": frames, "bytes": total_bytes}
+
+    # VBRI (Fraunhofer) sits at a fixed 32 bytes after the header
+    vbri = offset + 36
+    if data[vbri:vbri + 4] == b"VBRI" and vbri + 18 <= len(data):
+        total_bytes, frames = struct.unpack(">II", data[vbri + 10:vbri + 18])
+        return {"frames": frames, "bytes": total_bytes}
+
+    return None
+
+
+def get_mp3_duration_us(path: str) -> int:
+    """
+    Duration of an MP3 file in microseconds, from frame headers (no decoding).
+
+    Uses the Xing/Info/VBRI frame count when the first frame carries one and its
+    byte count matches the file; otherwise walks every frame header. The tag
+    frame itself holds no audio and is not counted.
+
+    Args:
+        path: Path to an MP3 file
+
+    Returns:
+        Duration in microseconds
+
+    Raises:
+        ValueError: If no MPEG audio frames are found
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    offset = skip_id3v2(data)
+    total_samples = 0
+    sample_rate = None
+    frames = 0
+    first = True
+
+    while offset + 4 <= len(data):
+        header = parse_frame_header(data, offset)
+        if header is None:
+            # Resync: scan forward to the next possible frame sync
+            offset = data.find(b"\xff", offset + 1)
+            if offset == -1:
+                break
+            continue
+
+        if first:
+            first = False
+            sample_rate = header["sample_rate"]
+            tag = _read_vbr_tag(data, offset, header)
+            if tag is not None:
+                audio_bytes = len(data) - offset
+                # Concatenated files keep the first file's tag: only trust it if the size agrees
+                size_ok = tag["bytes"] is None or abs(tag["bytes"] - audio_bytes) <= max(1024, audio_bytes // 100)
+                if tag["frames"] and size_ok:
+                    return tag["frames"] * header["samples"] * 1_000_000 // sample_rate
+                offset += header["frame_length"]
+                continue
+
+        total_samples += header["samples"]
+        frames += 1
+        offset += header["frame_length"]
+
+    if not frames:
+        raise ValueError(f"No MPEG audio frames found in {path}")
+
+    return total_samples * 1_000_000 // sample_rate
+
+
+def get_mp3_duration(path: str) -> float:
+    """
+    Duration of an MP3 file in seconds, from frame headers.
+
+    Args:
+        path: Path to an MP3 file
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        ValueError: If no MPEG audio frames are found
+    """
+    return get_mp3_duration_us(path) / 1_000_000
@@ -12,12 +12,12 @@ New 4-Node Workflow:
 """
 
 import json
+import asyncio
 import logging
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Sequence
 from datetime import datetime
 import google.generativeai as genai
 import os
-import re
 from dotenv import load_dotenv
 from states import ConceptMapState
 from description_analyzer import (
@@ -26,6 +26,14 @@ from description_analyzer import (
     extract_topic_name_from_description
 )
 from token_tracker import log_token_usage, get_tracker
+from rate_limiter import get_rate_limiter
+from prompt_compressor import compress_description
+from structured_output import (
+    COMBINED_EXTRACTION_SCHEMA,
+    json_generation_config,
+    parse_json_response,
+    tolerant_parse
+)
 
 # Load environment variables
 load_dotenv()
@@ -41,6 +49,9 @@ def clean_json_response(response_text: str) -> str:
     """
     Clean and extract JSON from AI response text
     
+    Only strips surrounding markdown fences; syntax problems are repaired by
+    the tolerant parser in safe_json_parse.
+    
     Args:
         response_text (str): Raw response from AI model
         
@@ -53,41 +64,19 @@ def clean_json_response(response_text: str) -> str:
         json_end = response_text.find("```", json_start)
         if json_end == -1:
             json_end = len(response_text)
-        json_text = response_text[json_start:json_end].strip()
-    else:
-        json_text = response_text.strip()
-    
-    # Remove any trailing commas before closing braces/brackets
-    json_text = re.sub(r',(\s*[}\]])', r'\1', json_text)
-    
-    # Remove any comments (lines starting with //)
-    json_text = re.sub(r'//.*\n', '', json_text)
-    
-    # Fix common JSON issues
-    # Remove trailing commas in arrays and objects
-    json_text = re.sub(r',(\s*[}\]])', r'\1', json_text)
+        return response_text[json_start:json_end].strip()
     
-    # Fix missing commas between objects in arrays
-    json_text = re.sub(r'}\s*{', r'},{', json_text)
-    
-    # Fix misplaced escape characters in property names
-    # Pattern: "property\": "value" -> "property": "value"
-    json_text = re.sub(r'"([^"]+)\\"\s*:\s*\\"([^"]+)"', r'"\1": "\2"', json_text)
-    
-    # Fix escaped quotes that shouldn't be escaped
-    # Pattern: "educational_level\": \"elementary" -> "educational_level": "elementary"
-    json_text = re.sub(r'([^\\])\\"\s*:\s*\\"([^"]+)"', r'\1": "\2"', json_text)
-    
-    # Remove extra whitespace
-    json_text = json_text.strip()
-    
-    return json_text
+    return response_text.strip()
 
 
 def safe_json_parse(json_text: str, fallback_value: Any = None) -> Any:
     """
     Safely parse JSON with error handling
     
+    Strict parsing is tried first, then the single-pass tolerant parser
+    (trailing/missing commas, comments, truncated output). The fallback
+    value is only returned when nothing can be recovered.
+    
     Args:
         json_text (str): JSON text to parse
         fallback_value (Any): Value to return if parsing fails
@@ -98,7 +87,13 @@ def safe_json_parse(json_text: str, fallback_value: Any = None) -> Any:
     try:
         return json.loads(json_text)
     except json.JSONDecodeError as e:
-        logger.warning(f"JSON parsing failed: {e}")
+        logger.warning(f"JSON parsing failed: {e}, attempting repair")
+    
+    try:
+        value, repairs = tolerant_parse(json_text)
+        logger.info(f"🔧 Repaired JSON response ({repairs} fixes)")
+        return value
+    except ValueError:
         logger.warning(f"Problematic JSON text: {json_text[:500]}...")
         return fallback_value
 
@@ -139,16 +134,30 @@ def extract_all_in_one_call(state: ConceptMapState) -> ConceptMapState:
             f"{adjusted_complexity['target_concepts']} concepts ({adjusted_complexity['detail_level']} level)"
         )
         
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')  # FASTEST MODEL for maximum speed
+        model = genai.GenerativeModel(
+            'gemini-2.5-flash-lite',  # FASTEST MODEL for maximum speed
+            generation_config=json_generation_config(COMBINED_EXTRACTION_SCHEMA)
+        )
         
         # Create dynamic prompt based on description analysis
         target_concepts = adjusted_complexity['target_concepts']
         detail_level = adjusted_complexity['detail_level']
         
+        # Reduce long descriptions to the prompt token budget (analysis above uses the full text)
+        compression = compress_description(state['description'])
+        description_analysis['prompt_compression'] = {
+            key: value for key, value in compression.items() if key != 'text'
+        }
+        if compression['compressed']:
+            state['processing_log'].append(
+                f"🗜️ Prompt compressed: {compression['original_tokens']} → {compression['compressed_tokens']} tokens "
+                f"({compression['sentences_kept']}/{compression['sentences_total']} sentences)"
+            )
+        
         # OPTIMIZED COMPRESSED PROMPT - 60% token reduction
         prompt = f"""Extract concepts, relationships, and hierarchy from the description as JSON.
 
-DESCRIPTION: "{state['description']}"
+DESCRIPTION: "{compression['text']}"
 EDUCATIONAL LEVEL: {state['educational_level']}
 TARGET CONCEPTS: {target_concepts}
 
@@ -166,16 +175,25 @@ RULES:
 - Match {state['educational_level']} level
 """
         
-        response = model.generate_content(prompt)
+        with get_rate_limiter().limit():
+            response = model.generate_content(prompt)
         response_text = response.text.strip()
         
         # Track token usage
         token_info = log_token_usage("extract_all_in_one_call", prompt, response_text)
         get_tracker().add_node("combined_extraction", token_info)
         
-        # Parse JSON response
-        json_text = clean_json_response(response_text)
-        result = safe_json_parse(json_text, {})
+        # Parse, repair and validate JSON response (invalid items are dropped, not the whole result)
+        parse_report = parse_json_response(response_text, COMBINED_EXTRACTION_SCHEMA)
+        result = parse_report['data'] if isinstance(parse_report['data'], dict) else {}
+        description_analysis['json_parsing'] = {
+            key: value for key, value in parse_report.items() if key != 'data'
+        }
+        if parse_report['repairs'] or parse_report['dropped_items']:
+            state['processing_log'].append(
+                f"🔧 JSON response repaired: {parse_report['repairs']} fixes, "
+                f"{parse_report['dropped_items']} invalid items dropped"
+            )
         
         if result:
             # Extract all three components from single response
@@ -315,7 +333,8 @@ def extract_concepts_from_description(state: ConceptMapState) -> ConceptMapState
         Extract concepts that will create a meaningful, educational concept map based on this specific description.
         """
         
-        response = model.generate_content(prompt)
+        with get_rate_limiter().limit():
+            response = model.generate_content(prompt)
         response_text = response.text.strip()
         
         # Track token usage
@@ -424,7 +443,8 @@ def analyze_concept_relationships(state: ConceptMapState) -> ConceptMapState:
         Create relationships that will help students understand how these concepts work together based on the description.
         """
         
-        response = model.generate_content(prompt)
+        with get_rate_limiter().limit():
+            response = model.generate_content(prompt)
         response_text = response.text.strip()
         
         # Track token usage
@@ -545,7 +565,8 @@ def build_concept_hierarchy(state: ConceptMapState) -> ConceptMapState:
         Create a hierarchy that optimizes learning based on the description content and educational level.
         """
         
-        response = model.generate_content(prompt)
+        with get_rate_limiter().limit():
+            response = model.generate_content(prompt)
         response_text = response.text.strip()
         
         # Track token usage
@@ -677,7 +698,8 @@ def enrich_with_educational_metadata(state: ConceptMapState) -> ConceptMapState:
         Create comprehensive educational support for teaching this concept map effectively.
         """
         
-        response = model.generate_content(prompt)
+        with get_rate_limiter().limit():
+            response = model.generate_content(prompt)
         response_text = response.text.strip()
         
         # Track token usage
@@ -723,4 +745,61 @@ def initialize_legacy_fields(state: ConceptMapState) -> ConceptMapState:
     state['subtopic_hierarchies'] = {}
     state['cross_subtopic_links'] = []
     state['enriched_subtopics'] = {}
-    return state
\ No newline at end of file
+    return state
+
+
+# ============================================================================
+# Async node variants (for the parallel graph in graph.py)
+# ============================================================================
+
+def make_async_node(node: Callable[[ConceptMapState], ConceptMapState],
+                    output_keys: Sequence[str]) -> Callable:
+    """
+    Wrap a node as an async node that returns a partial state update.
+    
+    The node runs on a worker thread (asyncio.to_thread) against a shallow copy
+    of the state with empty processing_log / errors, so parallel branches never
+    write the same keys: each returns only its output_keys plus its own new log
+    and error entries, which the ParallelConceptMapState reducers merge.
+    
+    Args:
+        node: Synchronous node function
+        output_keys: State keys the node produces
+        
+    Returns:
+        Async node function
+    """
+    async def run(state: ConceptMapState) -> Dict[str, Any]:
+        scratch = dict(state)
+        scratch['processing_log'] = []
+        scratch['errors'] = []
+        scratch['success'] = True
+        result = await asyncio.to_thread(node, scratch)
+        update = {key: result[key] for key in output_keys if key in result}
+        update['processing_log'] = result['processing_log']
+        update['errors'] = result['errors']
+        update['success'] = result['success']
+        return update
+    
+    run.__name__ = f"{node.__name__}_async"
+    return run
+
+
+extract_concepts_from_description_async = make_async_node(
+    extract_concepts_from_description,
+    ['extracted_concepts', 'topic_name', 'description_analysis', 'complexity_config']
+)
+analyze_concept_relationships_async = make_async_node(
+    analyze_concept_relationships, ['concept_relationships']
+)
+build_concept_hierarchy_async = make_async_node(
+    build_concept_hierarchy, ['concept_hierarchy']
+)
+enrich_with_educational_metadata_async = make_async_node(
+    enrich_with_educational_metadata, ['enriched_concepts', 'learning_objectives', 'teaching_strategies']
+)
+initialize_legacy_fields_async = make_async_node(
+    initialize_legacy_fields,
+    ['raw_subtopics', 'subtopic_concepts', 'key_concepts_per_subtopic',
+     'subtopic_hierarchies', 'cross_subtopic_links', 'enriched_subtopics']
+)
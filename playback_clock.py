@@ -0,0 +1,256 @@
+"""
+Playback Clock Module
+=====================
+Clocks that play narration audio in the background and report a monotonic
+playback position, so visuals can be scheduled against the audio (reveal a
+concept when position() reaches its reveal_time) instead of waiting for it.
+
+- PygameClock:  plays through pygame.mixer on its own channel (non-blocking)
+- VirtualClock: headless clock that only advances when slept/advanced, for
+                tests and benchmarks (a full run takes no wall time)
+
+Select with get_playback_clock() or the PLAYBACK_CLOCK env var ("pygame"/"virtual").
+"""
+
+import os
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PLAYBACK_CLOCK = os.getenv('PLAYBACK_CLOCK', 'pygame').lower()
+
+# Poll interval while waiting for a target position
+POLL_INTERVAL = 0.02
+
+
+def _audio_duration(audio_file: Optional[str]) -> float:
+    """Duration of an MP3 from its frame headers (0.0 if unknown)."""
+    if not audio_file or not os.path.exists(audio_file):
+        return 0.0
+    try:
+        from mp3_duration import get_mp3_duration_us
+        return get_mp3_duration_us(audio_file) / 1_000_000
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Could not read audio duration of {audio_file}: {e}")
+        return 0.0
+
+
+class PlaybackClock(ABC):
+    """
+    Base playback clock.
+
+    Subclasses implement _start_audio(), _raw_position() and sleep() (abstract,
+    so an incomplete clock fails at instantiation) and may override _stop_audio()
+    and _audio_busy(). position() is clamped to never go backwards.
+
+    When the duration is unknown (0.0, e.g. the MP3 headers could not be
+    parsed), playback is considered finished once the backend reports the audio
+    is no longer busy, so the narration is never cut off early.
+    """
+
+    def __init__(self):
+        self.audio_file = None
+        self.duration = 0.0
+        self._last_position = 0.0
+        self._started = False
+        self._stopped = False
+
+    def start(self, audio_file: Optional[str] = None, duration: Optional[float] = None,
+              fallback_duration: float = 0.0):
+        """
+        Start playback (returns immediately).
+
+        Args:
+            audio_file: MP3 to play (None = silent clock)
+            duration: Playback length in seconds (default: read from the MP3 headers)
+            fallback_duration: Length to assume when the MP3 headers give none
+                (e.g. the timeline's metadata["total_duration"])
+        """
+        self.audio_file = audio_file
+        self.duration = duration if duration is not None else _audio_duration(audio_file)
+        if self.duration <= 0 and fallback_duration and fallback_duration > 0:
+            logger.info(f"⏱️  Audio duration unknown, assuming {fallback_duration:.1f}s")
+            self.duration = fallback_duration
+        self._last_position = 0.0
+        self._stopped = False
+        self._started = True
+        self._start_audio(audio_file)
+
+    def position(self) -> float:
+        """Seconds since start() (monotonic, never decreases)."""
+        if not self._started:
+            return 0.0
+        self._last_position = max(self._last_position, self._raw_position())
+        return self._last_position
+
+    def is_playing(self) -> bool:
+        """True until the audio duration has elapsed (or, if unknown, the audio went idle) or stop() was called."""
+        if not self._started or self._stopped:
+            return False
+        if self.duration > 0:
+            return self.position() < self.duration
+        return bool(self._audio_busy())
+
+    def wait_until(self, target: float) -> float:
+        """
+        Sleep until position() reaches target (or playback is stopped).
+
+        Returns:
+            Position after waiting
+        """
+        while not self._stopped:
+            remaining = target - self.position()
+            if remaining <= 0:
+                break
+            self.sleep(min(remaining, POLL_INTERVAL))
+        return self.position()
+
+    def wait_until_finished(self) -> float:
+        """Sleep until the audio has finished. Returns the final position."""
+        if self.duration > 0:
+            return self.wait_until(self.duration)
+        # Unknown duration: poll the backend until the audio goes idle
+        while not self._stopped and self._audio_busy():
+            self.sleep(POLL_INTERVAL)
+        return self.position()
+
+    def stop(self):
+        """Stop playback."""
+        if self._started and not self._stopped:
+            self._stopped = True
+            self._stop_audio()
+
+    @abstractmethod
+    def sleep(self, seconds: float):
+        """Sleep for seconds of playback time."""
+
+    @abstractmethod
+    def _start_audio(self, audio_file: Optional[str]):
+        """Begin playing audio_file (None = silent)."""
+
+    @abstractmethod
+    def _raw_position(self) -> float:
+        """Current playback position in seconds."""
+
+    def _stop_audio(self):
+        pass
+
+    def _audio_busy(self) -> Optional[bool]:
+        """Whether the backend is still playing audio (None = cannot tell)."""
+        return None
+
+
+class PygameClock(PlaybackClock):
+    """
+    Real-time clock playing audio through pygame.mixer.music.
+
+    pygame streams the music on its own thread, so start() returns immediately.
+    While the music plays, the position follows the mixer (which includes the
+    device start-up latency); otherwise it is wall-clock time since start().
+    Without a working mixer the clock still runs, silently.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._start_time = 0.0
+        self._mixer_ready = False
+        self._audio_loaded = False
+        try:
+            import pygame
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self._pygame = pygame
+            self._mixer_ready = True
+        except Exception as e:
+            self._pygame = None
+            logger.warning(f"⚠️  Could not initialize pygame mixer, clock runs silently: {e}")
+
+    def sleep(self, seconds: float):
+        time.sleep(max(0.0, seconds))
+
+    def _start_audio(self, audio_file: Optional[str]):
+        self._start_time = time.monotonic()
+        self._audio_loaded = False
+        if not (audio_file and self._mixer_ready and os.path.exists(audio_file)):
+            return
+        try:
+            self._pygame.mixer.music.load(audio_file)
+            self._pygame.mixer.music.play()
+            self._start_time = time.monotonic()
+            self._audio_loaded = True
+            logger.info(f"🎵 Playing audio: {os.path.basename(audio_file)} ({self.duration:.1f}s)")
+        except Exception as e:
+            logger.error(f"❌ Error playing audio: {e}")
+
+    def _raw_position(self) -> float:
+        if self._mixer_ready and not self._stopped and self._pygame.mixer.music.get_busy():
+            mixer_ms = self._pygame.mixer.music.get_pos()
+            if mixer_ms >= 0:
+                return mixer_ms / 1000.0
+        return time.monotonic() - self._start_time
+
+    def _stop_audio(self):
+        if self._mixer_ready:
+            try:
+                self._pygame.mixer.music.stop()
+            except Exception:
+                pass
+
+    def _audio_busy(self) -> Optional[bool]:
+        if not self._audio_loaded:
+            return None
+        try:
+            return bool(self._pygame.mixer.music.get_busy())
+        except Exception:
+            return None
+
+
+class VirtualClock(PlaybackClock):
+    """
+    Headless clock: time only moves through sleep() / advance().
+
+    Nothing is played. Waiting and animation sleeps return immediately, so a
+    whole visualization run can be replayed in tests and benchmarks.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._now = 0.0
+
+    def advance(self, seconds: float):
+        """Move the clock forward."""
+        self._now += max(0.0, seconds)
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def wait_until(self, target: float) -> float:
+        # Jump straight to the target instead of polling
+        if not self._stopped:
+            self.advance(target - self.position())
+        return self.position()
+
+    def _start_audio(self, audio_file: Optional[str]):
+        self._now = 0.0
+
+    def _raw_position(self) -> float:
+        return self._now
+
+
+def get_playback_clock(kind: Optional[str] = None) -> PlaybackClock:
+    """
+    Create a playback clock.
+
+    Args:
+        kind: "pygame" or "virtual" (default: PLAYBACK_CLOCK env var)
+
+    Returns:
+        New PlaybackClock instance
+    """
+    kind = (kind or PLAYBACK_CLOCK).lower()
+    if kind == "virtual":
+        return VirtualClock()
+    return PygameClock()
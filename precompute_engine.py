@@ -2,20 +2,36 @@
 Pre-computation Engine - Character-Based Timing with gTTS
 =========================================================
 Generates all assets (audio, layout) using character-based timing.
-This version uses ONLY gTTS and does NOT require MP3 duration reading.
+This version uses ONLY gTTS; MP3 duration reading is only needed for the
+optional rescale step (RESCALE_TIMINGS).
 """
 
 import os
 import tempfile
 import logging
 import time
-from typing import Dict, List, Tuple
-import networkx as nx
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from gtts import gTTS
+from mp3_duration import skip_id3v2, get_mp3_duration_us
+from layout_engine import compute_layout
+from concept_graph import ConceptGraph, timeline_graph
 
 logger = logging.getLogger(__name__)
 
+# Rescale character-based timings to the measured audio duration after synthesis
+RESCALE_TIMINGS = os.getenv('RESCALE_TIMINGS', 'false').lower() == 'true'
+
+
+def _concatenate_mp3(input_files: List[str], output_file: str):
+    """Join MP3 files frame-wise into one playable file."""
+    with open(output_file, "wb") as out:
+        for i, path in enumerate(input_files):
+            with open(path, "rb") as f:
+                data = f.read()
+            # Only the first file keeps its ID3v2 tag
+            out.write(data if i == 0 else data[skip_id3v2(data):])
+
 
 class PrecomputeEngine:
     """
@@ -23,7 +39,8 @@ class PrecomputeEngine:
     Uses character-based timing with gTTS (no Edge-TTS, no MP3 duration reading).
     """
     
-    def __init__(self, voice: str = "com", rate: str = "+0%", layout_style: str = "hierarchical"):
+    def __init__(self, voice: str = "com", rate: str = "+0%", layout_style: str = "hierarchical",
+                 rescale_timings: Optional[bool] = None):
         """
         Initialize pre-computation engine with gTTS.
         
@@ -32,13 +49,17 @@ class PrecomputeEngine:
                    Options: "com", "co.uk", "com.au", "co.in", etc.
             rate: Not used by gTTS (kept for API compatibility)
             layout_style: Graph layout algorithm (default: hierarchical)
-                         Options: "hierarchical", "shell", "circular", "kamada-kawai", "spring"
+                         Options: see layout_engine.LAYOUT_STYLES
+            rescale_timings: Stretch word timings and reveal times to the measured
+                             audio duration (default: RESCALE_TIMINGS env var)
         """
         self.voice = voice  # Actually TLD for gTTS
         self.rate = rate
         self.layout_style = layout_style
+        self.rescale_timings = RESCALE_TIMINGS if rescale_timings is None else rescale_timings
         self.temp_dir = tempfile.mkdtemp(prefix="concept_map_audio_")
         self.audio_files = []
+        self._chunk_counter = 0
         logger.info(f"🎤 Using gTTS with TLD: {voice}")
         logger.info(f"📐 Using layout: {layout_style}")
         logger.info(f"📁 Audio temp directory: {self.temp_dir}")
@@ -49,7 +70,7 @@ class PrecomputeEngine:
         
         Args:
             text: Text to synthesize
-            index: Index for filename
+            index: Index (or label) for filename
             max_retries: Maximum number of retry attempts (default: 5)
             
         Returns:
@@ -97,7 +118,7 @@ class PrecomputeEngine:
         
         **CHARACTER-BASED TIMING APPROACH:**
         - Does NOT require MP3 duration reading
-        - Does NOT rescale timings
+        - Does NOT rescale timings (optional separate step: rescale_to_audio)
         - Uses character-based timing from timeline_mapper.py
         - Timing is calculated as: char_count * 0.08 seconds (calibrated for gTTS)
         
@@ -147,176 +168,161 @@ class PrecomputeEngine:
         
         return timeline
     
-    def calculate_positions(self, G: nx.DiGraph, concepts: List[Dict]) -> Dict[str, Tuple[float, float]]:
+    def generate_chunked_audio(self, timeline: Dict, previous_chunks: Optional[List[Dict]] = None) -> Dict:
         """
-        Calculate node positions using Smart Grid Layout.
+        Generate audio sentence by sentence and concatenate it into one file.
         
-        Smart Grid Layout Rules:
-        - Root node at top center (0, 0)
-        - 3 columns: x = -8, 0, +8
-        - Sequential fill: left-to-right, top-to-bottom
-        - Dynamic vertical spacing: -7, -14, -21, -28...
+        Chunks whose sentence text matches a previous chunk (from an earlier
+        timeline, e.g. before an edit) are reused instead of re-synthesized.
+        gTTS splits text into short requests internally anyway, so per-sentence
+        synthesis does not add requests for normal sentences.
         
         Args:
-            G: NetworkX directed graph
-            concepts: List of concept dicts
+            timeline: Timeline dict from timeline_mapper
+            previous_chunks: "audio_chunks" of a previous timeline
             
         Returns:
-            Dict mapping concept names to (x, y) positions
+            Updated timeline with audio_file and audio_chunks ([{"text", "file"}])
         """
-        logger.info("📐 Calculating Smart Grid layout positions...")
-        
-        pos = {}
-        
-        # Find root node (no incoming edges)
-        root_nodes = [n for n in G.nodes() if G.in_degree(n) == 0]
-        
-        if not root_nodes:
-            logger.warning("⚠️ No root node found, using first node")
-            root_nodes = [list(G.nodes())[0]] if G.nodes() else []
-        
-        # Smart Grid Layout
-        COLUMNS = 3
-        COL_X_POSITIONS = [-8.0, 0.0, 8.0]  # Fixed x positions
-        VERTICAL_SPACING = 7.0  # Space between rows
-        
-        # Place root at top center
-        if root_nodes:
-            root = root_nodes[0]
-            pos[root] = (0.0, 0.0)
-            logger.info(f"  📍 Root '{root}' at (0, 0)")
-        
-        # Get non-root nodes sorted by importance
-        non_root_nodes = [n for n in G.nodes() if n not in root_nodes]
-        
-        # Sort by importance (from concepts list)
-        concept_dict = {c['name']: c for c in concepts}
-        non_root_nodes_sorted = sorted(
-            non_root_nodes,
-            key=lambda n: concept_dict.get(n, {}).get('importance', 0),
-            reverse=True
-        )
-        
-        # Place nodes in grid (3 columns, sequential fill)
-        for idx, node in enumerate(non_root_nodes_sorted):
-            col = idx % COLUMNS
-            row = idx // COLUMNS + 1  # +1 because root is at row 0
-            
-            x = COL_X_POSITIONS[col]
-            y = -row * VERTICAL_SPACING
-            
-            pos[node] = (x, y)
-            logger.debug(f"  📍 '{node}' at ({x}, {y})")
-        
-        logger.info(f"✅ Positioned {len(pos)} nodes in Smart Grid layout")
-        return pos
+        from timeline_mapper import split_into_sentences
+        
+        sentences = split_into_sentences(timeline.get("full_text", ""))
+        if not sentences:
+            return self.generate_all_audio(timeline)
+        
+        reusable = {
+            chunk["text"]: chunk["file"] for chunk in (previous_chunks or [])
+            if chunk.get("file") and os.path.exists(chunk["file"])
+        }
+        
+        chunks = []
+        reused = 0
+        for sentence in sentences:
+            chunk_file = reusable.get(sentence)
+            if chunk_file:
+                reused += 1
+            else:
+                self._chunk_counter += 1
+                chunk_file = self.generate_audio_file(sentence, f"chunk_{self._chunk_counter}")
+                if not chunk_file:
+                    logger.error("❌ Audio generation failed")
+                    return timeline
+            chunks.append({"text": sentence, "file": chunk_file})
+        
+        self._chunk_counter += 1
+        audio_file = os.path.join(self.temp_dir, f"audio_full_{self._chunk_counter}.mp3")
+        _concatenate_mp3([chunk["file"] for chunk in chunks], audio_file)
+        self.audio_files.append(audio_file)
+        
+        timeline["audio_chunks"] = chunks
+        timeline["audio_file"] = audio_file
+        timeline["metadata"]["audio_file"] = audio_file
+        logger.info(f"✅ Audio generated: {len(chunks) - reused} sentences synthesized, {reused} reused")
+        return timeline
     
-    def _filter_edges_by_incoming_limit(
-        self, 
-        G: nx.DiGraph, 
-        concepts: List[Dict],
-        max_incoming: int = 2
-    ) -> List[Tuple[str, str]]:
+    def rescale_to_audio(self, timeline: Dict) -> Dict:
         """
-        Filter edges to ensure each node has at most max_incoming edges.
-        Root node has 0 incoming edges.
+        Rescale word timings and concept reveal times to the measured audio duration.
         
-        Priority: Keep edges from more important nodes.
+        The duration is read from the MP3 frame headers (see mp3_duration.py).
+        All timings are multiplied by one factor in a single pass, so relative
+        spacing (pauses, reveal order) is unchanged.
         
         Args:
-            G: NetworkX directed graph
-            concepts: List of concept dicts with importance scores
-            max_incoming: Maximum incoming edges per node (except root)
+            timeline: Timeline with audio_file set
             
         Returns:
-            List of (source, target) tuples to keep
+            Timeline with rescaled timings and timing_scale_factor,
+            original_estimated_duration and actual_audio_duration in metadata
         """
-        logger.info(f"🔗 Filtering edges: max {max_incoming} incoming per node...")
+        audio_file = timeline.get("audio_file")
+        metadata = timeline["metadata"]
+        estimated = metadata.get("original_estimated_duration", metadata.get("total_duration", 0.0))
+        if not audio_file or not os.path.exists(audio_file) or estimated <= 0:
+            return timeline
         
-        # Create importance lookup
-        concept_dict = {c['name']: c for c in concepts}
+        try:
+            actual = get_mp3_duration_us(audio_file) / 1_000_000
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not measure audio duration, keeping estimated timings: {e}")
+            return timeline
         
-        # Find root nodes
-        root_nodes = {n for n in G.nodes() if G.in_degree(n) == 0}
+        # Relative to the already-applied factor, so repeated calls don't compound
+        factor = actual / metadata.get("total_duration", estimated)
+        timeline["word_timings"] = [
+            {**timing, "start_time": round(timing["start_time"] * factor, 3),
+             "end_time": round(timing["end_time"] * factor, 3)}
+            for timing in timeline.get("word_timings", [])
+        ]
+        concepts = timeline.get("concepts", [])
+        for concept in concepts:
+            concept["reveal_time"] = round(concept.get("reveal_time", 0.0) * factor, 3)
+        for sentence in timeline.get("sentences", []):
+            # Legacy copies only (create_timeline shares the same concept list)
+            if sentence.get("concepts") is not concepts:
+                for concept in sentence.get("concepts", []):
+                    concept["reveal_time"] = round(concept.get("reveal_time", 0.0) * factor, 3)
+            sentence["estimated_tts_duration"] = actual
+        
+        metadata["original_estimated_duration"] = estimated
+        metadata["actual_audio_duration"] = actual
+        metadata["timing_scale_factor"] = round(actual / estimated, 4)
+        metadata["total_duration"] = actual
+        logger.info(f"📏 Rescaled timings to audio: {estimated:.2f}s → {actual:.2f}s "
+                    f"(factor {metadata['timing_scale_factor']:.3f})")
+        return timeline
+    
+    def calculate_positions(self, G: ConceptGraph, concepts: List[Dict],
+                            previous_layout: Optional[Dict] = None) -> Dict[str, Tuple[float, float]]:
+        """
+        Calculate node positions in this engine's layout_style.
         
-        edges_to_keep = []
+        See layout_engine.py for the available styles ("hierarchical" is the
+        layered layout, "grid" the original 3-column Smart Grid). Results are
+        cached by graph fingerprint.
         
-        for node in G.nodes():
-            if node in root_nodes:
-                continue  # Root has no incoming edges
-            
-            # Get all incoming edges
-            incoming = list(G.in_edges(node))
+        Args:
+            G: ConceptGraph (or NetworkX directed graph)
+            concepts: List of concept dicts
+            previous_layout: Positions from an earlier version of the timeline;
+                             the "incremental" style keeps them in place
             
-            if len(incoming) <= max_incoming:
-                edges_to_keep.extend(incoming)
-            else:
-                # Sort by source importance (higher importance = keep)
-                incoming_sorted = sorted(
-                    incoming,
-                    key=lambda e: concept_dict.get(e[0], {}).get('importance', 0),
-                    reverse=True
-                )
-                
-                # Keep top max_incoming edges
-                edges_to_keep.extend(incoming_sorted[:max_incoming])
-                
-                dropped = len(incoming) - max_incoming
-                logger.debug(f"  📉 Node '{node}': kept {max_incoming}/{len(incoming)} edges (dropped {dropped})")
-        
-        logger.info(f"✅ Filtered edges: {len(edges_to_keep)}/{G.number_of_edges()} kept")
-        return edges_to_keep
+        Returns:
+            Dict mapping concept names to (x, y) positions
+        """
+        logger.info(f"📐 Calculating {self.layout_style} layout positions...")
+        pos = compute_layout(G, self.layout_style, concepts, previous=previous_layout)
+        logger.info(f"✅ Positioned {len(pos)} nodes in {self.layout_style} layout")
+        return pos
     
-    def prepare_graph(self, timeline: Dict) -> Tuple[nx.DiGraph, Dict]:
+    def prepare_graph(self, timeline: Dict, previous_layout: Optional[Dict] = None,
+                      max_incoming: int = 2) -> Tuple[ConceptGraph, Dict]:
         """
         Prepare graph with positions and filtered edges.
         
+        Builds a ConceptGraph in one pass over the relationships, keeping at
+        most max_incoming incoming edges per node (from the most important
+        sources). The graph is cached on the Timeline, so the renderer reuses
+        it. Call .to_networkx() on the result if a networkx graph is needed.
+        
         Args:
             timeline: Timeline dict with concepts and relationships
+            previous_layout: Positions to keep (see calculate_positions)
+            max_incoming: Maximum incoming edges per node
             
         Returns:
-            (NetworkX graph, position dict)
+            (ConceptGraph, position dict)
         """
         logger.info("🌐 Preparing graph structure...")
         
-        # Create directed graph
-        G = nx.DiGraph()
-        
-        # Add nodes
         concepts = timeline.get("concepts", [])
-        for concept in concepts:
-            G.add_node(concept["name"])
-        
-        # Add all edges first
-        relationships = timeline.get("relationships", [])
-        for rel in relationships:
-            if rel["from"] in G.nodes() and rel["to"] in G.nodes():
-                G.add_edge(
-                    rel["from"], 
-                    rel["to"], 
-                    label=rel.get("relationship", "")
-                )
-        
-        logger.info(f"  �� Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges (before filtering)")
-        
-        # Filter edges (max 2 incoming per node)
-        edges_to_keep = self._filter_edges_by_incoming_limit(G, concepts, max_incoming=2)
-        
-        # Create new filtered graph
-        G_filtered = nx.DiGraph()
-        G_filtered.add_nodes_from(G.nodes())
-        
-        for source, target in edges_to_keep:
-            label = G[source][target].get("label", "")
-            G_filtered.add_edge(source, target, label=label)
-        
-        logger.info(f"  📊 Filtered graph: {G_filtered.number_of_nodes()} nodes, {G_filtered.number_of_edges()} edges")
+        graph = timeline_graph(timeline, max_incoming=max_incoming)
         
         # Calculate positions
-        pos = self.calculate_positions(G_filtered, concepts)
+        pos = self.calculate_positions(graph, concepts, previous_layout)
         
         logger.info("✅ Graph preparation complete")
-        return G_filtered, pos
+        return graph, pos
     
     def cleanup(self):
         """Clean up temporary audio files."""
@@ -328,12 +334,17 @@ class PrecomputeEngine:
             except Exception as e:
                 logger.warning(f"⚠️ Could not clean up temp directory: {e}")
     
-    def precompute_all(self, timeline: Dict) -> Dict:
+    def precompute_all(self, timeline: Dict, chunked_audio: bool = False,
+                       previous_timeline: Optional[Dict] = None) -> Dict:
         """
         Main pre-computation method: Generate all assets.
         
         Args:
             timeline: Timeline from timeline_mapper
+            chunked_audio: Synthesize per sentence (enables reuse after edits)
+            previous_timeline: Timeline before an edit; its sentence audio chunks are
+                               reused for unchanged sentences (implies chunked_audio)
+                               and, with the "incremental" layout, its node positions
             
         Returns:
             Enhanced timeline with:
@@ -345,10 +356,18 @@ class PrecomputeEngine:
         logger.info("=" * 70)
         
         # Step 1: Generate audio with gTTS (character-based timing already set)
-        timeline = self.generate_all_audio(timeline)
+        if chunked_audio or previous_timeline:
+            previous_chunks = previous_timeline.get("audio_chunks") if previous_timeline else None
+            timeline = self.generate_chunked_audio(timeline, previous_chunks)
+        else:
+            timeline = self.generate_all_audio(timeline)
+        
+        if self.rescale_timings:
+            timeline = self.rescale_to_audio(timeline)
         
         # Step 2: Prepare graph and calculate layout
-        G, pos = self.prepare_graph(timeline)
+        previous_layout = previous_timeline.get("pre_calculated_layout") if previous_timeline else None
+        G, pos = self.prepare_graph(timeline, previous_layout)
         timeline["pre_calculated_layout"] = pos
         # Note: Don't store G in timeline (not JSON serializable)
         
@@ -0,0 +1,204 @@
+"""
+Prompt Compressor Module
+========================
+Reduces long descriptions to a token budget before they are pasted into an LLM prompt.
+
+Sentences are scored with TextRank over TF-IDF sentence vectors and the most
+salient ones are kept (in their original order) until the budget is used up.
+Only the prompt is compressed - concept timing still uses the full text.
+"""
+
+import os
+import math
+import logging
+from typing import Dict, List, Optional
+
+from description_analyzer import tokenize_words
+from token_tracker import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Prompt token budget for the description part of extraction prompts
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1500'))
+
+# TextRank parameters
+DAMPING_FACTOR = 0.85
+MAX_ITERATIONS = 50
+CONVERGENCE_THRESHOLD = 1e-6
+
+# Small boost for early sentences (topic sentences usually come first)
+LEAD_BIAS = 0.15
+
+STOPWORDS = frozenset("""
+a an and are as at be been being but by can could did do does for from had has have
+he her his how i if in into is it its may might more most of on or our she so such
+than that the their them then there these they this those to was we were what when
+where which while who will with would you your also about after before between both
+each other over under very through during
+""".split())
+
+
+def _sentence_terms(sentence: str) -> List[str]:
+    """Content-word tokens of a sentence (stopwords and 1-char tokens removed)."""
+    return [w for w in tokenize_words(sentence) if len(w) > 1 and w not in STOPWORDS]
+
+
+def _tfidf_vectors(sentences: List[str]) -> List[Dict[str, float]]:
+    """
+    Build L2-normalised TF-IDF vectors, one per sentence.
+
+    Args:
+        sentences: List of sentence strings
+
+    Returns:
+        List of sparse vectors as {term: weight} dicts
+    """
+    term_lists = [_sentence_terms(s) for s in sentences]
+
+    document_frequency = {}
+    for terms in term_lists:
+        for term in set(terms):
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    n = len(sentences)
+    vectors = []
+    for terms in term_lists:
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+
+        vector = {
+            term: (1 + math.log(count)) * math.log((1 + n) / (1 + document_frequency[term]))
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if norm > 0:
+            vector = {term: w / norm for term, w in vector.items()}
+        vectors.append(vector)
+
+    return vectors
+
+
+def score_sentences(sentences: List[str]) -> List[float]:
+    """
+    Score sentence salience with TextRank over TF-IDF cosine similarity.
+
+    Args:
+        sentences: Sentences from timeline_mapper.split_into_sentences()
+
+    Returns:
+        List of salience scores aligned with the input sentences
+    """
+    n = len(sentences)
+    if n == 0:
+        return []
+    if n == 1:
+        return [1.0]
+
+    vectors = _tfidf_vectors(sentences)
+
+    # Weighted similarity graph (cosine of normalised vectors = dot product)
+    neighbours = [[] for _ in range(n)]
+    out_weight = [0.0] * n
+    for i in range(n):
+        vi = vectors[i]
+        for j in range(i + 1, n):
+            vj = vectors[j]
+            if len(vi) > len(vj):
+                similarity = sum(w * vi.get(t, 0.0) for t, w in vj.items())
+            else:
+                similarity = sum(w * vj.get(t, 0.0) for t, w in vi.items())
+            if similarity > 0:
+                neighbours[i].append((j, similarity))
+                neighbours[j].append((i, similarity))
+                out_weight[i] += similarity
+                out_weight[j] += similarity
+
+    # PageRank power iteration
+    scores = [1.0 / n] * n
+    for _ in range(MAX_ITERATIONS):
+        new_scores = []
+        for i in range(n):
+            rank = sum(scores[j] * w / out_weight[j] for j, w in neighbours[i] if out_weight[j] > 0)
+            new_scores.append((1 - DAMPING_FACTOR) / n + DAMPING_FACTOR * rank)
+        delta = sum(abs(a - b) for a, b in zip(new_scores, scores))
+        scores = new_scores
+        if delta < CONVERGENCE_THRESHOLD:
+            break
+
+    return [score * (1 + LEAD_BIAS / (1 + i)) for i, score in enumerate(scores)]
+
+
+def compress_description(description: str, token_budget: Optional[int] = None) -> Dict:
+    """
+    Pick the most salient sentences of a description that fit a token budget.
+
+    Descriptions already within budget are returned unchanged. Otherwise sentences
+    are taken in salience order until the budget is full and then restored to their
+    original order, so the prompt still reads as connected text.
+
+    Args:
+        description: Full description text
+        token_budget: Max estimated tokens for the description (default: PROMPT_TOKEN_BUDGET)
+
+    Returns:
+        Dict with:
+        {
+            "text": str,                  # Text to paste into the prompt
+            "compressed": bool,
+            "original_tokens": int,
+            "compressed_tokens": int,
+            "compression_ratio": float,   # compressed_tokens / original_tokens
+            "sentences_total": int,
+            "sentences_kept": int
+        }
+    """
+    # Lazy import: timeline_mapper configures the Gemini client on import
+    from timeline_mapper import split_into_sentences
+
+    budget = token_budget if token_budget is not None else PROMPT_TOKEN_BUDGET
+    original_tokens = estimate_tokens(description)
+    sentences = split_into_sentences(description)
+
+    result = {
+        "text": description,
+        "compressed": False,
+        "original_tokens": original_tokens,
+        "compressed_tokens": original_tokens,
+        "compression_ratio": 1.0,
+        "sentences_total": len(sentences),
+        "sentences_kept": len(sentences)
+    }
+
+    if budget <= 0 or original_tokens <= budget or len(sentences) <= 1:
+        return result
+
+    scores = score_sentences(sentences)
+    ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+
+    selected = []
+    used_tokens = 0
+    for i in ranked:
+        sentence_tokens = estimate_tokens(sentences[i])
+        # Always keep the most salient sentence, even if it alone exceeds the budget
+        if selected and used_tokens + sentence_tokens > budget:
+            continue
+        selected.append(i)
+        used_tokens += sentence_tokens
+
+    compressed_text = " ".join(sentences[i] for i in sorted(selected))
+    compressed_tokens = estimate_tokens(compressed_text)
+
+    result.update({
+        "text": compressed_text,
+        "compressed": True,
+        "compressed_tokens": compressed_tokens,
+        "compression_ratio": round(compressed_tokens / max(original_tokens, 1), 3),
+        "sentences_kept": len(selected)
+    })
+
+    logger.info(
+        f"🗜️  Prompt compression: {original_tokens} → {compressed_tokens} tokens "
+        f"({len(selected)}/{len(sentences)} sentences, ratio {result['compression_ratio']:.2f})"
+    )
+    return result
@@ -0,0 +1,114 @@
+"""
+Rate Limiter Module
+===================
+Process-wide limiter for Gemini API calls.
+
+A token bucket caps the request rate (GEMINI_RPM requests per minute, with
+bursts up to GEMINI_BURST) and a semaphore caps requests in flight
+(GEMINI_MAX_CONCURRENT). Every generate_content call goes through the shared
+instance from get_rate_limiter(), so batch workers, hedged requests and chunked
+extraction all draw from one budget instead of each tripping the API quota.
+
+Set GEMINI_RPM=0 to disable rate limiting.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+GEMINI_RPM = float(os.getenv('GEMINI_RPM', '60'))
+GEMINI_BURST = int(os.getenv('GEMINI_BURST', '5'))
+GEMINI_MAX_CONCURRENT = int(os.getenv('GEMINI_MAX_CONCURRENT', '8'))
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket with an optional concurrency cap.
+    """
+
+    def __init__(self, requests_per_minute: float = GEMINI_RPM, burst: int = GEMINI_BURST,
+                 max_concurrent: int = GEMINI_MAX_CONCURRENT):
+        """
+        Args:
+            requests_per_minute: Sustained request rate (0 = unlimited)
+            burst: Requests allowed back-to-back before the rate applies
+            max_concurrent: Maximum requests in flight (0 = unlimited)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+
+        self.total_requests = 0
+        self.total_wait = 0.0
+
+    def _reserve(self) -> float:
+        """Take one token; returns how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # The token is taken even if not yet available (the balance goes
+            # negative), so waiting callers are served in arrival order
+            self._tokens -= 1.0
+            self.total_requests += 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent (rate only, no concurrency slot).
+
+        Returns:
+            Seconds waited
+        """
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+            with self._lock:
+                self.total_wait += wait
+        return wait
+
+    @contextmanager
+    def limit(self):
+        """Hold a concurrency slot and a rate token for the duration of one request."""
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            waited = self.acquire()
+            if waited > 0.5:
+                logger.info(f"⏳ Rate limiter: waited {waited:.1f}s for a Gemini request slot")
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.total_requests,
+                "total_wait": round(self.total_wait, 3),
+                "requests_per_minute": self.rate * 60.0
+            }
+
+
+# Global limiter instance
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the global rate limiter"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
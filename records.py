@@ -0,0 +1,242 @@
+"""
+Records Module
+==============
+Compact record types for concepts, relationships and word timings.
+
+The pipeline exchanges these as JSON-shaped dicts. Hot loops that repeatedly
+look fields up (layout ordering and fingerprints, reveal-time assignment)
+convert them once at the boundary instead:
+
+- NameTable:       interned concept names <-> integer IDs
+- ConceptRecord:   __slots__ concept (id, name, importance score, reveal_time, ...)
+- RelationshipRecord: __slots__ edge between concept IDs
+- ConceptTable:    concepts + relationships keyed by ID, O(1) lookup by name
+- WordTimingColumns: word timings as parallel word / start / end arrays
+
+from_dict/to_dict round-trip the JSON shape exactly; keys the record does not
+model are kept in `extra`.
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from concept_graph import importance_score
+
+_CONCEPT_FIELDS = ("name", "type", "importance", "importance_rank", "reveal_time")
+_RELATIONSHIP_FIELDS = ("from", "to", "relationship")
+
+
+class NameTable:
+    """Interned string table assigning dense integer IDs in first-seen order."""
+
+    __slots__ = ("names", "ids")
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        """ID of name, adding it if new."""
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name = sys.intern(name)
+            name_id = len(self.names)
+            self.names.append(name)
+            self.ids[name] = name_id
+        return name_id
+
+    def get(self, name: str) -> Optional[int]:
+        return self.ids.get(name)
+
+    def name(self, name_id: int) -> str:
+        return self.names[name_id]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name) -> bool:
+        return name in self.ids
+
+
+class ConceptRecord:
+    """One concept. `score` is the numeric importance used for ordering."""
+
+    __slots__ = ("id", "name", "type", "importance", "importance_rank", "reveal_time", "score", "extra")
+
+    def __init__(self, id: int, name: str, type: Optional[str] = None, importance=None,
+                 importance_rank: Optional[int] = None, reveal_time: Optional[float] = None,
+                 extra: Optional[Dict] = None):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.importance = importance
+        self.importance_rank = importance_rank
+        self.reveal_time = reveal_time
+        self.extra = extra
+        self.score = importance_score({"importance": importance, "importance_rank": importance_rank})
+
+    @classmethod
+    def from_dict(cls, data: Dict, id: int, name: Optional[str] = None) -> "ConceptRecord":
+        """Build from a concept dict (name may be passed pre-interned)."""
+        extra = {k: v for k, v in data.items() if k not in _CONCEPT_FIELDS} if len(data) > 1 else None
+        return cls(
+            id, name if name is not None else data.get("name", ""),
+            data.get("type"), data.get("importance"), data.get("importance_rank"),
+            data.get("reveal_time"), extra or None
+        )
+
+    def to_dict(self) -> Dict:
+        """Concept dict in the timeline schema (fields that were absent stay absent)."""
+        data = {"name": self.name}
+        if self.type is not None:
+            data["type"] = self.type
+        if self.importance is not None:
+            data["importance"] = self.importance
+        if self.importance_rank is not None:
+            data["importance_rank"] = self.importance_rank
+        if self.extra:
+            data.update(self.extra)
+        if self.reveal_time is not None:
+            data["reveal_time"] = self.reveal_time
+        return data
+
+    def __repr__(self) -> str:
+        return f"ConceptRecord({self.id}, {self.name!r}, reveal_time={self.reveal_time})"
+
+
+class RelationshipRecord:
+    """Directed relationship between two concept IDs."""
+
+    __slots__ = ("source", "target", "label", "extra")
+
+    def __init__(self, source: int, target: int, label: str = "", extra: Optional[Dict] = None):
+        self.source = source
+        self.target = target
+        self.label = label
+        self.extra = extra
+
+    def __repr__(self) -> str:
+        return f"RelationshipRecord({self.source} -> {self.target}, {self.label!r})"
+
+
+class ConceptTable:
+    """
+    Concepts and relationships of one timeline, indexed by ID and name.
+
+    Built once per timeline with from_dicts(); concepts keep their input order.
+    A repeated concept name resolves to the last occurrence (as a name-keyed
+    dict of the input would).
+    """
+
+    __slots__ = ("names", "concepts", "by_id", "relationships")
+
+    def __init__(self, names: NameTable, concepts: List[ConceptRecord],
+                 relationships: List[RelationshipRecord]):
+        self.names = names
+        self.concepts = concepts
+        self.relationships = relationships
+        self.by_id: List[Optional[ConceptRecord]] = [None] * len(names)
+        for record in concepts:
+            self.by_id[record.id] = record
+
+    @classmethod
+    def from_dicts(cls, concepts: Optional[Iterable[Dict]],
+                   relationships: Optional[Iterable[Dict]] = None) -> "ConceptTable":
+        """
+        Convert concept / relationship dicts.
+
+        Concepts without a name and relationships whose endpoints are not
+        concepts are skipped.
+        """
+        names = NameTable()
+        records = []
+        for data in concepts or ():
+            if not isinstance(data, dict) or not data.get("name"):
+                continue
+            name_id = names.intern(data["name"])
+            records.append(ConceptRecord.from_dict(data, name_id, names.names[name_id]))
+
+        edges = []
+        for data in relationships or ():
+            source = names.get(data.get("from"))
+            target = names.get(data.get("to"))
+            if source is None or target is None:
+                continue
+            extra = {k: v for k, v in data.items() if k not in _RELATIONSHIP_FIELDS} or None
+            edges.append(RelationshipRecord(source, target, data.get("relationship", ""), extra))
+        return cls(names, records, edges)
+
+    @classmethod
+    def coerce(cls, concepts) -> "ConceptTable":
+        """A ConceptTable as-is, or one built from concept dicts (None = empty)."""
+        return concepts if isinstance(concepts, cls) else cls.from_dicts(concepts)
+
+    def get(self, name: str) -> Optional[ConceptRecord]:
+        name_id = self.names.get(name)
+        return None if name_id is None else self.by_id[name_id]
+
+    def score(self, name: str, default: float = 0.0) -> float:
+        record = self.get(name)
+        return default if record is None else record.score
+
+    def reveal_time(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        record = self.get(name)
+        if record is None or record.reveal_time is None:
+            return default
+        return record.reveal_time
+
+    def __len__(self) -> int:
+        return len(self.concepts)
+
+    def __iter__(self):
+        return iter(self.concepts)
+
+    def concept_dicts(self) -> List[Dict]:
+        return [record.to_dict() for record in self.concepts]
+
+    def relationship_dicts(self) -> List[Dict]:
+        names = self.names.names
+        result = []
+        for edge in self.relationships:
+            data = {"from": names[edge.source], "to": names[edge.target], "relationship": edge.label}
+            if edge.extra:
+                data.update(edge.extra)
+            result.append(data)
+        return result
+
+
+class WordTimingColumns:
+    """Word timings as parallel arrays (float64 start/end columns)."""
+
+    __slots__ = ("words", "starts", "ends")
+
+    def __init__(self, words: List[str], starts: array, ends: array):
+        self.words = words
+        self.starts = starts
+        self.ends = ends
+
+    @classmethod
+    def from_dicts(cls, word_timings: Iterable[Dict]) -> "WordTimingColumns":
+        words = []
+        starts = array("d")
+        ends = array("d")
+        for timing in word_timings:
+            words.append(timing["word"])
+            starts.append(timing["start_time"])
+            ends.append(timing["end_time"])
+        return cls(words, starts, ends)
+
+    def to_dicts(self) -> List[Dict]:
+        return [{"word": w, "start_time": s, "end_time": e}
+                for w, s, e in zip(self.words, self.starts, self.ends)]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def total_duration(self) -> float:
+        return self.ends[-1] if self.ends else 0.0
+
@@ -0,0 +1,297 @@
+"""
+Similarity Cache Module
+=======================
+Near-duplicate cache in front of concept extraction.
+
+Descriptions are reduced to MinHash signatures over word shingles (using the same
+tokenization as analyze_description_complexity, so case, whitespace and
+punctuation edits disappear). Candidates are found with LSH banding and accepted
+when the estimated Jaccard similarity passes SIMILARITY_CACHE_THRESHOLD; a typo
+or a small rewording then reuses the cached concepts and relationships instead of
+making a new LLM call.
+
+Opt-in (SIMILARITY_CACHE=true): a hit returns an earlier extraction for an
+edited description, so results can differ from a fresh extraction.
+
+Only concepts and relationships are cached - reveal times are always recomputed
+against the new text by timeline_mapper.assign_concept_reveal_times().
+
+Saves entries to similarity_cache/cache.json. Hit statistics (hits, last_used)
+are kept in memory and written with the next store(), at most every
+SIMILARITY_CACHE_FLUSH_SECONDS from lookup(), or at interpreter exit, so cache
+hits do not rewrite the file on the extraction path.
+"""
+
+import os
+import json
+import copy
+import time
+import atexit
+import random
+import hashlib
+import logging
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from description_analyzer import tokenize_words
+
+logger = logging.getLogger(__name__)
+
+# Directory for storing the cache
+CACHE_DIR = Path(__file__).parent / "similarity_cache"
+CACHE_FILE = CACHE_DIR / "cache.json"
+
+# Cache configuration
+SIMILARITY_CACHE_ENABLED = os.getenv('SIMILARITY_CACHE', 'false').lower() == 'true'
+SIMILARITY_THRESHOLD = float(os.getenv('SIMILARITY_CACHE_THRESHOLD', '0.85'))
+MAX_CACHE_ENTRIES = int(os.getenv('SIMILARITY_CACHE_MAX_ENTRIES', '500'))
+FLUSH_INTERVAL_SECONDS = float(os.getenv('SIMILARITY_CACHE_FLUSH_SECONDS', '60'))
+
+# MinHash / LSH parameters: 32 bands x 4 rows. Pairs at the 0.85 threshold become
+# candidates with probability ~1 - (1 - 0.85^4)^32 (> 0.9999)
+SHINGLE_SIZE = 2
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures must be stable across processes to be persisted
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randint(1, _MERSENNE_PRIME - 1), _rng.randint(0, _MERSENNE_PRIME - 1))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def word_shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """
+    Normalized word shingles of a text.
+
+    Args:
+        text: Description text
+        size: Words per shingle
+
+    Returns:
+        List of unique shingle strings (single words for very short texts)
+    """
+    words = tokenize_words(text)
+    if len(words) < size:
+        return list(dict.fromkeys(words))
+    return list(dict.fromkeys(" ".join(words[i:i + size]) for i in range(len(words) - size + 1)))
+
+
+def minhash_signature(text: str) -> List[int]:
+    """
+    MinHash signature of a text's word shingles.
+
+    Args:
+        text: Description text
+
+    Returns:
+        List of NUM_PERMUTATIONS ints (all _MAX_HASH for empty text)
+    """
+    base_hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in word_shingles(text)]
+    if not base_hashes:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in base_hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """Estimated Jaccard similarity: fraction of matching signature positions."""
+    matches = sum(1 for x, y in zip(signature_a, signature_b) if x == y)
+    return matches / NUM_PERMUTATIONS
+
+
+def _band_keys(signature: List[int], educational_level: str) -> List[str]:
+    """LSH bucket keys; the educational level is part of the key so levels never mix."""
+    level = educational_level.lower()
+    return [
+        f"{level}|{band}|" + ",".join(map(str, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+        for band in range(LSH_BANDS)
+    ]
+
+
+class SimilarityCache:
+    """
+    MinHash/LSH cache of extraction results keyed by description similarity.
+    """
+
+    def __init__(self, cache_file: Path = CACHE_FILE, threshold: float = SIMILARITY_THRESHOLD,
+                 max_entries: int = MAX_CACHE_ENTRIES, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.cache_file = Path(cache_file)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.entries = {}   # entry_id -> entry dict
+        self.buckets = {}   # band key -> set of entry_ids
+        self._lock = threading.Lock()
+        self._dirty = False  # In-memory hit stats not yet on disk
+        self._last_save = time.monotonic()
+        self._load()
+
+    def _load(self):
+        """Load persisted entries and rebuild the LSH index."""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load similarity cache: {e}")
+            return
+
+        for entry in data.get('entries', []):
+            if len(entry.get('signature', [])) != NUM_PERMUTATIONS:
+                continue  # Written with different MinHash parameters
+            self._index(entry)
+        logger.debug(f"Loaded {len(self.entries)} similarity cache entries")
+
+    def _save(self):
+        """Persist entries (atomic replace so a crash never leaves a partial file)."""
+        try:
+            self.cache_file.parent.mkdir(exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'entries': list(self.entries.values())}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save similarity cache: {e}")
+
+    def _index(self, entry: Dict):
+        self.entries[entry['id']] = entry
+        for key in _band_keys(entry['signature'], entry['educational_level']):
+            self.buckets.setdefault(key, set()).add(entry['id'])
+
+    def _unindex(self, entry_id: str):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in _band_keys(entry['signature'], entry['educational_level']):
+            bucket = self.buckets.get(key)
+            if bucket:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def lookup(self, description: str, educational_level: str) -> Optional[Dict]:
+        """
+        Find cached extraction results for a near-duplicate description.
+
+        Args:
+            description: Description text
+            educational_level: Educational level (must match the cached entry)
+
+        Returns:
+            Dict with 'concepts', 'relationships' (deep copies), 'similarity' and
+            'entry_id', or None on a miss
+        """
+        signature = minhash_signature(description)
+
+        with self._lock:
+            candidates = set()
+            for key in _band_keys(signature, educational_level):
+                candidates.update(self.buckets.get(key, ()))
+
+            best_id, best_similarity = None, 0.0
+            for entry_id in candidates:
+                similarity = estimate_similarity(signature, self.entries[entry_id]['signature'])
+                if similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_id is None or best_similarity < self.threshold:
+                return None
+
+            entry = self.entries[best_id]
+            entry['hits'] = entry.get('hits', 0) + 1
+            entry['last_used'] = datetime.now().isoformat()
+            result = {
+                'concepts': copy.deepcopy(entry['concepts']),
+                'relationships': copy.deepcopy(entry['relationships']),
+                'similarity': round(best_similarity, 3),
+                'entry_id': best_id
+            }
+            # Hit stats stay in memory; persist them only every flush_interval
+            self._dirty = True
+            if time.monotonic() - self._last_save >= self.flush_interval:
+                self._save()
+
+        logger.info(f"♻️  Similarity cache hit ({result['similarity']:.2f}): "
+                    f"reusing {len(result['concepts'])} concepts")
+        return result
+
+    def store(self, description: str, educational_level: str,
+              concepts: List[Dict], relationships: List[Dict]):
+        """
+        Cache extraction results for a description.
+
+        Args:
+            description: Description text the results were extracted from
+            educational_level: Educational level used for extraction
+            concepts: Extracted concepts (reveal_time is not stored)
+            relationships: Extracted relationships
+        """
+        words = tokenize_words(description)
+        now = datetime.now().isoformat()
+        entry = {
+            'id': hashlib.sha256(f"{educational_level.lower()}|{' '.join(words)}".encode('utf-8')).hexdigest()[:16],
+            'signature': minhash_signature(description),
+            'educational_level': educational_level,
+            'word_count': len(words),
+            'description_preview': description[:200],
+            'concepts': [{k: v for k, v in c.items() if k != 'reveal_time'} for c in concepts],
+            'relationships': copy.deepcopy(relationships),
+            'created_at': now,
+            'last_used': now,
+            'hits': 0
+        }
+
+        with self._lock:
+            self._unindex(entry['id'])
+            self._index(entry)
+
+            # Evict least recently used entries
+            if len(self.entries) > self.max_entries:
+                by_age = sorted(self.entries.values(), key=lambda e: e.get('last_used', ''))
+                for old in by_age[:len(self.entries) - self.max_entries]:
+                    self._unindex(old['id'])
+
+            self._save()
+
+    def flush(self):
+        """Write pending hit statistics to disk."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self.entries.clear()
+            self.buckets.clear()
+            self._save()
+
+
+# Global cache instance
+_global_cache = None
+_global_cache_lock = threading.Lock()
+
+
+def get_similarity_cache() -> SimilarityCache:
+    """Get the global similarity cache (loaded from disk on first use)."""
+    global _global_cache
+    with _global_cache_lock:
+        if _global_cache is None:
+            _global_cache = SimilarityCache()
+            atexit.register(_global_cache.flush)
+        return _global_cache
@@ -5,7 +5,8 @@ This module defines the state structure for the description-based concept mappin
 that can extract concepts directly from user descriptions of any length (1 word to 3000+ words).
 """
 
-from typing import Dict, List, Any, TypedDict
+import operator
+from typing import Annotated, Dict, List, Any, Optional, TypedDict
 
 
 class ConceptMapState(TypedDict):
@@ -42,4 +43,23 @@ class ConceptMapState(TypedDict):
     processing_log: List[str]         # Step-by-step processing log
     errors: List[str]                 # Any errors encountered
     success: bool                     # Overall success status
-    timestamp: str                    # Processing timestamp
\ No newline at end of file
+    timestamp: str                    # Processing timestamp
+
+
+def all_succeeded(current: Optional[bool], update: Optional[bool]) -> bool:
+    """Reducer for success: stays True only while every update is True."""
+    if current is None:
+        return bool(update)
+    return bool(current and update)
+
+
+# State for the async workflow, whose branches run in parallel. Nodes there
+# return partial updates; log and error entries from concurrent branches are
+# concatenated, and success stays True only if every branch succeeded.
+# (success is Optional so the channel starts from the input value, not False.)
+ParallelConceptMapState = TypedDict('ParallelConceptMapState', {
+    **ConceptMapState.__annotations__,
+    'processing_log': Annotated[List[str], operator.add],
+    'errors': Annotated[List[str], operator.add],
+    'success': Annotated[Optional[bool], all_succeeded],
+})
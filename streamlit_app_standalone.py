@@ -13,7 +13,6 @@ import os
 import tempfile
 import time
 import logging
-import json
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -26,8 +25,7 @@ parent_dir = os.path.dirname(os.path.abspath(__file__))
 PARENT_PATH = Path(parent_dir)
 sys.path.insert(0, parent_dir)
 
-TIMELINE_EXPORT_DIR = PARENT_PATH / "concept_json_timings"
-TIMELINE_EXPORT_DIR.mkdir(exist_ok=True)
+TIMELINE_EXPORT_BINARY = os.getenv('TIMELINE_EXPORT_BINARY', 'true').lower() == 'true'
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -39,8 +37,16 @@ if not os.getenv('GOOGLE_API_KEY'):
     st.stop()
 
 # Import required modules
-from timeline_mapper import create_timeline
+from timeline_mapper import create_timeline, update_timeline
+from hedged_request import HEDGED_EXTRACTION_ENABLED
+from timeline_store import get_timeline_store, description_hash
+from timeline_model import serialize_timeline
 from precompute_engine import PrecomputeEngine
+from mp3_duration import get_mp3_duration_us
+from keyframe_compositor import play_fade_in, rasterize
+from layout_engine import LAYOUT_STYLES, compute_layout
+from concept_graph import ConceptGraph, timeline_graph
+from records import ConceptTable
 import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib
@@ -101,30 +107,71 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-def save_timeline_json_to_disk(timeline):
-    """Save the generated timeline JSON (with concept timings) to disk automatically."""
-    metadata = timeline.get("metadata", {})
-    topic = metadata.get("topic") or metadata.get("topic_name") or "concept_map"
-    sanitized_topic = "".join(ch if ch.isalnum() or ch in ("-", "_") else "_" for ch in topic).strip("_") or "concept_map"
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{sanitized_topic}_{timestamp}.json"
-    filepath = TIMELINE_EXPORT_DIR / filename
+def save_timeline_json_to_disk(timeline, description=None):
+    """Save the generated timeline JSON (with concept timings) to the indexed timeline store."""
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(timeline, f, indent=2, ensure_ascii=False)
-        logger.info(f"💾 Timeline JSON saved to {filepath}")
-        return filepath
+        store = get_timeline_store()
+        entry = store.save(timeline, description, write_binary=TIMELINE_EXPORT_BINARY)
+        return store.path_for(entry)
     except Exception as exc:
         logger.error(f"Failed to save timeline JSON: {exc}")
         return None
 
 
+def render_timeline_history(layout_style="hierarchical"):
+    """
+    Show saved timelines from the timeline store (paginated, filterable by topic).
+    
+    Loading a timeline regenerates its audio if the temp file is gone, without
+    calling the LLM again.
+    """
+    store = get_timeline_store()
+    
+    with st.expander("📂 Saved Timelines", expanded=False):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            topic_filter = st.text_input("Filter by topic", key="history_topic_filter")
+        with col2:
+            page = st.number_input("Page", min_value=1, value=1, step=1, key="history_page")
+        
+        result = store.list_page(page=int(page), page_size=10, topic=topic_filter or None)
+        if not result['entries']:
+            st.caption("No saved timelines yet.")
+            return
+        
+        st.caption(f"{result['total']} timelines · page {result['page']} of {result['pages']}")
+        for entry in result['entries']:
+            created = datetime.fromisoformat(entry['created_at']).strftime('%Y-%m-%d %H:%M')
+            col1, col2, col3 = st.columns([4, 1, 1])
+            with col1:
+                st.write(f"**{entry['topic']}** · {entry['educational_level']} · "
+                         f"{entry['concept_count']} concepts · {entry['duration']:.1f}s · {created}")
+            with col2:
+                if st.button("▶️ Load", key=f"history_load_{entry['id']}"):
+                    timeline = store.load(entry['id'])
+                    if timeline is None:
+                        st.error("❌ Timeline file is missing.")
+                        continue
+                    if not (timeline.get("audio_file") and os.path.exists(timeline["audio_file"])):
+                        with st.spinner("🎤 Regenerating audio..."):
+                            timeline = PrecomputeEngine(layout_style=layout_style).precompute_all(timeline)
+                    st.session_state.timeline = timeline
+                    st.session_state.layout_style = layout_style
+                    st.session_state.viz_started = False
+                    st.session_state.viz_completed = False
+                    st.rerun()
+            with col3:
+                if st.button("🗑️", key=f"history_delete_{entry['id']}", help="Delete this timeline"):
+                    store.delete(entry['id'])
+                    st.rerun()
+
+
 def render_graph(G, pos, visible_nodes, new_nodes, alpha_map, scale_map, show_edge_labels=True):
     """
     Render the graph with animations and edge labels.
     
     Args:
-        G: NetworkX graph
+        G: ConceptGraph (or NetworkX graph)
         pos: Node positions dict
         visible_nodes: Set of visible node names
         new_nodes: Set of newly added nodes
@@ -137,14 +184,19 @@ def render_graph(G, pos, visible_nodes, new_nodes, alpha_map, scale_map, show_ed
     fig.patch.set_facecolor('#ffffff')
     
     # Draw edges for visible nodes only
-    visible_edges = [(u, v) for u, v in G.edges() 
-                     if u in visible_nodes and v in visible_nodes]
+    if isinstance(G, ConceptGraph):
+        visible_edges = G.edges_among(visible_nodes)
+        nx_graph = G.to_networkx()  # networkx is only needed for edge drawing
+    else:
+        visible_edges = [(u, v) for u, v in G.edges() 
+                         if u in visible_nodes and v in visible_nodes]
+        nx_graph = G
     
-    logger.debug(f"render_graph: {len(G.nodes())} total nodes, {len(G.edges())} total edges, {len(visible_nodes)} visible nodes, {len(visible_edges)} visible edges")
+    logger.debug(f"render_graph: {G.number_of_nodes()} total nodes, {G.number_of_edges()} total edges, {len(visible_nodes)} visible nodes, {len(visible_edges)} visible edges")
     
     if visible_edges:
         nx.draw_networkx_edges(
-            G, pos,
+            nx_graph, pos,
             edgelist=visible_edges,
             edge_color='#5a6c7d',  # Darker gray for better visibility
             alpha=0.6,  # More opaque
@@ -200,9 +252,11 @@ def render_graph(G, pos, visible_nodes, new_nodes, alpha_map, scale_map, show_ed
         edge_labels = {}
         for u, v in visible_edges:
             # Get relationship from edge data
-            if G.has_edge(u, v):
+            if isinstance(G, ConceptGraph):
+                edge_labels[(u, v)] = G.label(u, v) or 'related to'
+            elif G.has_edge(u, v):
                 edge_data = G.get_edge_data(u, v)
-                rel_type = edge_data.get('relationship', 'related to')
+                rel_type = edge_data.get('label') or edge_data.get('relationship', 'related to')
                 edge_labels[(u, v)] = rel_type
         
         if edge_labels:
@@ -270,33 +324,11 @@ def animate_fade_in(graph_placeholder, G, pos, sentence_data,
     if not new_nodes:
         return
     
-    # Animation loop
-    alpha_map = {node: 0.0 for node in new_nodes}
-    scale_map = {node: 0.3 for node in new_nodes}
-    
-    for step in range(steps + 1):
-        progress = step / steps
-        
-        # Update alpha (fade-in: 0 → 1.0)
-        for node in new_nodes:
-            alpha_map[node] = progress
-            
-        # Update scale (pop-in: 0.3 → 1.0)
-        for node in new_nodes:
-            scale_map[node] = 0.3 + (0.7 * progress)
-        
-        # Render graph with current animation state
-        visible_nodes = existing_nodes | new_nodes
-        fig = render_graph(G, pos, visible_nodes, new_nodes, alpha_map, scale_map, show_edge_labels)
-        
-        with graph_placeholder:
-            st.pyplot(fig)
-        
-        plt.close(fig)
-        
-        # Sleep between frames
-        if step < steps:
-            time.sleep(animation_duration / steps)
+    # Fade-in: two renders, alpha-blended keyframes in between
+    visible_nodes = existing_nodes | new_nodes
+    base_fig = render_graph(G, pos, existing_nodes, set(), {}, {}, show_edge_labels)
+    target_fig = render_graph(G, pos, visible_nodes, new_nodes, {}, {}, show_edge_labels)
+    play_fade_in(graph_placeholder, base_fig, target_fig, duration=animation_duration, steps=steps)
 
 
 def play_audio(audio_file, wait_for_audio=True):
@@ -318,17 +350,12 @@ def play_audio(audio_file, wait_for_audio=True):
             # Get audio duration for timing
             duration = 0
             try:
-                import mutagen
-                from mutagen.mp3 import MP3
-                audio = MP3(audio_file)
-                duration = audio.info.length
+                # Exact duration from MP3 frame headers (no decoding, no dependencies)
+                duration = get_mp3_duration_us(audio_file) / 1_000_000
                 logger.info(f"Playing audio: {duration:.2f}s")
-            except:
-                # Fallback: estimate duration from file size
-                file_size = os.path.getsize(audio_file)
-                # Rough estimate: ~1KB per 0.1 seconds for MP3
-                duration = max(2.0, file_size / 10000)
-                logger.info(f"Playing audio file: {audio_file} (estimated {duration:.1f}s)")
+            except (OSError, ValueError) as e:
+                duration = 2.0
+                logger.warning(f"Could not read audio duration of {audio_file} ({e}), assuming {duration:.1f}s")
             
             # Wait for audio to "play" (give user time to hear it)
             if wait_for_audio and duration > 0:
@@ -381,40 +408,108 @@ def reveal_concepts_progressively(
             plt.close(fig)
         return visible_nodes
     
-    # Animate new concepts with fade-in
+    # Animate new concepts with fade-in (alpha-blended keyframes, two renders)
     new_nodes_set = set(newly_revealed)
-    alpha_map = {node: 0.0 for node in new_nodes_set}
-    scale_map = {node: 0.3 for node in new_nodes_set}
-    
     steps = max(5, int(animation_duration * 10))  # 10 fps
     
-    for step in range(steps + 1):
-        progress = step / steps
-        
-        # Update alpha and scale
-        for node in new_nodes_set:
-            alpha_map[node] = progress
-            scale_map[node] = 0.3 + (0.7 * progress)
-        
-        # Render graph with new nodes for animation
-        current_visible = visible_nodes | new_nodes_set
-        
-        # Render graph (it will calculate visible edges internally)
-        fig = render_graph(G, pos, current_visible, new_nodes_set, alpha_map, scale_map, show_edge_labels)
-        
-        with graph_placeholder:
-            st.pyplot(fig)
-        
-        plt.close(fig)
-        
-        # Small delay between frames
-        if step < steps:
-            time.sleep(animation_duration / steps)
+    base_fig = render_graph(G, pos, visible_nodes, set(), {}, {}, show_edge_labels)
+    target_fig = render_graph(G, pos, visible_nodes | new_nodes_set, new_nodes_set, {}, {}, show_edge_labels)
+    play_fade_in(graph_placeholder, base_fig, target_fig, duration=animation_duration, steps=steps)
     
     # Add newly revealed nodes to visible set
     return visible_nodes | new_nodes_set
 
 
+def timeline_artifact_key(timeline) -> str:
+    """Identity of a timeline for the session artifact cache (changes with every generation or edit)."""
+    metadata = timeline.get('metadata', {})
+    return "|".join(str(part) for part in (
+        description_hash(timeline.get('full_text', '')),
+        metadata.get('educational_level', ''),
+        timeline.get('audio_file', ''),
+        len(timeline.get('concepts', [])),
+        len(timeline.get('relationships', [])),
+        metadata.get('total_duration', 0)
+    ))
+
+
+def get_timeline_artifacts(timeline) -> dict:
+    """
+    Session-scoped artifact cache for the current timeline.
+    
+    Holds values derived from the timeline (serialized JSON, prepared graph,
+    layout, rendered static layers) so reruns don't recompute them. When the
+    session shows a different timeline, the previous artifacts are dropped.
+    
+    Args:
+        timeline: Timeline being displayed
+        
+    Returns:
+        Dict of artifacts for this timeline (fill it with _artifact())
+    """
+    key = timeline_artifact_key(timeline)
+    artifacts = st.session_state.get('timeline_artifacts')
+    if artifacts is None or artifacts.get('_key') != key:
+        if artifacts is not None:
+            logger.info("🗑️  Timeline changed, dropping cached session artifacts")
+        artifacts = {'_key': key}
+        st.session_state.timeline_artifacts = artifacts
+    return artifacts
+
+
+def _artifact(artifacts, name, build):
+    """Cached artifact, built on first use."""
+    if name not in artifacts:
+        artifacts[name] = build()
+    return artifacts[name]
+
+
+def _build_timing_table(timeline):
+    """Node timings table for the debug panel (None if there are no concepts)."""
+    timing_data = []
+    for concept in timeline.get("concepts", []):
+        timing_data.append({
+            "Node": concept.get("name", ""),
+            "Reveal Time (s)": f"{concept.get('reveal_time', 0):.2f}",
+            "Importance": concept.get("importance", 0)
+        })
+    if not timing_data:
+        return None
+    import pandas as pd
+    return pd.DataFrame(timing_data)
+
+
+def _resolve_layout(timeline, G, layout_style, records=None):
+    """Pre-computed layout from the timeline, or a fallback layout in layout_style."""
+    pos = timeline.get("pre_calculated_layout", timeline.get("layout", {}))
+    
+    logger.info(f"📐 Layout info: pre_calculated_layout exists={bool(pos)}, positions={len(pos) if pos else 0}")
+    if pos:
+        logger.info(f"   Sample positions: {list(pos.items())[:3]}")
+        return pos
+    
+    # If no layout provided, calculate one using selected style (fallback only)
+    logger.warning("⚠️ No pre-calculated layout found! Calculating fallback layout...")
+    if len(G.nodes()) == 0:
+        return {}
+    try:
+        # Same layout engine as PrecomputeEngine for consistency
+        pos = compute_layout(G, layout_style, records if records is not None else timeline.get("concepts", []))
+        logger.info(f"✅ Created {layout_style} layout")
+    except Exception as e:
+        logger.error(f"Layout calculation failed: {e}")
+        # Fallback: simple grid layout
+        nodes = list(G.nodes())
+        import math
+        cols = math.ceil(math.sqrt(len(nodes)))
+        pos = {}
+        for i, node in enumerate(nodes):
+            row = i // cols
+            col = i % cols
+            pos[node] = (col, -row)
+    return pos
+
+
 def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_labels=True):
     """
     Run the dynamic visualization with continuous audio and keyword-timed reveals.
@@ -427,9 +522,12 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
     st.markdown("---")
     st.markdown("### 🎬 Dynamic Concept Map (Keyword-Timed)")
     
+    # Serialized JSON, prepared graph, layout and static layers are computed
+    # once per timeline and reused across reruns
+    artifacts = get_timeline_artifacts(timeline)
+    timeline_json = _artifact(artifacts, 'json_bytes', lambda: serialize_timeline(timeline, indent=2).encode('utf-8'))
+    
     # Always-visible Download Button
-    import json
-    timeline_json = json.dumps(timeline, indent=2)
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         st.download_button(
@@ -450,23 +548,12 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
         
         # Show Node Timings Table
         st.write("### 📊 Node Timings")
-        timing_data = []
-        for sentence in timeline.get("sentences", []):
-            for concept in sentence.get("concepts", []):
-                timing_data.append({
-                    "Node": concept.get("name", ""),
-                    "Reveal Time (s)": f"{concept.get('reveal_time', 0):.2f}",
-                    "Importance": concept.get("importance", 0)
-                })
-        if timing_data:
-            import pandas as pd
-            df = pd.DataFrame(timing_data)
-            st.dataframe(df, use_container_width=True)
+        timing_table = _artifact(artifacts, 'timing_table', lambda: _build_timing_table(timeline))
+        if timing_table is not None:
+            st.dataframe(timing_table, use_container_width=True)
         
         # Download Complete Timeline as JSON
         st.write("### 💾 Download Timeline")
-        import json
-        timeline_json = json.dumps(timeline, indent=2)
         st.download_button(
             label="📥 Download Complete Timeline JSON",
             data=timeline_json,
@@ -481,86 +568,22 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
             st.write(f"**First Sentence Concepts:** {len(first_sent.get('concepts', []))}")
             st.json(first_sent)
     
-    # Create graph
-    G = nx.DiGraph()
-    
-    # Get concepts and relationships from timeline (continuous format)
-    all_concepts = set()
-    concepts = timeline.get("concepts", [])
-    
-    # Extract concept names
-    for concept in concepts:
-        if isinstance(concept, dict):
-            concept_name = concept.get("name", "")
-        else:
-            concept_name = str(concept)
-        
-        if concept_name.strip():
-            all_concepts.add(concept_name)
-    
-    logger.info(f"📊 Building graph with {len(all_concepts)} concepts")
-    
-    # Add nodes to graph
-    for concept_name in all_concepts:
-        G.add_node(concept_name)
+    # Same filtered graph PrecomputeEngine.prepare_graph laid out (max 2 incoming
+    # edges); shared with it when this is the Timeline it just precomputed
+    G = _artifact(artifacts, 'graph', lambda: timeline_graph(timeline, max_incoming=2))
+    all_concepts = set(G.nodes())
+    # Concept records (interned names, reveal times) and the reveal order, built once
+    records = _artifact(artifacts, 'concept_records', lambda: ConceptTable.from_dicts(
+        timeline.get("concepts", []), timeline.get("relationships", [])
+    ))
+    reveal_schedule = _artifact(artifacts, 'reveal_schedule', lambda: sorted(
+        records, key=lambda record: record.reveal_time or 0.0
+    ))
     
-    # Add edges from relationships (top-level relationships array)
-    relationships = timeline.get("relationships", [])
-    logger.info(f"🔗 Processing {len(relationships)} relationships")
-    
-    edges_added = 0
-    for rel in relationships:
-        if isinstance(rel, dict):
-            from_node = rel.get("from", "")
-            to_node = rel.get("to", "")
-            rel_type = rel.get("relationship", "related to")
-            
-            if from_node in all_concepts and to_node in all_concepts:
-                G.add_edge(from_node, to_node, relationship=rel_type)
-                edges_added += 1
-                logger.debug(f"  ➜ Added edge: {from_node} --[{rel_type}]--> {to_node}")
-    
-    logger.info(f"✅ Graph built: {len(G.nodes())} nodes, {len(G.edges())} edges (added {edges_added})")
+    logger.info(f"✅ Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
     
     # Get pre-computed layout from timeline (preferred) or calculate fallback
-    pos = timeline.get("pre_calculated_layout", timeline.get("layout", {}))
-    
-    logger.info(f"📐 Layout info: pre_calculated_layout exists={bool(pos)}, positions={len(pos) if pos else 0}")
-    if pos:
-        logger.info(f"   Sample positions: {list(pos.items())[:3]}")
-    
-    # If no layout provided, calculate one using selected style (fallback only)
-    if not pos or len(pos) == 0:
-        logger.warning("⚠️ No pre-calculated layout found! Calculating fallback layout...")
-        if len(G.nodes()) > 0:
-            try:
-                if layout_style == "hierarchical":
-                    # Use SAME implementation as PrecomputeEngine for consistency
-                    from precompute_engine import PrecomputeEngine
-                    engine = PrecomputeEngine()
-                    pos = engine._create_hierarchical_tree_layout(G)
-                    logger.info(f"✅ Created hierarchical layout using PrecomputeEngine (consistent)")
-                elif layout_style == "shell":
-                    pos = nx.shell_layout(G)
-                elif layout_style == "circular":
-                    pos = nx.circular_layout(G)
-                elif layout_style == "kamada-kawai":
-                    pos = nx.kamada_kawai_layout(G)
-                else:  # spring
-                    pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
-            except Exception as e:
-                logger.error(f"Layout calculation failed: {e}")
-                # Fallback: simple grid layout
-                nodes = list(G.nodes())
-                import math
-                cols = math.ceil(math.sqrt(len(nodes)))
-                pos = {}
-                for i, node in enumerate(nodes):
-                    row = i // cols
-                    col = i % cols
-                    pos[node] = (col, -row)
-        else:
-            pos = {}
+    pos = _artifact(artifacts, f'layout_{layout_style}', lambda: _resolve_layout(timeline, G, layout_style, records))
     
     # Show warning if no concepts found
     if len(all_concepts) == 0:
@@ -575,11 +598,12 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
         st.caption(f"Total concepts to display: {len(all_concepts)}")
         graph_placeholder = st.empty()
         
-        # Initial empty graph
+        # Initial empty graph (static layer, rendered once per timeline)
         if len(all_concepts) > 0:
-            fig = render_graph(G, pos, set(), set(), {}, {}, show_edge_labels)
-            graph_placeholder.pyplot(fig)
-            plt.close(fig)
+            empty_layer = _artifact(artifacts, f'empty_layer_{layout_style}_{show_edge_labels}', lambda: rasterize(
+                render_graph(G, pos, set(), set(), {}, {}, show_edge_labels)
+            ))
+            graph_placeholder.image(empty_layer[:, :, :3], use_container_width=True)
         else:
             graph_placeholder.warning("Waiting for concepts...")
     
@@ -656,7 +680,7 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
         logger.info(f"🚀 VISUALIZATION STARTED (with audio)")
         logger.info(f"   Total concepts: {len(concepts)}")
         logger.info(f"   Total duration: {total_duration:.2f}s")
-        logger.info(f"   Graph has {len(G.nodes())} nodes, {len(pos)} positions")
+        logger.info(f"   Graph has {G.number_of_nodes()} nodes, {len(pos)} positions")
         
         # Log concept timings for debugging
         if timeline.get("metadata", {}).get("timing_scale_factor"):
@@ -686,6 +710,7 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
         
         # Start timing for real-time synchronization
         start_time = time.time()
+        next_reveal = 0  # index of the next concept in reveal_schedule
         
         for frame in range(total_frames + 1):
             # Calculate elapsed time based on actual clock time (not frame count)
@@ -707,10 +732,10 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
             
             # Reveal concepts that should be visible now
             prev_count = len(visible_nodes)
-            for concept in concepts:
-                concept_name = concept.get('name', '')
-                reveal_time = concept.get('reveal_time', 0.0)
-                if concept_name and reveal_time <= elapsed and concept_name not in visible_nodes:
+            while next_reveal < len(reveal_schedule) and (reveal_schedule[next_reveal].reveal_time or 0.0) <= elapsed:
+                concept_name = reveal_schedule[next_reveal].name
+                next_reveal += 1
+                if concept_name not in visible_nodes:
                     visible_nodes.add(concept_name)
                     recently_revealed[concept_name] = elapsed  # Track when revealed
                     logger.info(f"   ✨ Revealing '{concept_name}' at {elapsed:.2f}s")
@@ -764,6 +789,10 @@ def run_dynamic_visualization(timeline, layout_style="hierarchical", show_edge_l
     # Show completed state
     else:
         st.success("✅ **Visualization completed!** Generate a new concept map to see another animation.")
+        full_layer = _artifact(artifacts, f'full_layer_{layout_style}_{show_edge_labels}', lambda: rasterize(
+            render_graph(G, pos, all_concepts, set(), {}, {}, show_edge_labels)
+        ))
+        graph_placeholder.image(full_layer[:, :, :3], use_container_width=True)
         with progress_placeholder:
             st.success("✅ Complete!")
         with timer_placeholder:
@@ -794,12 +823,18 @@ def main():
             placeholder="Auto-detected if empty"
         )
         
+        hedged_extraction = st.checkbox(
+            "Hedge Slow AI Calls",
+            value=HEDGED_EXTRACTION_ENABLED,
+            help="Fire a backup request if extraction is slower than usual; the first valid answer wins (can up to double API token usage)"
+        )
+        
         st.markdown("---")
         st.markdown("### 🗺️ Layout Options")
         
         layout_style = st.selectbox(
             "Graph Layout",
-            ["hierarchical", "shell", "circular", "kamada-kawai", "spring"],
+            LAYOUT_STYLES,
             index=0,
             help="Choose how concepts are arranged in the graph"
         )
@@ -847,6 +882,14 @@ def main():
             st.error("⚠️ Please enter a description first!")
             return
         
+        # Keep the previous timeline: edits of the same text are updated incrementally
+        previous_timeline = st.session_state.get('timeline')
+        if previous_timeline and (
+            not previous_timeline.get('full_text')
+            or previous_timeline.get('metadata', {}).get('educational_level') != educational_level
+        ):
+            previous_timeline = None
+        
         # Clear previous session state to ensure fresh generation
         if 'timeline' in st.session_state:
             del st.session_state.timeline
@@ -861,12 +904,29 @@ def main():
             try:
                 # Step 1: Create timeline
                 with st.status("📋 Creating timeline...", expanded=True) as status:
-                    st.write("🔥 Analyzing description with AI...")
-                    timeline = create_timeline(
-                        description,
-                        educational_level,
-                        topic_name if topic_name.strip() else None
-                    )
+                    if previous_timeline:
+                        st.write("✏️ Updating timeline for your edits...")
+                        timeline = update_timeline(
+                            previous_timeline,
+                            description,
+                            educational_level,
+                            topic_name if topic_name.strip() else None,
+                            hedged=hedged_extraction
+                        )
+                        incremental = timeline['metadata'].get('incremental_update')
+                        if incremental:
+                            st.write(f"♻️ Re-timed {incremental['changed_sentences']} of "
+                                     f"{incremental['total_sentences']} sentences (no AI call needed)")
+                        else:
+                            previous_timeline = None  # Concepts changed: full regeneration
+                    else:
+                        st.write("🔥 Analyzing description with AI...")
+                        timeline = create_timeline(
+                            description,
+                            educational_level,
+                            topic_name if topic_name.strip() else None,
+                            hedged=hedged_extraction
+                        )
                     
                     # Validate timeline
                     num_sentences = len(timeline.get('sentences', []))
@@ -893,13 +953,16 @@ def main():
                     st.write("🎤 Generating natural voice narration...")
                     st.write(f"📐 Using '{layout_style}' layout algorithm...")
                     engine = PrecomputeEngine(layout_style=layout_style)
-                    timeline = engine.precompute_all(timeline)
+                    # Sentence-chunked audio so unchanged sentences are reused after edits
+                    timeline = engine.precompute_all(
+                        timeline, chunked_audio=True, previous_timeline=previous_timeline
+                    )
                     st.write(f"✅ Generated {len(timeline['sentences'])} audio files")
                     st.write(f"✅ Calculated {layout_style} graph layout")
                     status.update(label="✅ Assets ready!", state="complete")
 
                 # Step 2.5: Auto-save complete timeline JSON with timings
-                saved_path = save_timeline_json_to_disk(timeline)
+                saved_path = save_timeline_json_to_disk(timeline, description)
                 if saved_path:
                     try:
                         relative_path = saved_path.relative_to(PARENT_PATH)
@@ -929,6 +992,9 @@ def main():
         show_edge_labels = st.session_state.get('show_edge_labels', True)
         run_dynamic_visualization(timeline, layout_style, show_edge_labels)
     
+    # Saved timeline history
+    render_timeline_history(layout_style)
+    
     # Example descriptions
     with st.expander("📚 Example Descriptions (Click to use)"):
         st.markdown("**Click any example to use it:**")
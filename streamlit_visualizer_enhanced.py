@@ -9,11 +9,14 @@ import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 import matplotlib
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import logging
 import time
 import os
 import pygame
+from playback_clock import PlaybackClock, PygameClock, get_playback_clock
+from keyframe_compositor import play_fade_in
+from layout_engine import IncrementalLayout
 
 # Use non-interactive backend for Matplotlib
 matplotlib.use('Agg')
@@ -38,7 +41,9 @@ class EnhancedStreamlitVisualizer:
         self.topic_name = topic_name
         self.educational_level = educational_level
         self.graph = nx.DiGraph()
-        self.layout = layout
+        self.layout = dict(layout or {})
+        # Places concepts missing from the pre-calculated layout (partial timelines)
+        self.incremental_layout = IncrementalLayout(initial=self.layout)
         self.node_colors = {}
         self.node_alphas = {}  # For fade-in animations
         self.node_scales = {}  # For scale animation (pop-in effect)
@@ -60,13 +65,18 @@ class EnhancedStreamlitVisualizer:
         except Exception as e:
             logger.warning(f"⚠️  Could not initialize pygame mixer: {e}")
     
-    def add_concepts(self, concepts: List[Dict], animate: bool = True):
+    def add_concepts(self, concepts: List[Dict], animate: bool = True,
+                     relationships: Optional[List[Dict]] = None):
         """
         Add concepts with optional animation support.
         
+        Concepts without a pre-calculated position are placed next to their
+        already visible neighbors (see layout_engine.IncrementalLayout).
+        
         Args:
             concepts: List of concept dicts
             animate: Whether to mark as newly added for animation
+            relationships: Relationships used to find neighbors for new positions
         """
         for concept in concepts:
             concept_name = concept.get('name', '')
@@ -75,6 +85,16 @@ class EnhancedStreamlitVisualizer:
             if concept_name and concept_name not in self.graph.nodes:
                 self.graph.add_node(concept_name, **concept)
                 
+                if concept_name not in self.layout:
+                    neighbors = [
+                        rel.get('to') if rel.get('from') == concept_name else rel.get('from')
+                        for rel in (relationships or [])
+                        if concept_name in (rel.get('from'), rel.get('to'))
+                    ]
+                    self.layout[concept_name] = self.incremental_layout.insert(
+                        concept_name, [n for n in neighbors if n in self.graph.nodes]
+                    )
+                
                 # Assign color
                 color = self.concept_types_colors.get(
                     concept_type,
@@ -113,60 +133,51 @@ class EnhancedStreamlitVisualizer:
                 )
                 logger.debug(f"Added edge: {from_node} -> {to_node}")
     
-    def animate_fade_in(self, graph_placeholder, duration: float = 0.5, steps: int = 10):
+    def animate_fade_in(self, graph_placeholder, duration: float = 0.5, steps: int = 10,
+                        clock: Optional[PlaybackClock] = None):
         """
-        Animate newly added nodes fading in with scale effect and real-time rendering.
+        Animate newly added nodes fading in.
+        
+        The graph is rendered once without and once with the new nodes; the
+        steps in between are alpha-blended keyframes (see keyframe_compositor.py),
+        not full redraws.
         
         Args:
             graph_placeholder: Streamlit placeholder for graph updates
             duration: Total animation duration in seconds
             steps: Number of animation steps
+            clock: Playback clock to sleep on (default: wall clock)
         """
+        sleep = clock.sleep if clock else time.sleep
         if not self.newly_added_nodes:
             return
         
-        step_duration = duration / steps
-        alpha_increment = 1.0 / steps
-        
-        # Scale goes from 0.3 to 1.0, so increment is 0.7 / steps
-        scale_increment = 0.7 / steps
-        
-        for step in range(steps):
-            # Update alpha and scale values for dramatic effect
-            for node in self.newly_added_nodes:
-                # Fade in (0.0 -> 1.0)
-                current_alpha = self.node_alphas.get(node, 0.0)
-                self.node_alphas[node] = min(current_alpha + alpha_increment, 1.0)
-                
-                # Scale up (0.3 -> 1.0) for "pop-in" effect
-                current_scale = self.node_scales.get(node, 0.3)
-                self.node_scales[node] = min(current_scale + scale_increment, 1.0)
-            
-            # Render and display updated graph
-            with graph_placeholder:
-                fig = self.render_graph()
-                st.pyplot(fig)
-                plt.close(fig)
-            
-            time.sleep(step_duration)
+        base_fig = self.render_graph(hidden=self.newly_added_nodes)
         
         # Mark nodes as fully visible and full size
         for node in self.newly_added_nodes:
             self.node_alphas[node] = 1.0
             self.node_scales[node] = 1.0
+        target_fig = self.render_graph()
+        
+        play_fade_in(graph_placeholder, base_fig, target_fig, duration=duration, steps=steps, sleep=sleep)
         
         self.newly_added_nodes.clear()
     
-    def render_graph(self) -> plt.Figure:
+    def render_graph(self, hidden: Optional[set] = None) -> plt.Figure:
         """
         Render the graph with pre-calculated layout and alpha blending.
         
+        Args:
+            hidden: Nodes to leave out (with their edges)
+        
         Returns:
             Matplotlib figure
         """
         fig, ax = plt.subplots(figsize=(16, 12))
+        graph = self.graph.subgraph(n for n in self.graph.nodes if n not in hidden) if hidden else self.graph
         
-        if not self.graph.nodes:
+        if not graph.nodes:
             ax.text(0.5, 0.5, "Waiting for concepts...", 
                    ha='center', va='center', fontsize=16, color='gray')
             ax.set_xlim(0, 1)
@@ -175,14 +186,14 @@ class EnhancedStreamlitVisualizer:
             return fig
         
         # Use pre-calculated layout
-        pos = {node: self.layout.get(node, (0, 0)) for node in self.graph.nodes}
+        pos = {node: self.layout.get(node, (0, 0)) for node in graph.nodes}
         
         # Prepare node colors with alpha and edge colors for highlighting
         node_colors_with_alpha = []
         edge_colors = []
         edge_widths = []
         
-        for node in self.graph.nodes:
+        for node in graph.nodes:
             base_color = self.node_colors.get(node, self.concept_types_colors["default"])
             alpha = self.node_alphas.get(node, 1.0)
             
@@ -202,13 +213,13 @@ class EnhancedStreamlitVisualizer:
         
         # Draw nodes with alpha blending, dynamic edge colors, and scale animation
         base_node_size = 3500
-        for i, node in enumerate(self.graph.nodes):
+        for i, node in enumerate(graph.nodes):
             # Get scale factor for this node (for pop-in effect)
             scale = self.node_scales.get(node, 1.0)
             animated_size = base_node_size * scale
             
             nx.draw_networkx_nodes(
-                self.graph,
+                graph,
                 pos,
                 nodelist=[node],
                 node_color=[node_colors_with_alpha[i]],
@@ -221,7 +232,7 @@ class EnhancedStreamlitVisualizer:
         
         # Draw node labels
         nx.draw_networkx_labels(
-            self.graph,
+            graph,
             pos,
             font_size=11,
             font_weight='bold',
@@ -231,7 +242,7 @@ class EnhancedStreamlitVisualizer:
         
         # Draw edges
         nx.draw_networkx_edges(
-            self.graph,
+            graph,
             pos,
             edge_color='#34495e',
             width=2.5,
@@ -246,12 +257,12 @@ class EnhancedStreamlitVisualizer:
         
         # Draw edge labels
         edge_labels = {}
-        for u, v, data in self.graph.edges(data=True):
+        for u, v, data in graph.edges(data=True):
             rel_type = data.get('relationship', 'related to')
             edge_labels[(u, v)] = rel_type
         
         nx.draw_networkx_edge_labels(
-            self.graph,
+            graph,
             pos,
             edge_labels=edge_labels,
             font_size=9,
@@ -286,35 +297,82 @@ class EnhancedStreamlitVisualizer:
             logger.warning(f"⚠️  Audio file not found: {audio_file}")
             return 0.0
         
-        try:
-            pygame.mixer.music.load(audio_file)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish
-            start_time = time.time()
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            
-            duration = time.time() - start_time
-            logger.info(f"🎵 Played audio: {os.path.basename(audio_file)} ({duration:.1f}s)")
-            return duration
-            
-        except Exception as e:
-            logger.error(f"❌ Error playing audio: {e}")
-            return 0.0
+        # Blocking wrapper around the playback clock (kept for callers that
+        # want to wait for the narration)
+        clock = PygameClock()
+        clock.start(audio_file)
+        duration = clock.wait_until_finished()
+        logger.info(f"🎵 Played audio: {os.path.basename(audio_file)} ({duration:.1f}s)")
+        return duration
 
 
-def run_enhanced_visualization(timeline: Dict):
+def _reveal_on_clock(
+    visualizer: EnhancedStreamlitVisualizer,
+    clock: PlaybackClock,
+    concepts: List[Dict],
+    relationships: List[Dict],
+    graph_placeholder,
+    status_placeholder,
+    progress_placeholder,
+    progress_offset: float = 0.0,
+    progress_span: float = 1.0
+):
+    """
+    Reveal concepts at their reveal_time while the clock's audio keeps playing.
+    
+    Concepts sharing a reveal time are revealed (and animated) together.
+    A relationship is drawn as soon as both its concepts are visible.
+    
+    Args:
+        visualizer: Visualizer holding the graph
+        clock: Started playback clock
+        concepts: Concepts with reveal_time (seconds on the clock)
+        relationships: All relationships between these concepts
+        graph_placeholder: Streamlit placeholder for the graph
+        status_placeholder: Streamlit placeholder for status messages
+        progress_placeholder: Streamlit placeholder for the progress bar
+        progress_offset: Progress value at clock position 0
+        progress_span: Progress added over the clock's full duration
+    """
+    groups = {}
+    for concept in concepts:
+        groups.setdefault(round(concept.get('reveal_time', 0.0), 3), []).append(concept)
+    
+    for reveal_time in sorted(groups):
+        position = clock.wait_until(reveal_time)
+        batch = groups[reveal_time]
+        
+        if clock.duration > 0:
+            progress = progress_offset + progress_span * min(position / clock.duration, 1.0)
+            progress_placeholder.progress(progress, text=f"⏱️ {position:.1f}s / {clock.duration:.1f}s")
+        
+        status_placeholder.warning("✨ Revealing new concepts...")
+        visualizer.add_concepts(batch, animate=True, relationships=relationships)
+        visualizer.add_relationships(relationships)
+        logger.info(f"   → [{position:.2f}s] Added concepts: {[c['name'] for c in batch]}")
+        
+        # Animation time runs on the same clock, so later reveals stay on schedule
+        visualizer.animate_fade_in(graph_placeholder, duration=0.8, steps=15, clock=clock)
+        status_placeholder.info("🎙️ Narrating...")
+
+
+def run_enhanced_visualization(timeline: Dict, clock: Optional[PlaybackClock] = None):
     """
     Run enhanced visualization with pre-computed assets and smooth animations.
     
+    Narration plays in the background on a playback clock and concepts are
+    revealed concurrently at their reveal_time.
+    
     Args:
         timeline: Timeline with pre-computed audio files and layout
+        clock: Playback clock (default: get_playback_clock(); pass a VirtualClock
+               to run headless)
     """
     metadata = timeline["metadata"]
     topic_name = metadata["topic_name"]
     educational_level = metadata["educational_level"]
     pre_calculated_layout = timeline.get("pre_calculated_layout", {})
+    clock = clock or get_playback_clock()
     
     # Initialize page
     st.set_page_config(
@@ -345,52 +403,55 @@ def run_enhanced_visualization(timeline: Dict):
     
     logger.info("🎬 Starting enhanced visualization...")
     
-    # Main loop
-    total_sentences = len(timeline["sentences"])
+    audio_file = timeline.get("audio_file")
+    if audio_file or timeline.get("word_timings"):
+        # Continuous timeline: one narration, concepts revealed at their reveal_time
+        full_text = timeline.get("full_text", "")
+        current_sentence_placeholder.info(f"🎙️ **Speaking:** \"{full_text[:200]}{'...' if len(full_text) > 200 else ''}\"")
+        status_placeholder.info("🎙️ Narrating...")
+        
+        has_audio = bool(audio_file and os.path.exists(audio_file))
+        total_duration = metadata.get("total_duration", 0.0)
+        clock.start(audio_file if has_audio else None,
+                    duration=None if has_audio else total_duration,
+                    fallback_duration=total_duration)
+        _reveal_on_clock(
+            visualizer, clock, timeline.get("concepts", []), timeline.get("relationships", []),
+            graph_placeholder, status_placeholder, progress_placeholder
+        )
+        clock.wait_until_finished()
+        clock.stop()
+    else:
+        # Legacy per-sentence audio: each sentence's concepts appear while it plays
+        total_sentences = len(timeline["sentences"])
+        
+        for sentence_data in timeline["sentences"]:
+            sentence_idx = sentence_data["index"]
+            sentence_text = sentence_data["text"]
+            
+            current_sentence_placeholder.info(f"🎙️ **Speaking:** \"{sentence_text}\"")
+            logger.info(f"🎵 Playing sentence {sentence_idx}: \"{sentence_text[:50]}...\"")
+            
+            clock.start(sentence_data.get("audio_file"))
+            _reveal_on_clock(
+                visualizer, clock,
+                [{**c, 'reveal_time': 0.0} for c in sentence_data["concepts"]],
+                sentence_data["relationships"],
+                graph_placeholder, status_placeholder, progress_placeholder,
+                progress_offset=sentence_idx / total_sentences,
+                progress_span=1.0 / total_sentences
+            )
+            clock.wait_until_finished()
+            clock.stop()
+            
+            # Brief pause for absorption
+            clock.sleep(0.5)
     
-    for sentence_data in timeline["sentences"]:
-        sentence_idx = sentence_data["index"]
-        sentence_text = sentence_data["text"]
-        concepts = sentence_data["concepts"]
-        relationships = sentence_data["relationships"]
-        audio_file = sentence_data.get("audio_file")
-        
-        # Update progress
-        progress = (sentence_idx + 1) / total_sentences
-        progress_placeholder.progress(progress, text=f"Sentence {sentence_idx + 1}/{total_sentences}")
-        
-        # Show current sentence
-        current_sentence_placeholder.info(f"🎙️ **Speaking:** \"{sentence_text}\"")
-        status_placeholder.warning("⏳ Playing narration...")
-        
-        # Play pre-generated audio
-        logger.info(f"🎵 Playing sentence {sentence_idx}: \"{sentence_text[:50]}...\"")
-        audio_duration = visualizer.play_audio(audio_file)
-        
-        # Add concepts and relationships
-        if concepts:
-            status_placeholder.warning("✨ Revealing new concepts...")
-            visualizer.add_concepts(concepts, animate=True)
-            logger.info(f"   → Added concepts: {[c['name'] for c in concepts]}")
-        
-        if relationships:
-            visualizer.add_relationships(relationships)
-            logger.info(f"   → Added {len(relationships)} relationships")
-        
-        # Animate fade-in with real-time rendering (snappier: 0.8s)
-        if concepts:
-            status_placeholder.info("🎬 Animating concept reveal...")
-            visualizer.animate_fade_in(graph_placeholder, duration=0.8, steps=15)
-            status_placeholder.success("✅ Concepts revealed!")
-        
-        # Final render to ensure everything is shown
-        with graph_placeholder:
-            fig = visualizer.render_graph()
-            st.pyplot(fig)
-            plt.close(fig)
-        
-        # Brief pause for absorption (reduced from 1.0s)
-        time.sleep(0.5)
+    # Final render to ensure everything is shown
+    with graph_placeholder:
+        fig = visualizer.render_graph()
+        st.pyplot(fig)
+        plt.close(fig)
     
     # Final status
     progress_placeholder.progress(1.0, text="✅ Complete!")
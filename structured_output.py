@@ -0,0 +1,595 @@
+"""
+Structured Output Module
+========================
+Response layer for JSON-producing LLM calls.
+
+- Requests JSON from Gemini (response MIME type + response schema)
+- Parses with a strict fast path, falling back to a single-pass tolerant parser
+- Validates against a schema compiled once into checker functions
+- Recovers partial results: invalid array items are dropped, valid ones are kept
+
+Schemas use a small JSON-Schema subset (type, properties, required, items, enum)
+that Gemini's response_schema also understands.
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+# Ask Gemini for JSON output with a response schema (set STRUCTURED_OUTPUT=false to disable)
+STRUCTURED_OUTPUT_ENABLED = os.getenv('STRUCTURED_OUTPUT', 'true').lower() == 'true'
+
+
+# Schema for timeline_mapper extraction calls
+TIMELINE_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "concepts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "type": {"type": "string"},
+                    "importance": {"type": "string", "enum": ["high", "medium", "low"]},
+                    "importance_rank": {"type": "integer"},
+                    "definition": {"type": "string"}
+                },
+                "required": ["name"]
+            }
+        },
+        "relationships": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "from": {"type": "string"},
+                    "to": {"type": "string"},
+                    "relationship": {"type": "string"}
+                },
+                "required": ["from", "to"]
+            }
+        }
+    },
+    "required": ["concepts", "relationships"]
+}
+
+# Schema for nodes.extract_all_in_one_call
+COMBINED_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "extracted_concepts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "type": {"type": "string"},
+                    "importance": {"type": "string", "enum": ["high", "medium", "low"]},
+                    "definition": {"type": "string"}
+                },
+                "required": ["name"]
+            }
+        },
+        "concept_relationships": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "from_concept": {"type": "string"},
+                    "to_concept": {"type": "string"},
+                    "relationship_type": {"type": "string"},
+                    "relationship_description": {"type": "string"},
+                    "strength": {"type": "string"}
+                },
+                "required": ["from_concept", "to_concept"]
+            }
+        },
+        "concept_hierarchy": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "level": {"type": "integer"},
+                    "level_name": {"type": "string"},
+                    "level_description": {"type": "string"},
+                    "concepts": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {"name": {"type": "string"}},
+                            "required": ["name"]
+                        }
+                    },
+                    "difficulty": {"type": "string"}
+                },
+                "required": ["concepts"]
+            }
+        }
+    },
+    "required": ["extracted_concepts", "concept_relationships", "concept_hierarchy"]
+}
+
+
+# ---------------------------------------------------------------------------
+# Generation config
+# ---------------------------------------------------------------------------
+
+def _to_gemini_schema(schema: Dict) -> Dict:
+    """Convert the JSON-Schema subset to Gemini's OpenAPI-style schema (upper-case types)."""
+    converted = {}
+    for key, value in schema.items():
+        if key == "type":
+            converted["type"] = value.upper()
+        elif key == "properties":
+            converted["properties"] = {name: _to_gemini_schema(sub) for name, sub in value.items()}
+        elif key == "items":
+            converted["items"] = _to_gemini_schema(value)
+        else:
+            converted[key] = value
+    return converted
+
+
+def json_generation_config(schema: Optional[Dict] = None, **kwargs) -> genai.GenerationConfig:
+    """
+    Build a GenerationConfig that asks for JSON output.
+
+    Falls back to a plain config when structured output is disabled or the
+    installed google-generativeai version does not support it.
+
+    Args:
+        schema: Response schema (JSON-Schema subset) or None for MIME type only
+        **kwargs: Regular GenerationConfig fields (temperature, max_output_tokens, ...)
+
+    Returns:
+        genai.GenerationConfig
+    """
+    if not STRUCTURED_OUTPUT_ENABLED:
+        return genai.GenerationConfig(**kwargs)
+
+    try:
+        if schema is not None:
+            return genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=_to_gemini_schema(schema),
+                **kwargs
+            )
+        return genai.GenerationConfig(response_mime_type="application/json", **kwargs)
+    except TypeError as e:
+        logger.debug(f"Structured output not supported by google-generativeai: {e}")
+        return genai.GenerationConfig(**kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Schema compilation
+# ---------------------------------------------------------------------------
+
+# A compiled node takes a value and returns (cleaned_value, errors, dropped_items, coercions)
+CompiledNode = Callable[[Any], Tuple[Any, List[str], int, int]]
+
+_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "null": lambda v: v is None,
+}
+
+
+def _coerce(value: Any, expected: str) -> Tuple[Any, bool]:
+    """Lossless scalar coercions (e.g. "3" -> 3). Returns (value, coerced)."""
+    if expected in ("integer", "number") and isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            return value, False
+        if expected == "integer" and number.is_integer():
+            return int(number), True
+        if expected == "number":
+            return number, True
+    if expected == "integer" and isinstance(value, float) and value.is_integer():
+        return int(value), True
+    if expected == "string" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value), True
+    return value, False
+
+
+def compile_schema(schema: Dict) -> CompiledNode:
+    """
+    Compile a schema into a checker function (done once per schema).
+
+    The compiled function validates and prunes in one walk: array items that
+    fail validation are dropped (and counted) instead of invalidating the whole
+    document, so partial results survive.
+
+    Args:
+        schema: JSON-Schema subset (type, properties, required, items, enum)
+
+    Returns:
+        Function value -> (cleaned_value, errors, dropped_items, coercions)
+    """
+    expected = schema.get("type")
+    type_check = _TYPE_CHECKS.get(expected, lambda v: True)
+    enum_values = set(schema["enum"]) if "enum" in schema else None
+
+    if expected == "object":
+        required = tuple(schema.get("required", []))
+        properties = {name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()}
+
+        def check_object(value):
+            if not isinstance(value, dict):
+                return value, [f"expected object, got {type(value).__name__}"], 0, 0
+            errors = [f"missing required '{name}'" for name in required if name not in value]
+            dropped = 0
+            coercions = 0
+            cleaned = dict(value)
+            for name, node in properties.items():
+                if name not in cleaned:
+                    continue
+                sub_value, sub_errors, sub_dropped, sub_coercions = node(cleaned[name])
+                dropped += sub_dropped
+                coercions += sub_coercions
+                if sub_errors:
+                    if name in required:
+                        errors.extend(f"{name}: {e}" for e in sub_errors)
+                    else:
+                        # Optional field with a bad value: drop the field, keep the object
+                        del cleaned[name]
+                        coercions += 1
+                else:
+                    cleaned[name] = sub_value
+            return cleaned, errors, dropped, coercions
+
+        return check_object
+
+    if expected == "array":
+        item_node = compile_schema(schema["items"]) if "items" in schema else None
+
+        def check_array(value):
+            if not isinstance(value, list):
+                return value, [f"expected array, got {type(value).__name__}"], 0, 0
+            if item_node is None:
+                return value, [], 0, 0
+            cleaned = []
+            dropped = 0
+            coercions = 0
+            for item in value:
+                item_value, item_errors, item_dropped, item_coercions = item_node(item)
+                if item_errors:
+                    dropped += 1
+                    continue
+                cleaned.append(item_value)
+                dropped += item_dropped
+                coercions += item_coercions
+            return cleaned, [], dropped, coercions
+
+        return check_array
+
+    def check_scalar(value):
+        coercions = 0
+        if not type_check(value):
+            value, coerced = _coerce(value, expected)
+            if not coerced:
+                return value, [f"expected {expected}, got {type(value).__name__}"], 0, 0
+            coercions = 1
+        if enum_values is not None and value not in enum_values:
+            if isinstance(value, str) and value.lower() in enum_values:
+                return value.lower(), [], 0, coercions + 1
+            return value, [f"value {value!r} not in {sorted(enum_values)}"], 0, coercions
+        return value, [], 0, coercions
+
+    return check_scalar
+
+
+_compiled_cache = {}
+
+
+def get_validator(schema: Dict) -> CompiledNode:
+    """Return the compiled checker for a schema, compiling it on first use."""
+    key = id(schema)
+    if key not in _compiled_cache:
+        _compiled_cache[key] = compile_schema(schema)
+    return _compiled_cache[key]
+
+
+# ---------------------------------------------------------------------------
+# Tolerant parser
+# ---------------------------------------------------------------------------
+
+class _TolerantParser:
+    """
+    Single-pass recursive-descent JSON parser that repairs common LLM mistakes.
+
+    Handles: prose/markdown fences around the JSON, // and /* */ comments,
+    trailing commas, missing commas, single-quoted strings, unquoted keys,
+    Python literals (True/False/None) and output truncated at any point
+    (open containers are closed; incomplete trailing items are dropped).
+    Every fix increments `repairs`.
+    """
+
+    _LITERALS = {"true": True, "false": False, "null": None,
+                 "True": True, "False": False, "None": None}
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.pos = 0
+        self.repairs = 0
+
+    def parse(self) -> Any:
+        start = self._find_start()
+        if start is None:
+            raise ValueError("no JSON object or array found")
+        if start > 0 and self.text[:start].strip():
+            self.repairs += 1  # Leading prose or code fence
+        self.pos = start
+        value, _complete = self._value()
+        if self.text[self.pos:].strip().strip('`').strip():
+            self.repairs += 1  # Trailing prose after the JSON
+        return value
+
+    def _find_start(self) -> Optional[int]:
+        candidates = [i for i in (self.text.find('{'), self.text.find('[')) if i != -1]
+        return min(candidates) if candidates else None
+
+    def _skip(self):
+        text = self.text
+        while self.pos < self.length:
+            ch = text[self.pos]
+            if ch in ' \t\r\n':
+                self.pos += 1
+            elif text.startswith('//', self.pos):
+                end = text.find('\n', self.pos)
+                self.pos = self.length if end == -1 else end + 1
+                self.repairs += 1
+            elif text.startswith('/*', self.pos):
+                end = text.find('*/', self.pos + 2)
+                self.pos = self.length if end == -1 else end + 2
+                self.repairs += 1
+            else:
+                break
+
+    def _value(self) -> Tuple[Any, bool]:
+        self._skip()
+        if self.pos >= self.length:
+            return None, False
+        ch = self.text[self.pos]
+        if ch == '{':
+            return self._object()
+        if ch == '[':
+            return self._array()
+        if ch in '"\'':
+            return self._string()
+        return self._literal()
+
+    def _object(self) -> Tuple[Dict, bool]:
+        self.pos += 1
+        result = {}
+        while True:
+            self._skip()
+            if self.pos >= self.length:
+                self.repairs += 1  # Truncated: close the object
+                return result, False
+            ch = self.text[self.pos]
+            if ch == '}':
+                self.pos += 1
+                return result, True
+            if ch == ',':
+                self.pos += 1
+                self._skip()
+                if self.pos < self.length and self.text[self.pos] == '}':
+                    self.repairs += 1  # Trailing comma
+                continue
+            if ch == ']':
+                self.repairs += 1  # Mismatched bracket: treat as end of object
+                return result, True
+
+            key, key_complete = self._key()
+            self._skip()
+            if not key_complete or self.pos >= self.length:
+                self.repairs += 1
+                return result, False
+            if self.text[self.pos] == ':':
+                self.pos += 1
+            else:
+                self.repairs += 1  # Missing colon
+            value, complete = self._value()
+            if not complete and not isinstance(value, (dict, list)):
+                self.repairs += 1  # Truncated scalar: drop the member
+                return result, False
+            result[key] = value
+            if not complete:
+                return result, False
+
+            self._skip()
+            if self.pos < self.length and self.text[self.pos] not in ',}]':
+                self.repairs += 1  # Missing comma between members
+
+    def _array(self) -> Tuple[List, bool]:
+        self.pos += 1
+        result = []
+        while True:
+            self._skip()
+            if self.pos >= self.length:
+                self.repairs += 1  # Truncated: close the array
+                return result, False
+            ch = self.text[self.pos]
+            if ch == ']':
+                self.pos += 1
+                return result, True
+            if ch == ',':
+                self.pos += 1
+                self._skip()
+                if self.pos < self.length and self.text[self.pos] == ']':
+                    self.repairs += 1  # Trailing comma
+                continue
+            if ch == '}':
+                self.repairs += 1  # Mismatched bracket: treat as end of array
+                return result, True
+
+            value, complete = self._value()
+            if not complete:
+                # Incomplete item at the end of truncated output: keep partial arrays only
+                self.repairs += 1
+                if isinstance(value, list):
+                    result.append(value)
+                return result, False
+            result.append(value)
+
+            self._skip()
+            if self.pos < self.length and self.text[self.pos] not in ',]}':
+                self.repairs += 1  # Missing comma between items
+
+    def _key(self) -> Tuple[str, bool]:
+        if self.text[self.pos] in '"\'':
+            return self._string()
+        # Unquoted key
+        start = self.pos
+        while self.pos < self.length and (self.text[self.pos].isalnum() or self.text[self.pos] in '_-$'):
+            self.pos += 1
+        self.repairs += 1
+        return self.text[start:self.pos], self.pos > start
+
+    def _string(self) -> Tuple[str, bool]:
+        quote = self.text[self.pos]
+        if quote == "'":
+            self.repairs += 1
+        self.pos += 1
+        chars = []
+        text = self.text
+        while self.pos < self.length:
+            ch = text[self.pos]
+            if ch == '\\':
+                if self.pos + 1 >= self.length:
+                    self.pos += 1
+                    break
+                esc = text[self.pos + 1]
+                if esc == 'u' and self.pos + 6 <= self.length:
+                    try:
+                        chars.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                        self.pos += 6
+                        continue
+                    except ValueError:
+                        pass
+                mapped = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f',
+                          '"': '"', "'": "'", '\\': '\\', '/': '/'}.get(esc)
+                if mapped is None:
+                    self.repairs += 1  # Invalid escape: keep the character
+                    mapped = esc
+                chars.append(mapped)
+                self.pos += 2
+                continue
+            if ch == quote:
+                self.pos += 1
+                return ''.join(chars), True
+            if ch == '\n':
+                self.repairs += 1  # Raw newline inside a string
+            chars.append(ch)
+            self.pos += 1
+        return ''.join(chars), False
+
+    def _literal(self) -> Tuple[Any, bool]:
+        start = self.pos
+        text = self.text
+        while self.pos < self.length and text[self.pos] not in ',}] \t\r\n':
+            self.pos += 1
+        token = text[start:self.pos]
+        at_end = self.pos >= self.length
+        if token in self._LITERALS:
+            if token not in ("true", "false", "null"):
+                self.repairs += 1
+            return self._LITERALS[token], True
+        try:
+            number = float(token) if any(c in token for c in '.eE') else int(token)
+            # A number that runs into the end of the text may have been cut off
+            return number, not at_end
+        except ValueError:
+            self.repairs += 1  # Bare word: keep it as a string
+            return token, not at_end
+
+
+def tolerant_parse(text: str) -> Tuple[Any, int]:
+    """
+    Parse JSON-like LLM output in a single pass, repairing common mistakes.
+
+    Args:
+        text: Raw model response
+
+    Returns:
+        Tuple of (parsed value, number of repairs applied)
+
+    Raises:
+        ValueError: If no JSON object or array can be found
+    """
+    parser = _TolerantParser(text)
+    value = parser.parse()
+    return value, parser.repairs
+
+
+# ---------------------------------------------------------------------------
+# Response layer
+# ---------------------------------------------------------------------------
+
+def parse_json_response(response_text: str, schema: Optional[Dict] = None) -> Dict:
+    """
+    Parse, repair and validate a JSON response.
+
+    Strict json.loads is tried first; the tolerant parser only runs when that
+    fails. With a schema, invalid array items are dropped and the rest is kept.
+
+    Args:
+        response_text: Raw model response text
+        schema: Optional schema (e.g. TIMELINE_EXTRACTION_SCHEMA)
+
+    Returns:
+        Dict with:
+        {
+            "data": Any,            # Parsed (and pruned) value, {} if nothing was recoverable
+            "valid": bool,          # Top-level value satisfies the schema
+            "errors": List[str],
+            "repairs": int,         # Syntax repairs + value coercions
+            "dropped_items": int,   # Array items removed by validation
+            "parse_duration": float
+        }
+    """
+    parse_start = time.time()
+    report = {"data": {}, "valid": False, "errors": [], "repairs": 0, "dropped_items": 0}
+
+    text = response_text.strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            data, repairs = tolerant_parse(text)
+            report["repairs"] = repairs
+            logger.info(f"🔧 Repaired JSON response ({repairs} fixes)")
+        except ValueError as e:
+            report["errors"].append(str(e))
+            report["parse_duration"] = time.time() - parse_start
+            logger.warning(f"⚠️ No JSON found in response: {text[:200]}...")
+            return report
+
+    if schema is not None:
+        data, errors, dropped, coercions = get_validator(schema)(data)
+        report["errors"] = errors
+        report["dropped_items"] = dropped
+        report["repairs"] += coercions
+        report["valid"] = not errors
+        if errors:
+            logger.warning(f"⚠️ Response failed schema validation: {errors[:5]}")
+        if dropped:
+            logger.info(f"🧹 Dropped {dropped} invalid items, kept the rest")
+    else:
+        report["valid"] = True
+
+    report["data"] = data if data is not None else {}
+    report["parse_duration"] = time.time() - parse_start
+    return report
@@ -0,0 +1,360 @@
+"""
+Timeline Binary Module
+======================
+Compact binary container for timelines (.cmtl), loadable zero-copy via mmap.
+
+Layout (little-endian):
+    magic        4 bytes   b"CMTL"
+    version      uint16
+    time_size    uint16    4 = float32 columns, 8 = float64 columns
+    word_count   uint32
+    header_len   uint32
+    header       header_len bytes of compact UTF-8 JSON (everything except word_timings),
+                 zero-padded to an 8-byte boundary
+    start_time   word_count x float32/float64
+    end_time     word_count x float32/float64
+    offsets      (word_count + 1) x uint32, byte offsets into the string table
+    strings      UTF-8 words, concatenated
+
+Conversion to and from the JSON timeline schema is lossless. Timings produced by
+calculate_word_timings() are millisecond-rounded, so float32 columns plus a
+3-decimal round on read restore the exact float64 values; timings that are not
+millisecond-rounded are written as float64 columns instead.
+
+Usage:
+    python timeline_binary.py to-binary timeline.json timeline.cmtl
+    python timeline_binary.py to-json timeline.cmtl timeline.json
+"""
+
+import os
+import sys
+import json
+import mmap
+import array
+import struct
+import logging
+import argparse
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, List, Union
+
+from timeline_model import as_timeline
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CMTL"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<4sHHII")
+
+# Float32 keeps ~7 significant digits: millisecond values stay exact up to this duration
+_FLOAT32_MAX_SECONDS = 8000.0
+_TIME_DECIMALS = 3
+
+# Marker for legacy sentences[0] lists that duplicate the top-level lists
+_SAME_AS_TOP_LEVEL = "$top_level"
+_WORD_KEYS = ("word", "start_time", "end_time")
+
+
+def _pad(length: int) -> int:
+    return (8 - length % 8) % 8
+
+
+def _choose_time_size(starts: List[float], ends: List[float]) -> int:
+    """4 if every timing survives a float32 round trip (ms-rounded, in range), else 8."""
+    for value in starts + ends:
+        if abs(value) > _FLOAT32_MAX_SECONDS or round(value, _TIME_DECIMALS) != value:
+            return 8
+    return 4
+
+
+def timeline_to_bytes(timeline: Dict) -> bytes:
+    """
+    Encode a timeline dict (JSON schema from create_timeline) as .cmtl bytes.
+
+    Args:
+        timeline: Timeline dict
+
+    Returns:
+        Encoded bytes
+    """
+    word_timings = list(timeline.get("word_timings", []))
+    words = [str(w.get("word", "")) for w in word_timings]
+    starts = [float(w.get("start_time", 0.0)) for w in word_timings]
+    ends = [float(w.get("end_time", 0.0)) for w in word_timings]
+
+    header = {key: value for key, value in timeline.items() if key != "word_timings"}
+    header["_binary"] = {"has_word_timings": "word_timings" in timeline}
+
+    # Extra per-word keys (or int timings) are rare; keep them in the header so nothing is lost
+    word_extras = {}
+    for index, timing in enumerate(word_timings):
+        extras = {k: v for k, v in timing.items() if k not in _WORD_KEYS}
+        int_keys = [k for k in ("start_time", "end_time")
+                    if isinstance(timing.get(k), int) and not isinstance(timing.get(k), bool)]
+        if int_keys:
+            extras["_int_times"] = int_keys
+        if extras:
+            word_extras[str(index)] = extras
+    if word_extras:
+        header["_binary"]["word_extras"] = word_extras
+
+    # Legacy sentence entries repeat the top-level concepts/relationships: store a marker instead
+    sentences = header.get("sentences")
+    if isinstance(sentences, list):
+        compact_sentences = []
+        for sentence in sentences:
+            if isinstance(sentence, dict):
+                sentence = dict(sentence)
+                for key in ("concepts", "relationships"):
+                    if key in sentence and key in timeline and sentence[key] == timeline[key]:
+                        sentence[key] = _SAME_AS_TOP_LEVEL
+            compact_sentences.append(sentence)
+        header["sentences"] = compact_sentences
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    header_bytes += b"\0" * _pad(_PREAMBLE.size + len(header_bytes))
+
+    time_size = _choose_time_size(starts, ends)
+    typecode = "f" if time_size == 4 else "d"
+
+    encoded_words = [w.encode("utf-8") for w in words]
+    offsets = array.array("I", [0])
+    total = 0
+    for encoded in encoded_words:
+        total += len(encoded)
+        offsets.append(total)
+
+    start_column = array.array(typecode, starts)
+    end_column = array.array(typecode, ends)
+    if sys.byteorder != "little":
+        for column in (start_column, end_column, offsets):
+            column.byteswap()
+
+    return b"".join([
+        _PREAMBLE.pack(MAGIC, FORMAT_VERSION, time_size, len(words), len(header_bytes)),
+        header_bytes,
+        start_column.tobytes(),
+        end_column.tobytes(),
+        offsets.tobytes(),
+        b"".join(encoded_words),
+    ])
+
+
+class WordTimingsView(Sequence):
+    """
+    Read-only, lazily decoded view over the word-timing columns of a .cmtl buffer.
+
+    Items are built on access as {"word", "start_time", "end_time"} dicts. The raw
+    columns are exposed as `starts`, `ends` (memoryviews of float32/float64) for
+    consumers that want to process timings in bulk, e.g. numpy.frombuffer(view.starts).
+    """
+
+    def __init__(self, buffer, word_count: int, time_size: int, columns_offset: int,
+                 word_extras: Dict = None):
+        self._buffer = buffer  # Keeps the mmap alive
+        self._count = word_count
+        self._decimals = _TIME_DECIMALS if time_size == 4 else None
+        self._extras = word_extras or {}
+
+        view = memoryview(buffer)
+        typecode = "f" if time_size == 4 else "d"
+        column_bytes = word_count * time_size
+        offsets_start = columns_offset + 2 * column_bytes
+        strings_start = offsets_start + (word_count + 1) * 4
+
+        starts = view[columns_offset:columns_offset + column_bytes]
+        ends = view[columns_offset + column_bytes:offsets_start]
+        offsets = view[offsets_start:strings_start]
+
+        if sys.byteorder == "little":
+            self.starts = starts.cast(typecode)
+            self.ends = ends.cast(typecode)
+            self._offsets = offsets.cast("I")
+        else:
+            # Big-endian hosts: copy and byteswap (not zero-copy)
+            self.starts, self.ends, self._offsets = [
+                _swapped(part, code) for part, code in ((starts, typecode), (ends, typecode), (offsets, "I"))
+            ]
+
+        self._strings = view[strings_start:]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _time(self, column, index: int) -> float:
+        value = column[index]
+        return round(value, self._decimals) if self._decimals is not None else value
+
+    def word(self, index: int) -> str:
+        """Decode only the word string at index."""
+        return str(self._strings[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("word timing index out of range")
+
+        timing = {
+            "word": self.word(index),
+            "start_time": self._time(self.starts, index),
+            "end_time": self._time(self.ends, index),
+        }
+        extras = self._extras.get(str(index))
+        if extras:
+            for key in extras.get("_int_times", ()):
+                timing[key] = int(timing[key])
+            timing.update({k: v for k, v in extras.items() if k != "_int_times"})
+        return timing
+
+    def to_list(self) -> List[Dict]:
+        """Materialize all word timings as plain dicts."""
+        return [self[i] for i in range(self._count)]
+
+
+def _swapped(part: memoryview, typecode: str):
+    values = array.array(typecode)
+    values.frombytes(part.tobytes())
+    values.byteswap()
+    return values
+
+
+def timeline_from_buffer(buffer, lazy: bool = True) -> Dict:
+    """
+    Decode a timeline from a .cmtl buffer (bytes, bytearray or mmap).
+
+    Args:
+        buffer: Encoded timeline
+        lazy: Return word_timings as a WordTimingsView over the buffer (zero-copy)
+              instead of a list of dicts
+
+    Returns:
+        Timeline (legacy `sentences` view derived on access)
+
+    Raises:
+        ValueError: If the buffer is not a supported .cmtl container
+    """
+    magic, version, time_size, word_count, header_len = _PREAMBLE.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("not a .cmtl timeline (bad magic)")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"unsupported .cmtl version {version}")
+    if time_size not in (4, 8):
+        raise ValueError(f"invalid time column size {time_size}")
+
+    header_start = _PREAMBLE.size
+    header_raw = bytes(memoryview(buffer)[header_start:header_start + header_len]).rstrip(b"\0")
+    timeline = json.loads(header_raw.decode("utf-8"))
+    binary_info = timeline.pop("_binary", {})
+
+    for sentence in timeline.get("sentences", []) or []:
+        if isinstance(sentence, dict):
+            for key in ("concepts", "relationships"):
+                if sentence.get(key) == _SAME_AS_TOP_LEVEL:
+                    sentence[key] = timeline[key]
+
+    if binary_info.get("has_word_timings", True):
+        view = WordTimingsView(buffer, word_count, time_size, header_start + header_len,
+                               binary_info.get("word_extras"))
+        word_timings = view if lazy else view.to_list()
+        # Keep the original key order (word_timings follows full_text in create_timeline)
+        ordered = {}
+        for key, value in timeline.items():
+            ordered[key] = value
+            if key == "full_text":
+                ordered["word_timings"] = word_timings
+        ordered.setdefault("word_timings", word_timings)
+        timeline = ordered
+
+    return as_timeline(timeline)
+
+
+def save_timeline_binary(timeline: Dict, filepath: Union[str, Path]) -> Path:
+    """
+    Write a timeline to a .cmtl file.
+
+    The data goes to a temporary file in the same directory that then replaces
+    the target, so a reader that still has the previous file memory-mapped
+    (lazy WordTimingsView) keeps its intact copy instead of faulting on a
+    truncated mapping.
+
+    Args:
+        timeline: Timeline dict
+        filepath: Destination path
+
+    Returns:
+        Path of the written file
+    """
+    filepath = Path(filepath)
+    data = timeline_to_bytes(timeline)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    logger.info(f"💾 Binary timeline saved to {filepath} ({len(data):,} bytes)")
+    return filepath
+
+
+def load_timeline_binary(filepath: Union[str, Path], lazy: bool = True) -> Dict:
+    """
+    Load a .cmtl file.
+
+    With lazy=True the file is memory-mapped and word timings are decoded on
+    access; the mapping stays open as long as the WordTimingsView is referenced.
+
+    Args:
+        filepath: Path to a .cmtl file
+        lazy: Zero-copy WordTimingsView (True) or a list of dicts (False)
+
+    Returns:
+        Timeline dict
+    """
+    with open(filepath, "rb") as f:
+        if not lazy:
+            return timeline_from_buffer(f.read(), lazy=False)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return timeline_from_buffer(mapped, lazy=True)
+
+
+def timeline_to_json_dict(timeline: Dict) -> Dict:
+    """Copy of a (possibly lazily loaded) timeline that json.dump can serialize."""
+    result = dict(timeline)
+    if isinstance(result.get("word_timings"), WordTimingsView):
+        result["word_timings"] = result["word_timings"].to_list()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert timelines between JSON and the binary .cmtl format")
+    parser.add_argument("command", choices=["to-binary", "to-json"], help="Conversion direction")
+    parser.add_argument("input", help="Input file")
+    parser.add_argument("output", help="Output file")
+    args = parser.parse_args()
+
+    if args.command == "to-binary":
+        with open(args.input, "r", encoding="utf-8") as f:
+            timeline = json.load(f)
+        save_timeline_binary(timeline, args.output)
+        json_size = Path(args.input).stat().st_size
+        binary_size = Path(args.output).stat().st_size
+        print(f"✅ {args.input} ({json_size:,} bytes) → {args.output} ({binary_size:,} bytes, "
+              f"{binary_size / max(json_size, 1):.0%})")
+    else:
+        timeline = load_timeline_binary(args.input, lazy=False)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(timeline, f, indent=2, ensure_ascii=False)
+        print(f"✅ {args.input} → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Timeline Export Module
+======================
+Streaming JSONL export of timelines for bulk sync (e.g. the Android app).
+
+Each timeline becomes one minified line:
+
+    {"v": 1, "id": ..., "metadata": {...}, "full_text": ..., "concepts": [...],
+     "relationships": [...], "words": {"w": [...], "s": [...], "e": [...]}}
+
+- Legacy sentences[0] lists that repeat the top-level concepts/relationships
+  are replaced by a marker (restored on read)
+- word_timings are stored as three columns instead of one dict per word
+- Server-local fields (audio_file, audio_chunks) are dropped, also from
+  metadata and sentences
+
+Records are appended to rolling part files (timelines-00001.jsonl[.gz|.zst]),
+a new part starting every EXPORT_MAX_RECORDS records. Compression is "gzip"
+(stdlib), "zstd" (needs the zstandard package) or none. The reader streams
+line by line, so memory stays constant regardless of how many lessons are
+exported.
+
+Usage:
+    python timeline_export.py export concept_json_timings/ --output exports/ --compression gzip
+    python timeline_export.py stats exports/
+"""
+
+import io
+import os
+import re
+import gzip
+import json
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from timeline_model import as_timeline
+
+logger = logging.getLogger(__name__)
+
+# Optional zstd support (pip install zstandard)
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+EXPORT_FORMAT_VERSION = 1
+EXPORT_MAX_RECORDS = int(os.getenv('EXPORT_MAX_RECORDS', '10000'))
+EXPORT_COMPRESSION = os.getenv('EXPORT_COMPRESSION', 'gzip').lower()
+
+COMPRESSION_SUFFIXES = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+# Fields that only make sense on the machine that generated the timeline
+EXCLUDED_KEYS = ("audio_file", "audio_chunks")
+
+# Same marker as the binary format for sentence lists that repeat the top level
+_SAME_AS_TOP_LEVEL = "$top_level"
+
+
+def timeline_to_record(timeline: Dict, record_id: Optional[str] = None) -> Dict:
+    """
+    Compact export record for a timeline.
+
+    Args:
+        timeline: Timeline dict (JSON schema from create_timeline)
+        record_id: Stable ID for the lesson (e.g. the timeline store entry ID)
+
+    Returns:
+        Record dict (see module docstring)
+    """
+    record = {"v": EXPORT_FORMAT_VERSION}
+    if record_id is not None:
+        record["id"] = record_id
+
+    for key, value in timeline.items():
+        if key in EXCLUDED_KEYS:
+            continue
+        if key == "metadata" and isinstance(value, dict):
+            record["metadata"] = {k: v for k, v in value.items() if k not in EXCLUDED_KEYS}
+        elif key == "word_timings":
+            words, starts, ends = [], [], []
+            for timing in value:
+                words.append(timing.get("word", ""))
+                starts.append(timing.get("start_time", 0.0))
+                ends.append(timing.get("end_time", 0.0))
+            record["words"] = {"w": words, "s": starts, "e": ends}
+        elif key == "sentences" and isinstance(value, list):
+            sentences = []
+            for sentence in value:
+                if isinstance(sentence, dict):
+                    sentence = {k: v for k, v in sentence.items() if k not in EXCLUDED_KEYS}
+                    for list_key in ("concepts", "relationships"):
+                        if list_key in sentence and sentence[list_key] == timeline.get(list_key):
+                            sentence[list_key] = _SAME_AS_TOP_LEVEL
+                sentences.append(sentence)
+            record["sentences"] = sentences
+        else:
+            record[key] = value
+    return record
+
+
+def record_to_timeline(record: Dict) -> Dict:
+    """
+    Expand an export record back into the timeline schema.
+
+    Args:
+        record: Record from timeline_to_record() / iter_records()
+
+    Returns:
+        Timeline (without the excluded server-local fields)
+    """
+    timeline = {}
+    for key, value in record.items():
+        if key in ("v", "id"):
+            continue
+        if key == "words":
+            timeline["word_timings"] = [
+                {"word": word, "start_time": start, "end_time": end}
+                for word, start, end in zip(value["w"], value["s"], value["e"])
+            ]
+        else:
+            timeline[key] = value
+
+    for sentence in timeline.get("sentences", []) or []:
+        if isinstance(sentence, dict):
+            for list_key in ("concepts", "relationships"):
+                if sentence.get(list_key) == _SAME_AS_TOP_LEVEL:
+                    sentence[list_key] = timeline.get(list_key, [])
+    return as_timeline(timeline)
+
+
+def _open_write(path: Path, compression: str):
+    # Exclusive create: an existing part raises FileExistsError instead of being truncated
+    if compression == "gzip":
+        return gzip.open(path, "xt", encoding="utf-8")
+    if compression == "zstd":
+        raw = open(path, "xb")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(raw), encoding="utf-8")
+    return open(path, "x", encoding="utf-8")
+
+
+def _open_read(path: Path):
+    name = path.name
+    if name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if name.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"{path} is zstd-compressed; install zstandard to read it")
+        raw = open(path, "rb")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+class TimelineExportWriter:
+    """
+    Appends timeline records to rolling JSONL part files.
+
+    Use as a context manager; the current part is closed (and its compressed
+    stream finalized) on exit.
+    """
+
+    def __init__(self, directory: Union[str, Path], prefix: str = "timelines",
+                 compression: str = EXPORT_COMPRESSION, max_records: int = EXPORT_MAX_RECORDS):
+        """
+        Args:
+            directory: Output directory (created if missing)
+            prefix: Part file name prefix
+            compression: "gzip", "zstd" or "none"
+            max_records: Records per part file before rolling to the next (0 = no rolling)
+
+        Raises:
+            ValueError: If the compression is unknown or zstd is not installed
+        """
+        compression = (compression or "none").lower()
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression '{compression}' (use gzip, zstd or none)")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.compression = compression
+        self.max_records = max_records
+        self.paths: List[Path] = []
+        self.total_records = 0
+        self._stream = None
+        self._part_records = 0
+
+        # Continue numbering after the highest existing part (gaps from deleted
+        # parts must not make a new part reuse an earlier export's number)
+        part_pattern = re.compile(rf"{re.escape(prefix)}-(\d+)\.jsonl")
+        self._part_number = max(
+            (int(match.group(1)) for match in map(part_pattern.match, (p.name for p in self.directory.iterdir()))
+             if match),
+            default=0
+        )
+
+    def _roll(self):
+        self.close()
+        self._part_number += 1
+        path = self.directory / f"{self.prefix}-{self._part_number:05d}{COMPRESSION_SUFFIXES[self.compression]}"
+        self._stream = _open_write(path, self.compression)
+        self._part_records = 0
+        self.paths.append(path)
+        logger.info(f"📝 Export part: {path}")
+
+    def write(self, timeline: Dict, record_id: Optional[str] = None):
+        """
+        Append one timeline.
+
+        Args:
+            timeline: Timeline dict
+            record_id: Stable lesson ID
+        """
+        self.write_record(timeline_to_record(timeline, record_id))
+
+    def write_record(self, record: Dict):
+        """Append an already converted record."""
+        if self._stream is None or (self.max_records and self._part_records >= self.max_records):
+            self._roll()
+        self._stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self._stream.write("\n")
+        self._part_records += 1
+        self.total_records += 1
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self) -> "TimelineExportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _part_files(source: Union[str, Path, Iterable[Union[str, Path]]]) -> List[Path]:
+    if isinstance(source, (str, Path)):
+        source = Path(source)
+        if source.is_dir():
+            return sorted(p for p in source.iterdir() if ".jsonl" in p.name)
+        return [source]
+    return [Path(p) for p in source]
+
+
+def iter_records(source: Union[str, Path, Iterable[Union[str, Path]]]) -> Iterator[Dict]:
+    """
+    Lazily iterate export records, one line at a time.
+
+    Args:
+        source: Export directory, a single part file, or a list of part files
+
+    Yields:
+        Record dicts (compact form; see record_to_timeline)
+    """
+    for path in _part_files(source):
+        with _open_read(path) as stream:
+            for line_number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    # A truncated last line (interrupted export) should not stop a sync
+                    logger.warning(f"⚠️ Skipping unreadable record {path.name}:{line_number}: {e}")
+
+
+def iter_timelines(source: Union[str, Path, Iterable[Union[str, Path]]]) -> Iterator[Dict]:
+    """Lazily iterate exported timelines in the timeline schema."""
+    for record in iter_records(source):
+        yield record_to_timeline(record)
+
+
+def export_timeline_files(files: Iterable[Union[str, Path]], writer: TimelineExportWriter) -> int:
+    """
+    Export timeline JSON files (skipping non-timeline JSON such as index.json).
+
+    Args:
+        files: Timeline JSON paths
+        writer: Open export writer
+
+    Returns:
+        Number of timelines exported
+    """
+    count = 0
+    for path in files:
+        path = Path(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                timeline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Skipping {path}: {e}")
+            continue
+        if not isinstance(timeline, dict) or "concepts" not in timeline:
+            continue
+        writer.write(timeline, record_id=path.stem)
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export timelines to compact rolling JSONL files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export timeline JSON files")
+    export_parser.add_argument("inputs", nargs="+", help="Timeline JSON files or directories")
+    export_parser.add_argument("--output", "-o", default="exports", help="Output directory (default: exports)")
+    export_parser.add_argument("--compression", "-c", default=EXPORT_COMPRESSION,
+                               choices=sorted(COMPRESSION_SUFFIXES), help="Part file compression")
+    export_parser.add_argument("--max-records", type=int, default=EXPORT_MAX_RECORDS,
+                               help="Records per part file")
+
+    stats_parser = subparsers.add_parser("stats", help="Count records in an export")
+    stats_parser.add_argument("source", help="Export directory or part file")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        files = []
+        for item in args.inputs:
+            item = Path(item)
+            files.extend(sorted(item.glob("*.json")) if item.is_dir() else [item])
+        input_bytes = sum(p.stat().st_size for p in files)
+        with TimelineExportWriter(args.output, compression=args.compression,
+                                  max_records=args.max_records) as writer:
+            count = export_timeline_files(files, writer)
+        output_bytes = sum(p.stat().st_size for p in writer.paths)
+        print(f"✅ Exported {count} timelines ({input_bytes:,} bytes) → {len(writer.paths)} part(s), "
+              f"{output_bytes:,} bytes ({output_bytes / max(input_bytes, 1):.0%})")
+    else:
+        records = 0
+        concepts = 0
+        for record in iter_records(args.source):
+            records += 1
+            concepts += len(record.get("concepts", []))
+        print(f"📊 {records} timelines, {concepts} concepts")
+
+
+if __name__ == "__main__":
+    main()
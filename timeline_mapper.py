@@ -10,9 +10,13 @@ then uses simple heuristics to map concepts to sentences based on keyword occurr
 import os
 import re
 import json
+import difflib
+import math
 import logging
 import time
-from typing import Dict, List, Tuple
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 from description_analyzer import (
@@ -20,6 +24,18 @@ from description_analyzer import (
     adjust_complexity_for_educational_level
 )
 from metrics_logger import log_metrics
+from prompt_compressor import compress_description
+from similarity_cache import SIMILARITY_CACHE_ENABLED, get_similarity_cache
+from hedged_request import HEDGED_EXTRACTION_ENABLED, HEDGE_FALLBACK_MODEL, hedged_call
+from structured_output import (
+    TIMELINE_EXTRACTION_SCHEMA,
+    json_generation_config,
+    parse_json_response
+)
+from concept_graph import IMPORTANCE_SCORES
+from rate_limiter import get_rate_limiter
+from timeline_model import Timeline
+from records import WordTimingColumns
 
 
 logger = logging.getLogger(__name__)
@@ -170,19 +186,76 @@ def split_into_sentences(text: str) -> List[str]:
     return final_sentences
 
 
-def calculate_word_timings(text: str) -> List[Dict]:
+# Per-voice timing profiles fitted by voice_calibration.py
+VOICE_PROFILES_FILE = Path(__file__).parent / "voice_profiles.json"
+DEFAULT_TIMING_VOICE = os.getenv('TIMING_VOICE', 'com')
+
+# Built-in timing constants (calibrated for the gTTS "com" voice at normal speed)
+DEFAULT_TIMING_PROFILE = {
+    "seconds_per_char": 0.08,   # Average time per character
+    "seconds_per_word": 0.0,    # Fixed time per word on top of characters
+    "sentence_pause": 0.4,      # Pause after . ! ?
+    "clause_pause": 0.2,        # Pause after , ; :
+    "leading_silence": 0.0,     # Silence before the first word
+    "min_word_duration": 0.15,  # Minimum time for short words
+    "max_word_duration": 1.5    # Maximum time for long words
+}
+
+_voice_profiles_cache = {"mtime": None, "profiles": {}}
+
+
+def load_voice_profile(voice: Optional[str] = None) -> Dict:
+    """
+    Timing profile for a gTTS voice (TLD), falling back to the built-in constants.
+    
+    voice_profiles.json is re-read only when its modification time changes.
+    
+    Args:
+        voice: gTTS TLD as used by PrecomputeEngine.voice (default: TIMING_VOICE env, "com")
+        
+    Returns:
+        Dict with the DEFAULT_TIMING_PROFILE keys
+    """
+    voice = voice or DEFAULT_TIMING_VOICE
+    try:
+        mtime = VOICE_PROFILES_FILE.stat().st_mtime
+    except OSError:
+        mtime = None
+    
+    if mtime != _voice_profiles_cache["mtime"]:
+        profiles = {}
+        if mtime is not None:
+            try:
+                with open(VOICE_PROFILES_FILE, 'r', encoding='utf-8') as f:
+                    profiles = json.load(f)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to load voice profiles: {e}")
+        _voice_profiles_cache.update({"mtime": mtime, "profiles": profiles})
+    
+    profile = dict(DEFAULT_TIMING_PROFILE)
+    profile.update({
+        key: value for key, value in _voice_profiles_cache["profiles"].get(voice, {}).items()
+        if key in DEFAULT_TIMING_PROFILE
+    })
+    return profile
+
+
+def calculate_word_timings(text: str, voice: Optional[str] = None) -> List[Dict]:
     """
     Calculate timestamp for each word in text using CHARACTER-BASED timing.
     Shorter words take less time, longer words take more time.
     
-    Character-based formula:
+    Character-based formula (constants from the voice's timing profile):
     - Base time per character: ~0.08 seconds (calibrated for gTTS at normal speed)
     - Minimum word duration: 0.15s (for very short words like "a", "I")
     - Maximum word duration: 1.5s (prevents overly long pauses)
     - Punctuation pauses: Added on top of character-based duration
     
+    Run voice_calibration.py to fit the constants per gTTS voice.
+    
     Args:
         text: Full text (can be single sentence or multiple sentences merged)
+        voice: gTTS TLD whose timing profile to use (default: TIMING_VOICE env, "com")
         
     Returns:
         List of dicts: [{"word": str, "start_time": float, "end_time": float}, ...]
@@ -190,33 +263,35 @@ def calculate_word_timings(text: str) -> List[Dict]:
     words = text.split()
     word_timings = []
     
-    # Character-based timing constants (calibrated for gTTS)
-    SECONDS_PER_CHARACTER = 0.08  # Average time per character
-    MIN_WORD_DURATION = 0.15      # Minimum time for short words
-    MAX_WORD_DURATION = 1.5       # Maximum time for long words
+    profile = load_voice_profile(voice)
+    seconds_per_character = profile["seconds_per_char"]
+    seconds_per_word = profile["seconds_per_word"]
+    min_word_duration = profile["min_word_duration"]
+    max_word_duration = profile["max_word_duration"]
     
-    current_time = 0.0
+    current_time = profile["leading_silence"]
     for word in words:
         # Remove punctuation for character counting
         clean_word = word.rstrip('.,!?;:')
         char_count = len(clean_word)
         
         # Calculate base duration based on character count
-        word_duration = char_count * SECONDS_PER_CHARACTER
+        word_duration = seconds_per_word + char_count * seconds_per_character
         
         # Apply min/max constraints
-        word_duration = max(MIN_WORD_DURATION, min(word_duration, MAX_WORD_DURATION))
+        word_duration = max(min_word_duration, min(word_duration, max_word_duration))
         
         # Add punctuation pauses (gTTS adds natural pauses)
         if word.endswith(('.', '!', '?')):
-            word_duration += 0.4  # 400ms pause after sentence
+            word_duration += profile["sentence_pause"]
         elif word.endswith((',', ';', ':')):
-            word_duration += 0.2  # 200ms pause after clause
+            word_duration += profile["clause_pause"]
         
+        # Millisecond precision (keeps timings exact in float32 binary timelines)
         word_timings.append({
             "word": word,
-            "start_time": current_time,
-            "end_time": current_time + word_duration
+            "start_time": round(current_time, 3),
+            "end_time": round(current_time + word_duration, 3)
         })
         
         current_time += word_duration
@@ -232,6 +307,9 @@ def assign_concept_reveal_times(
     """
     Assign reveal_time to each concept based on when its last word is spoken.
     
+    Word start offsets and end times are computed once, so each concept costs
+    one substring search plus a bisect instead of re-splitting the text.
+    
     Args:
         concepts: List of concept dicts with 'name' keys
         word_timings: List of word timing dicts from calculate_word_timings()
@@ -242,7 +320,14 @@ def assign_concept_reveal_times(
     """
     full_text_lower = full_text.lower()
     
-    for concept in concepts:
+    # Character offset of each word start: bisect_left(word_starts, pos) is
+    # the number of words before pos (== len(full_text[:pos].split()))
+    word_starts = [match.start() for match in re.finditer(r'\S+', full_text)]
+    end_times = WordTimingColumns.from_dicts(word_timings).ends
+    total_words = len(end_times)
+    clean_text_words = None  # punctuation-stripped words, built on first stem match
+    
+    for concept_index, concept in enumerate(concepts):
         concept_name = concept.get('name', '')
         if not concept_name:
             concept['reveal_time'] = 0.0
@@ -251,9 +336,8 @@ def assign_concept_reveal_times(
         concept_name_lower = concept_name.lower()
         
         # Find the position of the concept in the full text
-        try:
-            concept_position = full_text_lower.index(concept_name_lower)
-        except ValueError:
+        concept_position = full_text_lower.find(concept_name_lower)
+        if concept_position < 0:
             # Concept not found in text - try finding individual words
             logger.warning(f"Concept '{concept_name}' not found exactly in text, trying word-by-word match")
             
@@ -268,74 +352,158 @@ def assign_concept_reveal_times(
                     continue
                 
                 # Try exact match first
-                if clean_word in full_text_lower:
-                    word_position = full_text_lower.index(clean_word)
-                    words_before = full_text[:word_position].split()
-                    word_index = len(words_before)
+                word_position = full_text_lower.find(clean_word)
+                if word_position >= 0:
+                    word_index = bisect_left(word_starts, word_position)
                     last_word_found_index = max(last_word_found_index, word_index)
                     continue
                 
                 # Try finding words that start with this stem (e.g., "evapor" matches "evaporates")
                 # Use first 5 characters as stem
                 word_stem = clean_word[:min(5, len(clean_word))]
-                text_words = full_text_lower.split()
+                if clean_text_words is None:
+                    clean_text_words = [re.sub(r'[^\w\s]', '', w) for w in full_text_lower.split()]
                 
-                for i, text_word in enumerate(text_words):
-                    clean_text_word = re.sub(r'[^\w\s]', '', text_word)
+                for i, clean_text_word in enumerate(clean_text_words):
                     if clean_text_word.startswith(word_stem):
                         last_word_found_index = max(last_word_found_index, i)
                         logger.debug(f"     → Matched '{clean_word}' to '{clean_text_word}' at word index {i}")
                         break
             
-            if last_word_found_index >= 0 and last_word_found_index < len(word_timings):
-                concept['reveal_time'] = word_timings[last_word_found_index]['end_time']
+            if last_word_found_index >= 0 and last_word_found_index < total_words:
+                concept['reveal_time'] = end_times[last_word_found_index]
                 logger.info(f"Concept '{concept_name}' matched at word index {last_word_found_index}, reveal_time: {concept['reveal_time']:.2f}s")
             else:
                 # Still not found, distribute evenly
-                concept_index = concepts.index(concept)
-                total_duration = word_timings[-1]['end_time'] if word_timings else 1.0
+                total_duration = end_times[-1] if total_words else 1.0
                 concept['reveal_time'] = (concept_index / len(concepts)) * total_duration
                 logger.warning(f"Concept '{concept_name}' not found in text, distributing evenly at {concept['reveal_time']:.2f}s")
             continue
         
-        # Get the words that make up this concept
-        concept_words = concept_name.split()
-        
-        # Find the last word of the concept in word_timings
-        # Strategy: Count words from start of text until we reach concept position
-        words_before_concept = full_text[:concept_position].split()
-        word_index_of_concept_start = len(words_before_concept)
-        word_index_of_concept_end = word_index_of_concept_start + len(concept_words) - 1
+        # Find the last word of the concept in word_timings:
+        # words before the concept position + the concept's own word count
+        word_index_of_concept_start = bisect_left(word_starts, concept_position)
+        word_index_of_concept_end = word_index_of_concept_start + len(concept_name.split()) - 1
         
         # Get timing of last word
-        if word_index_of_concept_end < len(word_timings):
-            concept['reveal_time'] = word_timings[word_index_of_concept_end]['end_time']
+        if word_index_of_concept_end < total_words:
+            concept['reveal_time'] = end_times[word_index_of_concept_end]
             logger.info(f"✓ Concept '{concept_name}' found at position {concept_position}, word index {word_index_of_concept_end}, reveal_time: {concept['reveal_time']:.2f}s")
         else:
             # Fallback: use last available timing
-            concept['reveal_time'] = word_timings[-1]['end_time'] if word_timings else 0.0
-            logger.warning(f"Concept '{concept_name}' word index {word_index_of_concept_end} out of bounds (max {len(word_timings)}), using fallback time {concept['reveal_time']:.2f}s")
+            concept['reveal_time'] = end_times[-1] if total_words else 0.0
+            logger.warning(f"Concept '{concept_name}' word index {word_index_of_concept_end} out of bounds (max {total_words}), using fallback time {concept['reveal_time']:.2f}s")
     
     return concepts
 
 
+def _create_extraction_model(
+    max_output_tokens: int = 2048,
+    model_name: str = 'gemini-2.5-flash-lite'
+) -> genai.GenerativeModel:
+    """
+    Create the model used for concept extraction (gemini-2.5-flash-lite by default).
+    
+    Args:
+        max_output_tokens: Completion token limit for the call
+        model_name: Gemini model name
+        
+    Returns:
+        Configured GenerativeModel (deterministic JSON output, no safety blocking)
+    """
+    generation_config = json_generation_config(
+        TIMELINE_EXTRACTION_SCHEMA,
+        temperature=0.0,  # Deterministic output for consistent results
+        top_p=0.95,
+        top_k=40,
+        max_output_tokens=max_output_tokens,
+    )
+    
+    return genai.GenerativeModel(
+        model_name,
+        generation_config=generation_config,
+        safety_settings={
+            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+        }
+    )
+
+
+def _get_token_usage(response) -> Dict:
+    """Extract prompt/completion/total token counts from a Gemini response."""
+    if not hasattr(response, 'usage_metadata'):
+        return {}
+    usage = response.usage_metadata
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_token_count', 0),
+        'completion_tokens': getattr(usage, 'candidates_token_count', 0),
+        'total_tokens': getattr(usage, 'total_token_count', 0)
+    }
+
+
+def _parse_extraction_json(response_text: str) -> Dict:
+    """
+    Parse an extraction response into a dict, recovering partial results.
+    
+    Args:
+        response_text: Raw model response
+        
+    Returns:
+        Parsed dict with 'concepts' and 'relationships' (invalid items dropped)
+        
+    Raises:
+        ValueError: If nothing usable could be recovered from the response
+    """
+    report = parse_json_response(response_text, TIMELINE_EXTRACTION_SCHEMA)
+    data = report['data']
+    if not isinstance(data, dict) or not data.get('concepts'):
+        raise ValueError(f"Unusable extraction response: {report['errors'] or 'no concepts'}")
+    return data
+
+
+def _generate_and_parse(model: genai.GenerativeModel, prompt: str) -> Tuple[object, str, Dict]:
+    """Run one extraction call and parse it. Returns (response, response_text, parse_report)."""
+    with get_rate_limiter().limit():
+        response = model.generate_content(prompt)
+    response_text = response.text.strip()
+    return response, response_text, parse_json_response(response_text, TIMELINE_EXTRACTION_SCHEMA)
+
+
+def _is_usable_extraction(result: Tuple[object, str, Dict]) -> bool:
+    """A hedged extraction result wins only if it is schema-valid and has concepts."""
+    report = result[2]
+    return report['valid'] and isinstance(report['data'], dict) and bool(report['data'].get('concepts'))
+
+
 def extract_concepts_from_full_description(
     description: str,
-    educational_level: str
+    educational_level: str,
+    token_budget: Optional[int] = None,
+    hedged: Optional[bool] = None
 ) -> Tuple[List[Dict], List[Dict]]:
     """
     Make SINGLE LLM API call to extract all concepts and relationships
     from the full description at once.
     
     Uses description_analyzer.py to dynamically scale concept count based on word count.
+    Long descriptions are reduced to their most salient sentences before being
+    pasted into the prompt (see prompt_compressor.py).
     
     Args:
         description: Full description text
         educational_level: Educational level for context
+        token_budget: Prompt token budget for the description (default: PROMPT_TOKEN_BUDGET)
+        hedged: Fire a backup request if the call exceeds the latency deadline
+                (see hedged_request.py). None = HEDGED_EXTRACTION env setting
         
     Returns:
         Tuple of (concepts_list, relationships_list)
     """
+    if hedged is None:
+        hedged = HEDGED_EXTRACTION_ENABLED
+    
     start_time = time.time()
     logger.info("🔥 Making SINGLE API call to extract all concepts from full description...")
     
@@ -366,38 +534,31 @@ def extract_concepts_from_full_description(
     
     logger.info(f"📊 Description analysis: {word_count} words → {target_concepts} concepts ({detail_level} level)")
     
+    # Reduce long descriptions to a token budget (analysis above uses the full text)
+    compression = compress_description(description, token_budget)
+    prompt_description = compression['text']
+    
     # Track metrics
     metrics = {
         'word_count': word_count,
         'target_concepts': target_concepts,
         'detail_level': detail_level,
         'educational_level': educational_level,
-        'api_call_start': start_time
+        'api_call_start': start_time,
+        'prompt_original_tokens': compression['original_tokens'],
+        'prompt_compressed_tokens': compression['compressed_tokens'],
+        'compression_ratio': compression['compression_ratio'],
+        'sentences_kept': compression['sentences_kept'],
+        'sentences_total': compression['sentences_total']
     }
     
     # Use the optimized gemini-2.5-flash-lite model with deterministic output
-    generation_config = genai.GenerationConfig(
-        temperature=0.0,  # Deterministic output for consistent results
-        top_p=0.95,
-        top_k=40,
-        max_output_tokens=2048,
-    )
-    
-    model = genai.GenerativeModel(
-        'gemini-2.5-flash-lite',
-        generation_config=generation_config,
-        safety_settings={
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        }
-    )
+    model = _create_extraction_model()
     
     # Dynamic prompt based on description analysis (matching nodes.py approach)
     prompt = f"""Extract concepts and relationships from this description for {educational_level} level.
 
-Description: {description}
+Description: {prompt_description}
 
 EXTRACTION PARAMETERS:
 - Target Concepts: {target_concepts} (based on {word_count} words)
@@ -424,19 +585,34 @@ Rules:
 
     try:
         api_start = time.time()
-        response = model.generate_content(prompt)
-        api_duration = time.time() - api_start
-        response_text = response.text.strip()
-        
-        # Extract token usage from Google's response
-        token_usage = {}
-        if hasattr(response, 'usage_metadata'):
-            usage = response.usage_metadata
-            token_usage = {
-                'prompt_tokens': getattr(usage, 'prompt_token_count', 0),
-                'completion_tokens': getattr(usage, 'candidates_token_count', 0),
-                'total_tokens': getattr(usage, 'total_token_count', 0)
-            }
+        if hedged:
+            backup_model = _create_extraction_model(model_name=HEDGE_FALLBACK_MODEL) if HEDGE_FALLBACK_MODEL else model
+            def record_discarded(label, result):
+                # The losing call was billed too; log it and add it to the run's metrics if still open
+                usage = _get_token_usage(result[0])
+                metrics['hedge_discarded_tokens'] = metrics.get('hedge_discarded_tokens', 0) + usage.get('total_tokens', 0)
+                logger.info(f"🔢 Discarded hedged {label} call used {usage.get('total_tokens', 0)} tokens")
+
+            outcome = hedged_call(
+                lambda: _generate_and_parse(model, prompt),
+                lambda: _generate_and_parse(backup_model, prompt),
+                is_valid=_is_usable_extraction,
+                on_discard=record_discarded
+            )
+            response, response_text, parse_report = outcome['result']
+            metrics.update({
+                'hedge_deadline': outcome['deadline'],
+                'hedged': outcome['hedged'],
+                'hedge_winner': outcome['winner'],
+                'hedge_primary': outcome['primary'],
+                'hedge_backup': outcome['backup']
+            })
+        else:
+            response, response_text, parse_report = _generate_and_parse(model, prompt)
+        api_duration = time.time() - api_start - parse_report['parse_duration']
+        
+        # Extract token usage from Google's response (winning call only when hedged)
+        token_usage = _get_token_usage(response)
         
         # Update metrics
         metrics['api_duration'] = api_duration
@@ -447,16 +623,18 @@ Rules:
         if token_usage:
             logger.info(f"🔢 Token Usage: Prompt={token_usage.get('prompt_tokens', 0)}, Completion={token_usage.get('completion_tokens', 0)}, Total={token_usage.get('total_tokens', 0)}")
         
-        # Clean markdown code blocks if present
-        if response_text.startswith('```'):
-            response_text = re.sub(r'^```(?:json)?\s*', '', response_text)
-            response_text = re.sub(r'\s*```$', '', response_text)
-        
-        parse_start = time.time()
-        data = json.loads(response_text)
+        data = parse_report['data'] if isinstance(parse_report['data'], dict) else {}
         concepts = data.get('concepts', [])
         relationships = data.get('relationships', [])
-        parse_duration = time.time() - parse_start
+        parse_duration = parse_report['parse_duration']
+        
+        metrics.update({
+            'json_valid': parse_report['valid'],
+            'json_repairs': parse_report['repairs'],
+            'json_dropped_items': parse_report['dropped_items']
+        })
+        if not concepts:
+            raise ValueError(f"Unusable extraction response: {parse_report['errors'] or 'no concepts'}")
         
         # Final metrics
         total_duration = time.time() - start_time
@@ -563,11 +741,382 @@ Rules:
         return [], []
 
 
+# Long-document (map-reduce) extraction settings
+LONG_DOCUMENT_WORD_THRESHOLD = int(os.getenv('LONG_DOCUMENT_WORD_THRESHOLD', '1500'))
+CHUNK_WORD_SIZE = int(os.getenv('CHUNK_WORD_SIZE', '400'))
+MAX_CHUNK_WORKERS = int(os.getenv('MAX_CHUNK_WORKERS', '8'))
+
+
+def chunk_sentences(sentences: List[str], chunk_words: int = CHUNK_WORD_SIZE) -> List[str]:
+    """
+    Group consecutive sentences into chunks of roughly chunk_words words.
+    
+    Sentences are never split, so a single very long sentence becomes its own chunk.
+    
+    Args:
+        sentences: Sentences from split_into_sentences()
+        chunk_words: Target words per chunk
+        
+    Returns:
+        List of chunk texts in document order
+    """
+    chunks = []
+    current = []
+    current_words = 0
+    
+    for sentence in sentences:
+        sentence_words = len(sentence.split())
+        if current and current_words + sentence_words > chunk_words:
+            chunks.append(" ".join(current))
+            current = []
+            current_words = 0
+        current.append(sentence)
+        current_words += sentence_words
+    
+    if current:
+        chunks.append(" ".join(current))
+    
+    return chunks
+
+
+def normalize_concept_name(name: str) -> str:
+    """
+    Normalize a concept name for deduplication across chunks.
+    
+    Lowercases, strips punctuation, collapses whitespace and drops a plural "s"
+    so that "Water Molecules" and "water molecule" merge.
+    
+    Args:
+        name: Concept name as returned by the LLM
+        
+    Returns:
+        Normalized key
+    """
+    words = re.sub(r'[^\w\s]', ' ', name.lower()).split()
+    normalized = []
+    for word in words:
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        normalized.append(word)
+    return " ".join(normalized)
+
+
+def _extract_chunk(chunk_text: str, chunk_index: int, chunk_target: int, educational_level: str) -> Dict:
+    """
+    Map step: extract concepts and relationships from one chunk.
+    
+    Args:
+        chunk_text: Sentence span to analyze
+        chunk_index: Position of the chunk in the document
+        chunk_target: Number of concepts to request for this chunk
+        educational_level: Educational level for context
+        
+    Returns:
+        Dict with 'concepts', 'relationships', 'token_usage', 'api_duration'
+    """
+    model = _create_extraction_model(max_output_tokens=1024)
+    
+    prompt = f"""Extract concepts and relationships from this passage (part {chunk_index + 1} of a longer text) for {educational_level} level.
+
+Passage: {chunk_text}
+
+Return ONLY valid JSON (no markdown, no explanation):
+{{
+  "concepts": [
+    {{"name": "ConceptName", "type": "category", "importance": "high/medium/low", "importance_rank": 1, "definition": "brief definition"}}
+  ],
+  "relationships": [
+    {{"from": "Concept1", "to": "Concept2", "relationship": "verb phrase"}}
+  ]
+}}
+
+Rules:
+- Extract at most {chunk_target} key concepts that appear in the passage
+- Rank concepts by importance: importance_rank from 1 (most critical) to {chunk_target}
+- Use clear, concise names
+- Ensure all relationship concepts exist in concepts list"""
+
+    with get_rate_limiter().limit():
+        api_start = time.time()
+        response = model.generate_content(prompt)
+    api_duration = time.time() - api_start
+    
+    data = _parse_extraction_json(response.text.strip())
+    return {
+        'concepts': data.get('concepts', []),
+        'relationships': data.get('relationships', []),
+        'token_usage': _get_token_usage(response),
+        'api_duration': api_duration
+    }
+
+
+def merge_chunk_results(chunk_results: List[Dict], target_concepts: int) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Reduce step: merge per-chunk extractions into a single concept set.
+    
+    Concepts are deduplicated by normalized name and scored by how many chunks
+    mention them, their importance and their rank within each chunk. The top
+    target_concepts are kept and re-ranked; relationships are remapped onto the
+    kept names and deduplicated.
+    
+    Args:
+        chunk_results: Outputs of _extract_chunk() in document order
+        target_concepts: Number of concepts to keep
+        
+    Returns:
+        Tuple of (concepts_list, relationships_list)
+    """
+    merged = {}  # normalized name -> {"concept": dict, "score": float}
+    
+    for result in chunk_results:
+        chunk_concepts = [c for c in result.get('concepts', []) if c.get('name')]
+        for position, concept in enumerate(chunk_concepts):
+            key = normalize_concept_name(concept['name'])
+            if not key:
+                continue
+            
+            rank = concept.get('importance_rank', position + 1)
+            if not isinstance(rank, (int, float)):
+                rank = position + 1
+            importance = IMPORTANCE_SCORES.get(str(concept.get('importance', '')).lower(), 1)
+            # Each mention adds 1, plus up to 1 for importance and 1 for chunk rank
+            score = 1 + importance / 3 + 1 / max(rank, 1)
+            
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = {"concept": dict(concept), "score": score, "best": score}
+            else:
+                entry["score"] += score
+                # Keep the name/definition from the strongest mention
+                if score > entry["best"]:
+                    entry["concept"] = dict(concept)
+                    entry["best"] = score
+    
+    ranked = sorted(merged.items(), key=lambda item: item[1]["score"], reverse=True)[:target_concepts]
+    
+    concepts = []
+    canonical_names = {}
+    for rank, (key, entry) in enumerate(ranked, start=1):
+        concept = entry["concept"]
+        concept['importance_rank'] = rank
+        concepts.append(concept)
+        canonical_names[key] = concept['name']
+    
+    relationships = []
+    seen_edges = set()
+    for result in chunk_results:
+        for rel in result.get('relationships', []):
+            source = canonical_names.get(normalize_concept_name(rel.get('from', '')))
+            target = canonical_names.get(normalize_concept_name(rel.get('to', '')))
+            if not source or not target or source == target or (source, target) in seen_edges:
+                continue
+            seen_edges.add((source, target))
+            relationships.append({
+                "from": source,
+                "to": target,
+                "relationship": rel.get('relationship', 'related to')
+            })
+    
+    logger.info(f"🧩 Merged {len(merged)} candidate concepts → {len(concepts)} concepts, {len(relationships)} relationships")
+    return concepts, relationships
+
+
+def _consolidate_concepts(
+    concepts: List[Dict],
+    relationships: List[Dict],
+    target_concepts: int,
+    educational_level: str
+) -> Tuple[List[Dict], List[Dict], Dict]:
+    """
+    Optional small LLM call that consolidates merged candidates.
+    
+    Only concept names, short definitions and relationships are sent (never the
+    document), so the call stays cheap regardless of document length.
+    
+    Returns:
+        Tuple of (concepts_list, relationships_list, token_usage)
+    """
+    model = _create_extraction_model(max_output_tokens=2048)
+    
+    candidates = [
+        {"name": c.get('name'), "type": c.get('type'), "importance": c.get('importance'),
+         "definition": (c.get('definition') or '')[:120]}
+        for c in concepts
+    ]
+    prompt = f"""These candidate concepts and relationships were extracted from consecutive parts of one text for {educational_level} level.
+
+Candidates: {json.dumps(candidates, ensure_ascii=False)}
+Relationships: {json.dumps(relationships, ensure_ascii=False)}
+
+Merge synonyms and near-duplicates, then return ONLY valid JSON (no markdown, no explanation):
+{{
+  "concepts": [
+    {{"name": "ConceptName", "type": "category", "importance": "high/medium/low", "importance_rank": 1, "definition": "brief definition"}}
+  ],
+  "relationships": [
+    {{"from": "Concept1", "to": "Concept2", "relationship": "verb phrase"}}
+  ]
+}}
+
+Rules:
+- Keep exactly {target_concepts} concepts, using candidate names unchanged
+- Each importance_rank must be unique, from 1 to {target_concepts}
+- Ensure all relationship concepts exist in concepts list"""
+
+    with get_rate_limiter().limit():
+        response = model.generate_content(prompt)
+    data = _parse_extraction_json(response.text.strip())
+    return data.get('concepts', []), data.get('relationships', []), _get_token_usage(response)
+
+
+def extract_concepts_map_reduce(
+    description: str,
+    educational_level: str,
+    chunk_words: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    consolidate: bool = False
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Long-document mode: extract concepts from sentence-span chunks in parallel,
+    then merge them down to the target concept count.
+    
+    Each chunk is a small, independent LLM call, so wall time follows the chunk
+    size rather than the document length, and a failed chunk only loses its own
+    span instead of the whole extraction.
+    
+    Args:
+        description: Full description text
+        educational_level: Educational level for context
+        chunk_words: Target words per chunk (default: CHUNK_WORD_SIZE)
+        max_workers: Parallel chunk calls (default: MAX_CHUNK_WORKERS)
+        consolidate: Run an extra small LLM call to merge synonyms after the cheap merge
+        
+    Returns:
+        Tuple of (concepts_list, relationships_list)
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    start_time = time.time()
+    
+    description_analysis = analyze_description_complexity(description)
+    adjusted_complexity = adjust_complexity_for_educational_level(
+        description_analysis['complexity'], educational_level
+    )
+    target_concepts = adjusted_complexity['target_concepts']
+    word_count = description_analysis['word_count']
+    
+    chunks = chunk_sentences(split_into_sentences(description), chunk_words or CHUNK_WORD_SIZE)
+    # Over-extract a little per chunk so the merge has candidates to choose from
+    chunk_target = max(2, math.ceil(target_concepts * 1.5 / max(len(chunks), 1)) + 1)
+    workers = max(1, min(max_workers or MAX_CHUNK_WORKERS, len(chunks)))
+    
+    logger.info(f"🗂️  Long-document mode: {word_count} words → {len(chunks)} chunks "
+                f"({workers} parallel, {chunk_target} concepts each) → {target_concepts} concepts")
+    
+    metrics = {
+        'word_count': word_count,
+        'target_concepts': target_concepts,
+        'detail_level': adjusted_complexity['detail_level'],
+        'educational_level': educational_level,
+        'api_call_start': start_time,
+        'chunk_count': len(chunks),
+        'consolidated': False
+    }
+    
+    chunk_results = [None] * len(chunks)
+    failed_chunks = 0
+    map_start = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_extract_chunk, chunk, i, chunk_target, educational_level): i
+            for i, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                chunk_results[index] = future.result()
+            except Exception as e:
+                failed_chunks += 1
+                logger.warning(f"⚠️ Chunk {index + 1}/{len(chunks)} extraction failed: {e}")
+    map_duration = time.time() - map_start
+    
+    chunk_results = [r for r in chunk_results if r is not None]
+    token_usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+    for result in chunk_results:
+        for key in token_usage:
+            token_usage[key] += result['token_usage'].get(key, 0) or 0
+    
+    parse_start = time.time()
+    concepts, relationships = merge_chunk_results(chunk_results, target_concepts)
+    parse_duration = time.time() - parse_start
+    
+    if consolidate and concepts:
+        try:
+            consolidated_concepts, consolidated_relationships, consolidation_usage = _consolidate_concepts(
+                concepts, relationships, target_concepts, educational_level
+            )
+            if consolidated_concepts:
+                concepts, relationships = consolidated_concepts, consolidated_relationships
+                metrics['consolidated'] = True
+            for key in token_usage:
+                token_usage[key] += consolidation_usage.get(key, 0) or 0
+        except Exception as e:
+            logger.warning(f"⚠️ Consolidation call failed, keeping merged concepts: {e}")
+    
+    total_duration = time.time() - start_time
+    success = bool(chunk_results)
+    metrics.update({
+        'api_duration': map_duration,
+        'parse_duration': parse_duration,
+        'total_duration': total_duration,
+        'token_usage': token_usage,
+        'failed_chunks': failed_chunks,
+        'concepts_extracted': len(concepts),
+        'relationships_extracted': len(relationships),
+        'success': success
+    })
+    
+    logger.info(f"✅ Map-reduce extraction complete: {len(concepts)} concepts, {len(relationships)} relationships "
+                f"({failed_chunks} failed chunks)")
+    logger.info(f"⏱️  Metrics: Map={map_duration:.2f}s | Merge={parse_duration:.3f}s | Total={total_duration:.2f}s")
+    
+    try:
+        log_metrics(
+            description=description,
+            educational_level=educational_level,
+            token_usage=token_usage,
+            timing_metrics=metrics,
+            concepts=concepts,
+            relationships=relationships,
+            success=success,
+            error=None if success else "All chunk extractions failed"
+        )
+    except Exception as log_error:
+        logger.warning(f"⚠️ Failed to log metrics locally: {log_error}")
+    
+    return concepts, relationships
+
+
+def _force_first_concept_to_zero(concepts: List[Dict]):
+    """Set the earliest concept's reveal_time to 0 so the visualization starts immediately."""
+    if concepts and len(concepts) > 0:
+        # Find the concept with earliest reveal time and set it to 0
+        earliest_concept = min(concepts, key=lambda c: c.get('reveal_time', 0.0))
+        original_time = earliest_concept.get('reveal_time', 0.0)
+        earliest_concept['reveal_time'] = 0.0
+        logger.info(f"⚡ Forced first concept '{earliest_concept.get('name')}' to appear at 0.0s (was {original_time:.2f}s)")
+
+
 @optional_traceable
 def create_timeline(
     description: str,
     educational_level: str,
-    topic_name: str
+    topic_name: str,
+    token_budget: Optional[int] = None,
+    long_document: Optional[bool] = None,
+    hedged: Optional[bool] = None,
+    use_cache: Optional[bool] = None,
+    voice: Optional[str] = None
 ) -> Dict:
     """
     Create timeline data structure for dynamic concept map generation.
@@ -582,6 +1131,13 @@ def create_timeline(
         description: Full description text
         educational_level: Educational level (e.g., "High School")
         topic_name: Topic name for the concept map
+        token_budget: Prompt token budget for the description (timings always use the full text)
+        long_document: Use map-reduce extraction over sentence chunks. None = automatic
+                       for descriptions above LONG_DOCUMENT_WORD_THRESHOLD words
+        hedged: Hedge the extraction call against tail latency. None = HEDGED_EXTRACTION env setting
+        use_cache: Reuse concepts from a near-duplicate description (see similarity_cache.py).
+                   None = SIMILARITY_CACHE env setting
+        voice: gTTS TLD the audio will be synthesized with (selects the timing profile)
         
     Returns:
         Timeline dict with structure:
@@ -613,17 +1169,36 @@ def create_timeline(
     logger.info(f"📝 Merged into continuous text ({len(full_text)} chars)")
     
     # Step 3: Extract ALL concepts with SINGLE API call
+    # (or parallel chunk calls + merge for very long descriptions)
+    if long_document is None:
+        long_document = len(full_text.split()) > LONG_DOCUMENT_WORD_THRESHOLD
+    
+    if use_cache is None:
+        use_cache = SIMILARITY_CACHE_ENABLED
+    
     extraction_start = time.time()
-    concepts, relationships = extract_concepts_from_full_description(
-        description, educational_level
-    )
+    cache = get_similarity_cache() if use_cache else None
+    cached = cache.lookup(full_text, educational_level) if cache else None
+    if cached:
+        # Reveal times are recomputed against the new text in Step 5
+        concepts, relationships = cached['concepts'], cached['relationships']
+    else:
+        if long_document:
+            concepts, relationships = extract_concepts_map_reduce(description, educational_level)
+        else:
+            concepts, relationships = extract_concepts_from_full_description(
+                description, educational_level, token_budget, hedged
+            )
+        if cache and concepts:
+            cache.store(full_text, educational_level, concepts, relationships)
     extraction_time = time.time() - extraction_start
     
     # Step 4: Calculate CHARACTER-BASED word-level timings
     # Formula: duration = char_count × 0.08s (min: 0.15s, max: 1.5s per word)
     # Examples: "I" (1 char) = 0.15s, "cat" (3 chars) = 0.24s, "photosynthesis" (14 chars) = 1.12s
     timing_start = time.time()
-    word_timings = calculate_word_timings(full_text)
+    voice = voice or DEFAULT_TIMING_VOICE
+    word_timings = calculate_word_timings(full_text, voice)
     total_duration = word_timings[-1]['end_time'] if word_timings else 0.0
     timing_calculation_time = time.time() - timing_start
     logger.info(f"⏱️ Calculated timings for {len(word_timings)} words (total: {total_duration:.1f}s)")
@@ -634,40 +1209,32 @@ def create_timeline(
     
     # CRITICAL: Force the first concept to appear immediately at time 0
     # This ensures the visualization starts right away and doesn't have a delay
-    if concepts and len(concepts) > 0:
-        # Find the concept with earliest reveal time and set it to 0
-        earliest_concept = min(concepts, key=lambda c: c.get('reveal_time', 0.0))
-        original_time = earliest_concept.get('reveal_time', 0.0)
-        earliest_concept['reveal_time'] = 0.0
-        logger.info(f"⚡ Forced first concept '{earliest_concept.get('name')}' to appear at 0.0s (was {original_time:.2f}s)")
+    _force_first_concept_to_zero(concepts)
     
-    timeline = {
+    # Legacy `sentences` view is derived on access (see timeline_model.py)
+    timeline = Timeline({
         "metadata": {
             "topic_name": topic_name,
             "educational_level": educational_level,
             "total_duration": total_duration,
             "total_concepts": len(concepts),
-            "word_count": len(word_timings)
+            "word_count": len(word_timings),
+            "timing_voice": voice
         },
         "full_text": full_text,
         "word_timings": word_timings,
         "concepts": concepts,
-        "relationships": relationships,
-        # Keep legacy sentence structure for backward compatibility
-        "sentences": [{
-            "index": 0,
-            "text": full_text,
-            "concepts": concepts,
-            "relationships": relationships,
-            "estimated_tts_duration": total_duration
-        }]
-    }
+        "relationships": relationships
+    })
     
     # Calculate total processing time
     total_processing_time = time.time() - pipeline_start
     timeline["metadata"]["processing_time"] = total_processing_time
     timeline["metadata"]["extraction_time"] = extraction_time
     timeline["metadata"]["timing_calculation_time"] = timing_calculation_time
+    timeline["metadata"]["cache_hit"] = cached is not None
+    if cached:
+        timeline["metadata"]["cache_similarity"] = cached['similarity']
     
     logger.info(f"✅ Continuous timeline created! {total_duration:.1f}s duration, {len(concepts)} concepts")
     logger.info(f"⏱️  Pipeline Metrics:")
@@ -678,6 +1245,212 @@ def create_timeline(
     return timeline
 
 
+# Re-extract with the LLM when more than this fraction of words changed
+INCREMENTAL_REEXTRACT_RATIO = float(os.getenv('INCREMENTAL_REEXTRACT_RATIO', '0.5'))
+
+
+def _shift_timings(word_timings: List[Dict], offset: float) -> List[Dict]:
+    """Copy word timings moved by offset seconds (millisecond precision)."""
+    return [
+        {**timing, "start_time": round(timing["start_time"] + offset, 3),
+         "end_time": round(timing["end_time"] + offset, 3)}
+        for timing in word_timings
+    ]
+
+
+def _concept_found_in_text(concept_name: str, text_lower: str) -> bool:
+    """
+    Whether assign_concept_reveal_times() can still place a concept in the text
+    (exact match, or any significant word / 5-character stem).
+    """
+    name_lower = concept_name.lower()
+    if not name_lower or name_lower in text_lower:
+        return True
+    text_words = [re.sub(r'[^\w\s]', '', w) for w in text_lower.split()]
+    for word in name_lower.split():
+        clean_word = re.sub(r'[^\w\s]', '', word)
+        if len(clean_word) < 3:
+            continue
+        if clean_word in text_lower:
+            return True
+        stem = clean_word[:5]
+        if any(w.startswith(stem) for w in text_words):
+            return True
+    return False
+
+
+def update_timeline(
+    old_timeline: Dict,
+    new_description: str,
+    educational_level: Optional[str] = None,
+    topic_name: Optional[str] = None,
+    reextract_ratio: Optional[float] = None,
+    hedged: Optional[bool] = None
+) -> Dict:
+    """
+    Update a timeline after the description was edited, redoing only what changed.
+    
+    Old and new text are diffed at sentence level:
+    - word_timings of unchanged sentences are reused (shifted by the duration change
+      of earlier edits, and un-scaled if they were rescaled to the old audio);
+      only changed sentences are re-timed
+    - reveal times are re-resolved only for concepts whose first match is not in the
+      unchanged leading sentences
+    - the concept set is reused only for pure deletions and reorders of sentences;
+      any new or rewritten sentence may introduce concepts, so it triggers a full
+      rebuild (create_timeline, with an LLM call), as do concepts that can no
+      longer be found in the new text or more than `reextract_ratio` of the
+      words changing
+    
+    Audio for unchanged sentences is reused by PrecomputeEngine.precompute_all()
+    when given the old timeline.
+    
+    Args:
+        old_timeline: Timeline from create_timeline() or update_timeline()
+        new_description: Edited description
+        educational_level: Educational level (default: old timeline's)
+        topic_name: Topic name (default: old timeline's)
+        reextract_ratio: Changed-word fraction that forces re-extraction
+                         (default: INCREMENTAL_REEXTRACT_RATIO)
+        hedged: Passed to create_timeline() when re-extraction is needed
+        
+    Returns:
+        New timeline dict (same structure as create_timeline); metadata
+        "incremental_update" describes what was reused
+    """
+    pipeline_start = time.time()
+    old_metadata = old_timeline.get("metadata", {})
+    educational_level = educational_level or old_metadata.get("educational_level", "high school")
+    topic_name = topic_name or old_metadata.get("topic_name")
+    voice = old_metadata.get("timing_voice", DEFAULT_TIMING_VOICE)
+    if reextract_ratio is None:
+        reextract_ratio = INCREMENTAL_REEXTRACT_RATIO
+    
+    old_sentences = split_into_sentences(old_timeline.get("full_text", ""))
+    new_sentences = split_into_sentences(new_description)
+    full_text = " ".join(new_sentences)
+    old_word_timings = list(old_timeline.get("word_timings", []))
+    
+    # Timings rescaled to the old audio (RESCALE_TIMINGS) are brought back to the
+    # estimate scale, so reused and re-timed blocks match; the new audio rescales them again
+    scale_factor = old_metadata.get("timing_scale_factor") or 1.0
+    if scale_factor != 1.0:
+        old_word_timings = [
+            {**timing, "start_time": round(timing["start_time"] / scale_factor, 3),
+             "end_time": round(timing["end_time"] / scale_factor, 3)}
+            for timing in old_word_timings
+        ]
+    
+    def full_rebuild(reason: str) -> Dict:
+        logger.info(f"🔄 Incremental update not possible ({reason}), creating new timeline")
+        return create_timeline(new_description, educational_level, topic_name, hedged=hedged, voice=voice)
+    
+    if not old_sentences or len(old_word_timings) != sum(len(s.split()) for s in old_sentences):
+        return full_rebuild("old timeline has no matching word timings")
+    
+    # Word offsets of each old sentence in old_word_timings
+    old_word_starts = [0]
+    for sentence in old_sentences:
+        old_word_starts.append(old_word_starts[-1] + len(sentence.split()))
+    
+    # Step 1: Sentence-level diff. Inserted or replaced sentences that are not
+    # just moved old sentences are text the concept set was never extracted from
+    matcher = difflib.SequenceMatcher(None, old_sentences, new_sentences, autojunk=False)
+    old_sentence_set = set(old_sentences)
+    new_text_sentences = [
+        sentence
+        for tag, _, _, j1, j2 in matcher.get_opcodes() if tag in ('insert', 'replace')
+        for sentence in new_sentences[j1:j2] if sentence not in old_sentence_set
+    ]
+    if new_text_sentences:
+        return full_rebuild(f"{len(new_text_sentences)} new or rewritten sentence(s)")
+    
+    # Rebuild word timings block by block
+    word_timings = []
+    current_time = 0.0
+    leading_silence = load_voice_profile(voice)["leading_silence"]
+    changed_words = 0
+    unchanged_prefix_sentences = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            if j1 == 0:
+                unchanged_prefix_sentences = j2
+            block = old_word_timings[old_word_starts[i1]:old_word_starts[i2]]
+        else:
+            block_text = " ".join(new_sentences[j1:j2])
+            block = calculate_word_timings(block_text, voice) if block_text else []
+            changed_words += len(block)
+        # The first block starts after the voice's leading silence; later blocks follow on
+        if block:
+            block_start = current_time if word_timings else leading_silence
+            word_timings.extend(_shift_timings(block, block_start - block[0]["start_time"]))
+        if word_timings:
+            current_time = word_timings[-1]["end_time"]
+    
+    total_duration = word_timings[-1]["end_time"] if word_timings else 0.0
+    total_words = max(len(word_timings), 1)
+    
+    if changed_words == 0 and len(new_sentences) == len(old_sentences):
+        logger.info("✅ Description unchanged, reusing timeline")
+    
+    # Step 2: Decide whether the concept set is still valid
+    full_text_lower = full_text.lower()
+    concepts = [dict(c) for c in old_timeline.get("concepts", [])]
+    if scale_factor != 1.0:
+        for concept in concepts:
+            concept["reveal_time"] = round(concept.get("reveal_time", 0.0) / scale_factor, 3)
+    relationships = [dict(r) for r in old_timeline.get("relationships", [])]
+    missing = [c.get("name") for c in concepts if not _concept_found_in_text(c.get("name", ""), full_text_lower)]
+    if missing:
+        return full_rebuild(f"concepts no longer in text: {missing}")
+    if changed_words / total_words > reextract_ratio:
+        return full_rebuild(f"{changed_words}/{total_words} words changed")
+    
+    # Step 3: Re-resolve only concepts not matched in the unchanged leading sentences
+    prefix_lower = " ".join(new_sentences[:unchanged_prefix_sentences]).lower()
+    to_resolve = [c for c in concepts if not (c.get("name") and c["name"].lower() in prefix_lower)]
+    if to_resolve:
+        assign_concept_reveal_times(to_resolve, word_timings, full_text)
+    _force_first_concept_to_zero(concepts)
+    
+    timeline = Timeline({
+        key: value for key, value in old_timeline.items()
+        if key not in ("audio_file", "actual_audio_duration", "pre_calculated_layout", "sentences")
+    })
+    metadata = {
+        key: value for key, value in old_metadata.items()
+        if key not in ("audio_file", "timing_scale_factor", "original_estimated_duration", "actual_audio_duration")
+    }
+    metadata.update({
+        "topic_name": topic_name,
+        "educational_level": educational_level,
+        "total_duration": total_duration,
+        "total_concepts": len(concepts),
+        "word_count": len(word_timings),
+        "processing_time": time.time() - pipeline_start,
+        "extraction_time": 0.0,
+        "incremental_update": {
+            "changed_sentences": sum(j2 - j1 for tag, _, _, j1, j2 in matcher.get_opcodes() if tag != 'equal'),
+            "total_sentences": len(new_sentences),
+            "recomputed_words": changed_words,
+            "reused_words": len(word_timings) - changed_words,
+            "reresolved_concepts": len(to_resolve),
+            "llm_called": False
+        }
+    })
+    timeline.update({
+        "metadata": metadata,
+        "full_text": full_text,
+        "word_timings": word_timings,
+        "concepts": concepts,
+        "relationships": relationships
+    })
+    
+    logger.info(f"✅ Incremental update: {changed_words}/{len(word_timings)} words re-timed, "
+                f"{len(to_resolve)}/{len(concepts)} concepts re-resolved, no LLM call")
+    return timeline
+
+
 def print_timeline_summary(timeline: Dict):
     """
     Print a human-readable summary of the timeline for debugging.
@@ -0,0 +1,223 @@
+"""
+Timeline Model Module
+=====================
+Timeline dict that stores each payload once.
+
+Timelines used to carry a legacy `sentences` list whose single entry repeated
+the full text, concepts and relationships, so every save, download and export
+serialized them twice. A Timeline stores only the top-level fields; reading
+timeline["sentences"] builds the legacy view on first access (sharing the
+top-level lists, so edits stay in sync) and keeps it for later reads.
+
+Other values derived from the payload (e.g. the concept graph) can be cached
+on the Timeline with derived(); like the view, they are dropped when a source
+field is replaced.
+
+Serialization omits the legacy view unless asked for (TIMELINE_LEGACY_FIELDS=true
+or legacy=True), so existing readers of `sentences` keep working either way:
+loading goes through as_timeline(), which recreates the view.
+"""
+
+import os
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+INCLUDE_LEGACY_FIELDS = os.getenv('TIMELINE_LEGACY_FIELDS', 'false').lower() == 'true'
+
+# Keys the legacy sentence view is derived from
+_VIEW_SOURCES = ("full_text", "concepts", "relationships", "metadata")
+_LEGACY_SENTENCE_KEYS = {"index", "text", "concepts", "relationships", "estimated_tts_duration"}
+
+
+class Timeline(dict):
+    """
+    Timeline dict with a lazily derived legacy `sentences` view.
+
+    An explicitly stored `sentences` list (e.g. real per-sentence data from an
+    old file) is kept as-is; one that merely repeats the top-level payload is
+    dropped on construction.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sentences: Optional[List[Dict]] = None
+        self._derived: Dict[str, Any] = {}
+        if self._is_derived(super().get("sentences")):
+            super().__delitem__("sentences")
+
+    def _is_derived(self, sentences: Any) -> bool:
+        """True if sentences is exactly the view legacy_sentences() would build."""
+        if not (isinstance(sentences, list) and len(sentences) == 1 and isinstance(sentences[0], dict)):
+            return False
+        sentence = sentences[0]
+        return (set(sentence) <= _LEGACY_SENTENCE_KEYS
+                and sentence.get("index", 0) == 0
+                and sentence.get("text") == super().get("full_text")
+                and sentence.get("concepts") == super().get("concepts")
+                and sentence.get("relationships", []) == super().get("relationships", []))
+
+    def has_stored_sentences(self) -> bool:
+        """True if `sentences` is stored data rather than the derived view."""
+        return super().__contains__("sentences")
+
+    def legacy_sentences(self) -> List[Dict]:
+        """The legacy single-sentence view (built once, shares the top-level lists)."""
+        if self.has_stored_sentences():
+            return super().__getitem__("sentences")
+        if self._sentences is None:
+            metadata = super().get("metadata") or {}
+            self._sentences = [{
+                "index": 0,
+                "text": super().get("full_text", ""),
+                "concepts": super().get("concepts", []),
+                "relationships": super().get("relationships", []),
+                "estimated_tts_duration": metadata.get("total_duration", 0.0)
+            }]
+        return self._sentences
+
+    def derived(self, name: str, build: Callable[[], Any]) -> Any:
+        """
+        Value computed from the payload, built once and cached on this Timeline.
+
+        The cache is cleared when full_text, concepts, relationships or metadata
+        is replaced or removed through any dict method (not on in-place edits
+        of those values).
+
+        Args:
+            name: Cache key
+            build: Zero-argument function computing the value
+
+        Returns:
+            Cached or freshly built value
+        """
+        if name not in self._derived:
+            self._derived[name] = build()
+        return self._derived[name]
+
+    def _invalidate(self):
+        self._sentences = None
+        self._derived.clear()
+
+    # ------------------------------------------------------------------
+    # dict overrides
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, key):
+        if key == "sentences":
+            return self.legacy_sentences()
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if key == "sentences":
+            return self.legacy_sentences()
+        return super().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        return key == "sentences" or super().__contains__(key)
+
+    def __setitem__(self, key, value):
+        if key in _VIEW_SOURCES:
+            self._invalidate()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if key == "sentences" and not self.has_stored_sentences():
+            self._sentences = None
+            return
+        if key in _VIEW_SOURCES:
+            self._invalidate()
+        super().__delitem__(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *default):
+        if key == "sentences" and not self.has_stored_sentences():
+            sentences = self.legacy_sentences()
+            self._sentences = None
+            return sentences
+        if key in _VIEW_SOURCES and super().__contains__(key):
+            self._invalidate()
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        if key in _VIEW_SOURCES:
+            self._invalidate()
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key == "sentences" and not self.has_stored_sentences():
+            return self.legacy_sentences()
+        if not super().__contains__(key):
+            self[key] = default
+        return super().__getitem__(key)
+
+    def clear(self):
+        self._invalidate()
+        super().clear()
+
+    def copy(self) -> "Timeline":
+        return Timeline(self)
+
+    def __reduce__(self):
+        # Pickle/deepcopy as a plain mapping; the view is rebuilt on demand
+        return (Timeline, (dict(self),))
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def to_dict(self, legacy: Optional[bool] = None) -> Dict:
+        """
+        Plain dict for serialization.
+
+        Args:
+            legacy: Include the derived `sentences` view (default: TIMELINE_LEGACY_FIELDS)
+
+        Returns:
+            Shallow dict copy
+        """
+        data = dict(self)
+        if (INCLUDE_LEGACY_FIELDS if legacy is None else legacy) and "sentences" not in data:
+            data["sentences"] = self.legacy_sentences()
+        return data
+
+    def to_json(self, legacy: Optional[bool] = None, indent: Optional[int] = None) -> str:
+        """
+        Serialize to JSON (minified unless indent is given).
+
+        Args:
+            legacy: Include the derived `sentences` view (default: TIMELINE_LEGACY_FIELDS)
+            indent: JSON indent
+
+        Returns:
+            JSON string
+        """
+        separators = (",", ":") if indent is None else None
+        return json.dumps(self.to_dict(legacy), indent=indent, ensure_ascii=False, separators=separators)
+
+
+def as_timeline(data: Dict) -> Timeline:
+    """Wrap a timeline dict (e.g. freshly loaded JSON) as a Timeline, dropping a derived `sentences` copy."""
+    return data if isinstance(data, Timeline) else Timeline(data)
+
+
+def serialize_timeline(timeline: Dict, legacy: Optional[bool] = None, indent: Optional[int] = None) -> str:
+    """
+    JSON for any timeline dict, with the legacy view handled like Timeline.to_json().
+
+    Args:
+        timeline: Timeline or plain timeline dict
+        legacy: Include `sentences` (default: TIMELINE_LEGACY_FIELDS)
+        indent: JSON indent (None = minified)
+
+    Returns:
+        JSON string
+    """
+    return as_timeline(timeline).to_json(legacy=legacy, indent=indent)
@@ -0,0 +1,356 @@
+"""
+Timeline Store Module
+=====================
+Repository for saved timelines in concept_json_timings/ with a small on-disk index.
+
+index.json holds one entry per saved timeline (topic, level, description hash,
+created_at, duration, concept count) so lookups, history pages and reuse never
+parse the timeline files themselves. Saving a description that is already
+stored (same hash and level) replaces the old file instead of adding another.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from timeline_binary import save_timeline_binary
+from timeline_model import as_timeline, serialize_timeline
+
+logger = logging.getLogger(__name__)
+
+# Default directory (same as the standalone app's export directory)
+DEFAULT_STORE_DIR = Path(__file__).parent / "concept_json_timings"
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 2  # 2: description hashes of the sentence-split text
+
+# Retention (0 = unlimited; pruning deletes files, so it is opt-in)
+RETENTION_MAX_ENTRIES = int(os.getenv('TIMELINE_RETENTION_MAX_ENTRIES', '0'))
+RETENTION_DAYS = int(os.getenv('TIMELINE_RETENTION_DAYS', '0'))
+
+
+def description_hash(description: str) -> str:
+    """Hash of a description with whitespace normalized (used for dedup and reuse)."""
+    normalized = " ".join(description.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def timeline_text_hash(description: str) -> str:
+    """
+    description_hash() of the text a timeline built from description narrates.
+
+    Hashes the sentence-split text (the timeline's full_text), so a raw
+    description and the full_text stored in its timeline hash the same.
+    """
+    from timeline_mapper import split_into_sentences
+    return description_hash(" ".join(split_into_sentences(description)))
+
+
+def _sanitize_topic(topic: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in ("-", "_") else "_" for ch in topic).strip("_") or "concept_map"
+
+
+class TimelineStore:
+    """
+    Indexed timeline repository backed by a directory of JSON files.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_STORE_DIR,
+                 max_entries: int = RETENTION_MAX_ENTRIES, max_age_days: int = RETENTION_DAYS):
+        self.directory = Path(directory)
+        self.directory.mkdir(exist_ok=True)
+        self.index_path = self.directory / INDEX_FILENAME
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self._lock = threading.RLock()
+        self._entries = None  # Loaded on first use
+
+    # ------------------------------------------------------------------
+    # Index persistence
+    # ------------------------------------------------------------------
+
+    def _load_index(self) -> List[Dict]:
+        if self._entries is not None:
+            return self._entries
+
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get('version') == INDEX_VERSION:
+                    self._entries = index.get('entries', [])
+                    return self._entries
+                logger.info(f"📇 Timeline index version {index.get('version')} is outdated, rebuilding")
+            except Exception as e:
+                logger.warning(f"⚠️ Timeline index unreadable ({e}), rebuilding")
+
+        self.rebuild_index()
+        return self._entries
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'entries': self._entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _make_entry(timeline: Dict, filename: str, desc_hash: str, created_at: str) -> Dict:
+        metadata = timeline.get('metadata', {})
+        return {
+            'id': Path(filename).stem,
+            'filename': filename,
+            'topic': metadata.get('topic') or metadata.get('topic_name') or 'concept_map',
+            'educational_level': metadata.get('educational_level', ''),
+            'description_hash': desc_hash,
+            'created_at': created_at,
+            'duration': round(float(metadata.get('total_duration', 0.0) or 0.0), 3),
+            'concept_count': metadata.get('total_concepts', len(timeline.get('concepts', [])))
+        }
+
+    def rebuild_index(self) -> int:
+        """
+        Rebuild index.json by scanning the directory (e.g. for files saved before the index existed).
+
+        Returns:
+            Number of indexed timelines
+        """
+        with self._lock:
+            entries = []
+            for filepath in sorted(self.directory.glob("*.json")):
+                if filepath.name == INDEX_FILENAME:
+                    continue
+                try:
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        timeline = json.load(f)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable timeline {filepath.name}: {e}")
+                    continue
+                if not isinstance(timeline, dict) or 'metadata' not in timeline:
+                    continue
+                created_at = datetime.fromtimestamp(filepath.stat().st_mtime).isoformat()
+                entries.append(self._make_entry(
+                    timeline, filepath.name, timeline_text_hash(timeline.get('full_text', '')), created_at
+                ))
+
+            entries.sort(key=lambda e: e['created_at'])
+            self._entries = entries
+            self._save_index()
+            logger.info(f"📇 Rebuilt timeline index: {len(entries)} timelines")
+            return len(entries)
+
+    # ------------------------------------------------------------------
+    # Save / load / delete
+    # ------------------------------------------------------------------
+
+    def save(self, timeline: Dict, description: Optional[str] = None, write_binary: bool = False) -> Dict:
+        """
+        Save a timeline and index it.
+
+        A timeline for the same description (hash) and educational level replaces
+        the stored one. Retention is applied after saving.
+
+        Args:
+            timeline: Timeline dict
+            description: Original description (default: the timeline's full_text)
+            write_binary: Also write a .cmtl copy next to the JSON (see timeline_binary.py)
+
+        Returns:
+            Index entry of the saved timeline
+        """
+        desc_hash = timeline_text_hash(description if description is not None else timeline.get('full_text', ''))
+        metadata = timeline.get('metadata', {})
+        topic = metadata.get('topic') or metadata.get('topic_name') or 'concept_map'
+        timestamp = datetime.now()
+        filename = f"{_sanitize_topic(topic)}_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+
+        with self._lock:
+            entries = self._load_index()
+
+            # Avoid clobbering a different timeline saved within the same second
+            suffix = 1
+            while (self.directory / filename).exists() and not any(
+                e['filename'] == filename and e['description_hash'] == desc_hash for e in entries
+            ):
+                filename = f"{_sanitize_topic(topic)}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{suffix}.json"
+                suffix += 1
+
+            filepath = self.directory / filename
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(serialize_timeline(timeline, indent=2))
+            if write_binary:
+                try:
+                    save_timeline_binary(timeline, filepath.with_suffix('.cmtl'))
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to save binary timeline: {e}")
+
+            # Dedup: drop older timelines for the same description and level
+            level = metadata.get('educational_level', '')
+            for old in [e for e in entries
+                        if e['description_hash'] == desc_hash and e['educational_level'] == level]:
+                if old['filename'] != filename:
+                    self._remove_files(old)
+                entries.remove(old)
+
+            entry = self._make_entry(timeline, filename, desc_hash, timestamp.isoformat())
+            entries.append(entry)
+            self._apply_retention()
+            self._save_index()
+
+        logger.info(f"💾 Timeline saved to {filepath}")
+        return entry
+
+    def load(self, entry_id: str) -> Optional[Dict]:
+        """Load a stored timeline by id, or None if missing."""
+        entry = self.get(entry_id)
+        if entry is None:
+            return None
+        try:
+            with open(self.directory / entry['filename'], 'r', encoding='utf-8') as f:
+                return as_timeline(json.load(f))
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load timeline {entry['filename']}: {e}")
+            return None
+
+    def get(self, entry_id: str) -> Optional[Dict]:
+        """Index entry by id."""
+        with self._lock:
+            for entry in self._load_index():
+                if entry['id'] == entry_id:
+                    return entry
+        return None
+
+    def path_for(self, entry: Dict) -> Path:
+        """Path of a stored timeline's JSON file."""
+        return self.directory / entry['filename']
+
+    def delete(self, entry_id: str) -> bool:
+        """Delete a stored timeline. Returns True if it existed."""
+        with self._lock:
+            entries = self._load_index()
+            for entry in entries:
+                if entry['id'] == entry_id:
+                    self._remove_files(entry)
+                    entries.remove(entry)
+                    self._save_index()
+                    return True
+        return False
+
+    def _remove_files(self, entry: Dict):
+        filepath = self.directory / entry['filename']
+        for path in (filepath, filepath.with_suffix('.cmtl')):
+            try:
+                if path.exists():
+                    path.unlink()
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to delete {path.name}: {e}")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def find(self, topic: Optional[str] = None, educational_level: Optional[str] = None,
+             desc_hash: Optional[str] = None) -> List[Dict]:
+        """
+        Index entries matching all given filters, newest first.
+
+        Args:
+            topic: Case-insensitive substring of the topic
+            educational_level: Exact (case-insensitive) educational level
+            desc_hash: Description hash from timeline_text_hash()
+
+        Returns:
+            List of index entries
+        """
+        with self._lock:
+            entries = list(self._load_index())
+
+        if topic:
+            topic_lower = topic.lower()
+            entries = [e for e in entries if topic_lower in e['topic'].lower()]
+        if educational_level:
+            level_lower = educational_level.lower()
+            entries = [e for e in entries if e['educational_level'].lower() == level_lower]
+        if desc_hash:
+            entries = [e for e in entries if e['description_hash'] == desc_hash]
+
+        return sorted(entries, key=lambda e: e['created_at'], reverse=True)
+
+    def find_by_description(self, description: str, educational_level: str) -> Optional[Dict]:
+        """Newest stored timeline for this exact description and level, or None."""
+        matches = self.find(educational_level=educational_level, desc_hash=timeline_text_hash(description))
+        return matches[0] if matches else None
+
+    def list_page(self, page: int = 1, page_size: int = 10, topic: Optional[str] = None,
+                  educational_level: Optional[str] = None) -> Dict:
+        """
+        One page of index entries, newest first.
+
+        Returns:
+            Dict with 'entries', 'page', 'page_size', 'total' and 'pages'
+        """
+        entries = self.find(topic=topic, educational_level=educational_level)
+        total = len(entries)
+        pages = max(1, -(-total // page_size))
+        page = min(max(1, page), pages)
+        start = (page - 1) * page_size
+        return {
+            'entries': entries[start:start + page_size],
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'pages': pages
+        }
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def _apply_retention(self) -> int:
+        entries = self._entries
+        expired = []
+        if self.max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            expired = [e for e in entries if e['created_at'] < cutoff]
+        remaining = [e for e in entries if e not in expired]
+        if self.max_entries > 0 and len(remaining) > self.max_entries:
+            remaining.sort(key=lambda e: e['created_at'])
+            expired.extend(remaining[:len(remaining) - self.max_entries])
+
+        for entry in expired:
+            self._remove_files(entry)
+            entries.remove(entry)
+        if expired:
+            logger.info(f"🗑️  Timeline retention removed {len(expired)} old timelines")
+        return len(expired)
+
+    def apply_retention(self) -> int:
+        """
+        Remove timelines beyond max_entries or older than max_age_days.
+
+        Returns:
+            Number of removed timelines
+        """
+        with self._lock:
+            self._load_index()
+            removed = self._apply_retention()
+            if removed:
+                self._save_index()
+            return removed
+
+
+# Global store instance
+_global_store = None
+_global_store_lock = threading.Lock()
+
+
+def get_timeline_store() -> TimelineStore:
+    """Get the global timeline store for concept_json_timings/."""
+    global _global_store
+    with _global_store_lock:
+        if _global_store is None:
+            _global_store = TimelineStore()
+        return _global_store
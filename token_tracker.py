@@ -6,6 +6,9 @@ this module provides utilities to estimate and track token usage manually.
 """
 
 import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -102,26 +105,39 @@ def estimate_cost(total_tokens: int, model: str = "gemini-2.5-flash") -> float:
 class TokenTracker:
     """
     Context manager for tracking token usage across a workflow
+    
+    Thread-safe: nodes running on parallel branches or batch workers may
+    report into the same tracker. A node reported more than once (e.g. the
+    same node in several runs) accumulates its counts.
     """
     
     def __init__(self, workflow_name: str = "ConceptMapping"):
         self.workflow_name = workflow_name
         self.node_tokens = {}
         self.total_tokens = 0
+        self._lock = threading.Lock()
         
     def add_node(self, node_name: str, token_info: dict):
         """Add token info for a node"""
-        self.node_tokens[node_name] = token_info
-        self.total_tokens += token_info["total_tokens"]
+        with self._lock:
+            previous = self.node_tokens.get(node_name)
+            if previous is None:
+                self.node_tokens[node_name] = dict(token_info)
+            else:
+                for key, value in token_info.items():
+                    if isinstance(value, (int, float)) and isinstance(previous.get(key), (int, float)):
+                        previous[key] += value
+            self.total_tokens += token_info["total_tokens"]
         
     def get_summary(self) -> dict:
         """Get token usage summary"""
-        return {
-            "workflow": self.workflow_name,
-            "total_tokens": self.total_tokens,
-            "total_cost": estimate_cost(self.total_tokens),
-            "nodes": self.node_tokens
-        }
+        with self._lock:
+            return {
+                "workflow": self.workflow_name,
+                "total_tokens": self.total_tokens,
+                "total_cost": estimate_cost(self.total_tokens),
+                "nodes": {name: dict(info) for name, info in self.node_tokens.items()}
+            }
     
     def log_summary(self):
         """Log token usage summary"""
@@ -131,31 +147,58 @@ class TokenTracker:
         logger.info(f"📊 Token Usage Summary - {self.workflow_name}")
         logger.info("=" * 60)
         
-        for node_name, info in self.node_tokens.items():
+        for node_name, info in summary['nodes'].items():
             logger.info(
                 f"  {node_name}: {info['total_tokens']} tokens "
                 f"(in: {info['input_tokens']}, out: {info['output_tokens']})"
             )
         
         logger.info("-" * 60)
-        logger.info(f"  TOTAL: {self.total_tokens} tokens")
+        logger.info(f"  TOTAL: {summary['total_tokens']} tokens")
         logger.info(f"  ESTIMATED COST: ${summary['total_cost']:.4f}")
         logger.info("=" * 60)
 
 
 # Global tracker instance
 _global_tracker: Optional[TokenTracker] = None
+_global_tracker_lock = threading.Lock()
+
+# Tracker scoped to the current run (see track_tokens); falls back to the global one
+_current_tracker: ContextVar[Optional[TokenTracker]] = ContextVar('current_token_tracker', default=None)
 
 
 def get_tracker() -> TokenTracker:
-    """Get or create global token tracker"""
+    """Get the tracker of the current run, or the global token tracker"""
     global _global_tracker
-    if _global_tracker is None:
-        _global_tracker = TokenTracker()
-    return _global_tracker
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        return tracker
+    with _global_tracker_lock:
+        if _global_tracker is None:
+            _global_tracker = TokenTracker()
+        return _global_tracker
 
 
 def reset_tracker():
     """Reset global token tracker"""
     global _global_tracker
-    _global_tracker = TokenTracker()
+    with _global_tracker_lock:
+        _global_tracker = TokenTracker()
+
+
+@contextmanager
+def track_tokens(tracker: TokenTracker):
+    """
+    Route get_tracker() to tracker inside the block
+    
+    Scoped per thread / async task, so concurrent runs (batch workers) each
+    count their own tokens. Threads started with asyncio.to_thread inherit it.
+    
+    Args:
+        tracker (TokenTracker): Tracker for this run
+    """
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
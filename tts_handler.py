@@ -9,7 +9,9 @@ import pyttsx3
 import re
 import time
 import logging
-from typing import List
+import threading
+import multiprocessing
+from typing import List, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -77,37 +79,43 @@ class TTSHandler:
             self.engine.runAndWait()
             
             # Small buffer to ensure audio playback is fully complete
-            import time
             time.sleep(0.2)
             
         except Exception as e:
             logger.error(f"❌ Error speaking sentence: {e}")
     
-    def speak_text_sentence_by_sentence(self, text: str, pause_duration: float = 1.0) -> None:
+    def speak_text_sentence_by_sentence(self, text: str, pause_duration: float = 1.0,
+                                        cancel_event: Optional[threading.Event] = None) -> None:
         """
         Read text sentence-by-sentence with pauses between sentences
         
         Args:
             text: The text to read
             pause_duration: Pause duration in seconds between sentences. Default: 1.0
+            cancel_event: Optional event; once set, narration stops after the current sentence
         """
         if not self.engine:
             logger.warning("TTS engine not available, skipping speech")
             return
         
+        cancel_event = cancel_event or threading.Event()
         sentences = self.split_into_sentences(text)
         
         logger.info(f"📢 Starting TTS narration ({len(sentences)} sentences)")
         logger.info("="*60)
         
         for i, sentence in enumerate(sentences, 1):
+            if cancel_event.is_set():
+                logger.info("⏹️  TTS narration cancelled")
+                return
+            
             logger.info(f"📝 Sentence {i}/{len(sentences)}")
             self.speak_sentence(sentence)
             
-            # Pause between sentences (except after the last one)
+            # Pause between sentences (except after the last one); wakes early on cancel
             if i < len(sentences):
                 logger.info(f"⏸️  Pausing for {pause_duration} seconds...")
-                time.sleep(pause_duration)
+                cancel_event.wait(pause_duration)
         
         logger.info("="*60)
         logger.info("✅ TTS narration complete")
@@ -149,6 +157,82 @@ class TTSHandler:
             return False
 
 
+def _narrate(text: str, rate: int, volume: float, pause_duration: float) -> None:
+    """Narration process entry point (module level so it can be spawned)."""
+    tts = TTSHandler(rate=rate, volume=volume)
+    if tts.engine is None:
+        raise SystemExit(1)
+    tts.speak_text_sentence_by_sentence(text, pause_duration)
+
+
+class NarrationProcess:
+    """
+    Runs sentence-by-sentence narration in a separate process.
+    
+    pyttsx3 drivers need to run on their process's main thread (SAPI5 needs COM
+    initialized on the calling thread, NSSpeechSynthesizer needs the main run
+    loop), so the engine lives in its own process rather than on a background
+    thread. The caller can keep working - e.g. run the concept map workflow -
+    while the description is being read, and cancel() stops it mid-sentence.
+    """
+    
+    def __init__(self, text: str, rate: int = 200, volume: float = 0.9, pause_duration: float = 1.0):
+        """
+        Args:
+            text: The text to read
+            rate: Speech rate (words per minute)
+            volume: Volume level (0.0 to 1.0)
+            pause_duration: Pause duration in seconds between sentences
+        """
+        self.text = text
+        self.rate = rate
+        self.volume = volume
+        self.pause_duration = pause_duration
+        self._cancelled = False
+        self._process = multiprocessing.Process(
+            target=_narrate, args=(text, rate, volume, pause_duration),
+            name="tts-narration", daemon=True
+        )
+    
+    @property
+    def error(self) -> Optional[Exception]:
+        """Error if the narration process failed (None while running, on success or when cancelled)."""
+        exitcode = self._process.exitcode
+        if exitcode in (None, 0) or self._cancelled:
+            return None
+        return RuntimeError(f"Narration process exited with code {exitcode}")
+    
+    def start(self) -> "NarrationProcess":
+        """Start narrating (returns immediately)."""
+        self._process.start()
+        return self
+    
+    def cancel(self) -> None:
+        """Stop narrating immediately, including a sentence in progress."""
+        self._cancelled = True
+        if self._process.is_alive():
+            self._process.terminate()
+    
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+    
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for narration to finish.
+        
+        Args:
+            timeout: Maximum seconds to wait (None = until done)
+            
+        Returns:
+            bool: True if narration has finished
+        """
+        self._process.join(timeout)
+        finished = not self._process.is_alive()
+        if finished and self.error is not None:
+            logger.error(f"❌ TTS error: {self.error}")
+        return finished
+
+
 def test_tts_handler():
     """Test the TTS handler with sample text"""
     print("\n" + "="*60)
@@ -47,6 +47,18 @@ def print_summary():
     print(f"   Average API Duration: {stats['timing']['avg_api_duration_seconds']:.3f}s")
     print(f"   Total API Time: {stats['timing']['total_api_time_seconds']:.2f}s")
     
+    print(f"\n🗜️  PROMPT COMPRESSION:")
+    print(f"   Compressed Runs: {stats['prompt']['compressed_runs']}")
+    print(f"   Average Compression Ratio: {stats['prompt']['avg_compression_ratio']:.2f}")
+    
+    print(f"\n⏱️  HEDGED REQUESTS:")
+    print(f"   Hedged Runs: {stats['hedging']['hedged_runs']}")
+    print(f"   Backup Wins: {stats['hedging']['backup_wins']}")
+    
+    print(f"\n🔧 JSON PARSING:")
+    print(f"   Repaired Responses: {stats['parsing']['repaired_runs']}")
+    print(f"   Dropped Invalid Items: {stats['parsing']['total_dropped_items']}")
+    
     print(f"\n📝 OUTPUT:")
     print(f"   Average Concepts per Run: {stats['output']['avg_concepts_per_run']:.1f}")
     print(f"   Total Concepts Extracted: {stats['output']['total_concepts_extracted']}")
@@ -82,6 +94,8 @@ def print_recent(limit=5):
         print(f"   Level: {run['input']['educational_level']}")
         print(f"   Tokens: {run['tokens']['total_tokens']} (prompt: {run['tokens']['prompt_tokens']}, completion: {run['tokens']['completion_tokens']})")
         print(f"   Duration: {run['timing']['total_duration_seconds']:.3f}s")
+        if run.get('prompt', {}).get('compression_ratio', 1.0) < 1.0:
+            print(f"   Prompt: {run['prompt']['original_tokens_estimate']} → {run['prompt']['compressed_tokens_estimate']} tokens (ratio {run['prompt']['compression_ratio']:.2f})")
         print(f"   Output: {run['output']['concepts_count']} concepts, {run['output']['relationships_count']} relationships")
         
         if not run['status']['success']:
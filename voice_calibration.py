@@ -0,0 +1,264 @@
+"""
+Voice Calibration Tool
+======================
+Offline fit of the character-based timing model per gTTS voice.
+
+Synthesizes a corpus with PrecomputeEngine for each voice (TLD), measures every
+clip's duration from its MP3 frame headers (mp3_duration.py, no decoding) and
+fits the timing coefficients by least squares:
+
+    duration = seconds_per_char * chars + seconds_per_word * words
+             + sentence_pause * sentence_ends + clause_pause * clause_breaks
+             + leading_silence
+
+Words whose duration calculate_word_timings() clamps to [min_word_duration,
+max_word_duration] are accounted for by refitting against the durations with
+the clamp's effect removed until the coefficients settle.
+
+The result is written to voice_profiles.json, which calculate_word_timings()
+loads - so timings match the voice with zero runtime cost.
+
+Usage:
+    python voice_calibration.py --voices com co.uk
+    python voice_calibration.py --voices com --corpus my_lessons.txt   # one utterance per line
+"""
+
+import json
+import logging
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from mp3_duration import get_mp3_duration
+from timeline_mapper import VOICE_PROFILES_FILE, DEFAULT_TIMING_PROFILE
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+FEATURES = ["seconds_per_char", "seconds_per_word", "sentence_pause", "clause_pause", "leading_silence"]
+
+# Refits used to account for the per-word min/max duration clamp
+CLAMP_ITERATIONS = 10
+
+# Default corpus: educational sentences of varied length and punctuation
+DEFAULT_CORPUS = [
+    "Photosynthesis converts light energy into chemical energy.",
+    "Chlorophyll molecules absorb sunlight in plant cells.",
+    "Water molecules split to release oxygen, which leaves through the stomata.",
+    "The Calvin cycle uses carbon dioxide. Glucose is produced as the final product.",
+    "The water cycle moves water across Earth's surface.",
+    "Water evaporates from oceans due to solar energy; vapor rises and cools.",
+    "Precipitation falls as rain or snow. Surface runoff carries water to rivers. Groundwater infiltrates into soil.",
+    "Newton's laws describe motion and forces.",
+    "The second law defines force as mass times acceleration.",
+    "Momentum is conserved in collisions, even when kinetic energy is not.",
+    "Cells are the basic unit of life.",
+    "Mitochondria produce energy through cellular respiration, using glucose and oxygen.",
+    "DNA stores genetic information. RNA carries instructions to ribosomes, where proteins are built.",
+    "Plate tectonics explains earthquakes, volcanoes, and the formation of mountain ranges.",
+    "Democracy depends on free elections.",
+    "The industrial revolution transformed manufacturing, transportation, and daily life in Europe.",
+    "Fractions represent parts of a whole: the numerator counts parts, the denominator names them.",
+    "Electric current flows through a closed circuit. Resistance limits the current.",
+    "Ecosystems contain producers, consumers, and decomposers.",
+    "Supply and demand determine prices in a market economy.",
+    "Sound travels as a wave. It moves faster in water than in air, and fastest in solids.",
+    "Atoms bond by sharing or transferring electrons.",
+    "The French Revolution began in 1789, ending the absolute monarchy.",
+    "Climate change affects global temperatures. Sea levels are rising worldwide. Renewable energy can reduce emissions.",
+]
+
+
+def utterance_features(text: str) -> List[float]:
+    """Feature vector matching calculate_word_timings(): chars, words, sentence ends, clause breaks, constant."""
+    chars = words = sentence_ends = clause_breaks = 0
+    for word in text.split():
+        chars += len(word.rstrip('.,!?;:'))
+        words += 1
+        if word.endswith(('.', '!', '?')):
+            sentence_ends += 1
+        elif word.endswith((',', ';', ':')):
+            clause_breaks += 1
+    return [float(chars), float(words), float(sentence_ends), float(clause_breaks), 1.0]
+
+
+def _clamp_correction(text: str, profile: Dict) -> float:
+    """Seconds the per-word min/max clamp adds to the linear model's duration of text."""
+    correction = 0.0
+    for word in text.split():
+        linear = profile["seconds_per_word"] + len(word.rstrip('.,!?;:')) * profile["seconds_per_char"]
+        clamped = max(profile["min_word_duration"], min(linear, profile["max_word_duration"]))
+        correction += clamped - linear
+    return correction
+
+
+def predicted_duration(text: str, profile: Dict) -> float:
+    """Duration of text under a timing profile, as calculate_word_timings() computes it."""
+    x = utterance_features(text)
+    linear = sum(profile[name] * x[i] for i, name in enumerate(FEATURES))
+    return linear + _clamp_correction(text, profile)
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> Optional[List[float]]:
+    """Solve a small linear system by Gaussian elimination with partial pivoting."""
+    n = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) < 1e-12:
+            return None
+        a[col], a[pivot] = a[pivot], a[col]
+        for r in range(col + 1, n):
+            factor = a[r][col] / a[col][col]
+            for c in range(col, n + 1):
+                a[r][c] -= factor * a[col][c]
+    solution = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        solution[r] = (a[r][n] - sum(a[r][c] * solution[c] for c in range(r + 1, n))) / a[r][r]
+    return solution
+
+
+def _fit_linear(samples: List[Tuple[List[float], float]]) -> List[float]:
+    """
+    Non-negative least squares fit of FEATURES to target durations.
+
+    Solves the normal equations and drops any feature with a negative
+    coefficient until all are non-negative (dropped features get 0).
+    """
+    active = list(range(len(FEATURES)))
+    coefficients = [0.0] * len(FEATURES)
+
+    while active:
+        xtx = [[sum(x[i] * x[j] for x, _ in samples) for j in active] for i in active]
+        xty = [sum(x[i] * y for x, y in samples) for i in active]
+        solution = _solve(xtx, xty)
+        if solution is None:
+            # Singular system: drop a feature that never occurs in the corpus, else the last one
+            unused = [i for i in active if not any(x[i] for x, _ in samples)]
+            active.remove(unused[0] if unused else active[-1])
+            continue
+        negative = [active[k] for k, value in enumerate(solution) if value < 0]
+        if not negative:
+            for k, index in enumerate(active):
+                coefficients[index] = solution[k]
+            break
+        active = [i for i in active if i not in negative]
+
+    return coefficients
+
+
+def fit_coefficients(samples: List[Tuple[str, float]]) -> Dict[str, float]:
+    """
+    Fit the timing profile of FEATURES to measured utterance durations.
+
+    The linear model is fitted first; then, using the current coefficients,
+    the duration the min/max word clamp adds to each utterance is subtracted
+    from its measured duration and the model is refitted, until the
+    coefficients stop changing (at most CLAMP_ITERATIONS times).
+
+    Args:
+        samples: List of (utterance_text, measured_duration)
+
+    Returns:
+        Dict of FEATURES -> coefficient
+    """
+    features = [utterance_features(text) for text, _ in samples]
+    targets = [duration for _, duration in samples]
+    profile = dict(DEFAULT_TIMING_PROFILE)
+    coefficients = [0.0] * len(FEATURES)
+
+    for _ in range(CLAMP_ITERATIONS):
+        fitted = _fit_linear(list(zip(features, targets)))
+        converged = max(abs(a - b) for a, b in zip(fitted, coefficients)) < 1e-6
+        coefficients = fitted
+        profile.update(zip(FEATURES, coefficients))
+        if converged:
+            break
+        targets = [duration - _clamp_correction(text, profile) for text, duration in samples]
+
+    return {name: round(value, 5) for name, value in zip(FEATURES, coefficients)}
+
+
+def calibrate_voice(voice: str, corpus: List[str]) -> Dict:
+    """
+    Synthesize the corpus with one gTTS voice and fit its timing profile.
+
+    Args:
+        voice: gTTS TLD (PrecomputeEngine.voice)
+        corpus: Utterances to synthesize
+
+    Returns:
+        Profile dict (timing coefficients plus fit statistics)
+    """
+    from precompute_engine import PrecomputeEngine
+
+    engine = PrecomputeEngine(voice=voice)
+    samples = []
+    try:
+        for index, text in enumerate(corpus):
+            audio_file = engine.generate_audio_file(text, f"calibration_{index}")
+            if not audio_file:
+                logger.warning(f"⚠️ Skipping utterance {index + 1}: synthesis failed")
+                continue
+            duration = get_mp3_duration(audio_file)
+            samples.append((text, duration))
+            logger.info(f"  [{voice}] {index + 1}/{len(corpus)}: {duration:.3f}s")
+    finally:
+        engine.cleanup()
+
+    if len(samples) < len(FEATURES):
+        raise RuntimeError(f"Only {len(samples)} utterances synthesized for '{voice}', need at least {len(FEATURES)}")
+
+    coefficients = fit_coefficients(samples)
+    fitted_profile = {**DEFAULT_TIMING_PROFILE, **coefficients}
+    errors = [abs(predicted_duration(text, fitted_profile) - y) for text, y in samples]
+    default_errors = [abs(predicted_duration(text, DEFAULT_TIMING_PROFILE) - y) for text, y in samples]
+
+    profile = dict(coefficients)
+    profile.update({
+        "samples": len(samples),
+        "mean_abs_error": round(sum(errors) / len(errors), 3),
+        "default_mean_abs_error": round(sum(default_errors) / len(default_errors), 3),
+        "calibrated_at": datetime.now().isoformat()
+    })
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit per-voice word timing profiles from synthesized audio")
+    parser.add_argument("--voices", nargs="+", default=["com"], help="gTTS TLDs to calibrate (e.g. com co.uk com.au)")
+    parser.add_argument("--corpus", help="Text file with one utterance per line (default: built-in corpus)")
+    parser.add_argument("--output", default=str(VOICE_PROFILES_FILE), help="Profile file to update")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, 'r', encoding='utf-8') as f:
+            corpus = [line.strip() for line in f if line.strip()]
+    else:
+        corpus = DEFAULT_CORPUS
+
+    try:
+        with open(args.output, 'r', encoding='utf-8') as f:
+            profiles = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        profiles = {}
+
+    for voice in args.voices:
+        print(f"\n🎤 Calibrating voice '{voice}' on {len(corpus)} utterances...")
+        try:
+            profile = calibrate_voice(voice, corpus)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            continue
+        profiles[voice] = profile
+        print(f"✅ {voice}: " + ", ".join(f"{name}={profile[name]}" for name in FEATURES))
+        print(f"   Mean abs error: {profile['mean_abs_error']:.3f}s per utterance "
+              f"(built-in constants: {profile['default_mean_abs_error']:.3f}s)")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f, indent=2)
+    print(f"\n💾 Profiles saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()